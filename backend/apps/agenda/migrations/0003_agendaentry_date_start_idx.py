@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("agenda", "0002_alter_agendaentry_notes"),
+        ("duties", "0001_initial"),
+        ("users", "0008_member_search_text"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="agendaentry",
+            index=models.Index(fields=["date", "start_time"], name="agenda_date_start_idx"),
+        ),
+    ]
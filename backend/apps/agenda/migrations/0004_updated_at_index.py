@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("agenda", "0003_agendaentry_date_start_idx"),
+        ("duties", "0002_updated_at_index"),
+        ("users", "0010_updated_at_index"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="agendaentry",
+            index=models.Index(fields=["updated_at"], name="agenda_entry_updated_idx"),
+        ),
+    ]
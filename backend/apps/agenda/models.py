@@ -25,6 +25,11 @@ class AgendaEntry(models.Model):
 
     class Meta:
         ordering = ["date", "start_time", "duty__name"]
+        indexes = [
+            # Schedule conflict checks and date-range listings.
+            models.Index(fields=["date", "start_time"], name="agenda_date_start_idx"),
+            models.Index(fields=["updated_at"], name="agenda_entry_updated_idx"),
+        ]
 
     def clean(self):
         if self.end_time and self.end_time <= self.start_time:
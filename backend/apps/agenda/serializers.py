@@ -1,7 +1,8 @@
 from rest_framework import serializers
 
 from apps.agenda.models import AgendaEntry
-from apps.common.roles import promote_role
+from apps.agenda.services import find_schedule_conflicts
+from apps.common.roles import promote_roles
 from apps.common.validators import validate_text_length
 from apps.credits.services import sync_agenda_credit_entries
 from apps.duties.models import Duty
@@ -88,20 +89,14 @@ class AgendaEntrySerializer(serializers.ModelSerializer):
         # Check overlapping schedules for selected members on the same date.
         date = attrs.get("date") or getattr(self.instance, "date", None)
         selected_members = attrs.get("_selected_members")
-        new_start = start
-        new_end = end or start
-        conflicts = []
         if date and selected_members:
-            for member in selected_members:
-                qs = AgendaEntry.objects.filter(date=date, members=member)
-                if self.instance:
-                    qs = qs.exclude(pk=self.instance.pk)
-                for existing in qs:
-                    existing_start = existing.start_time
-                    existing_end = existing.end_time or existing.start_time
-                    # overlap if not (new_end <= existing_start or existing_end <= new_start)
-                    if not (new_end <= existing_start or existing_end <= new_start):
-                        conflicts.append({"member": member.id, "agenda_entry": existing.id})
+            conflicts = find_schedule_conflicts(
+                [member.id for member in selected_members],
+                date,
+                start,
+                end,
+                exclude_entry_id=self.instance.pk if self.instance else None,
+            )
             if conflicts:
                 raise serializers.ValidationError(
                     {
@@ -114,8 +109,7 @@ class AgendaEntrySerializer(serializers.ModelSerializer):
     def _sync_members(self, instance, selected):
         if selected is not None:
             instance.members.set(selected)
-            for m in instance.members.all():
-                promote_role(m, Member.Role.SUSTENTADOR)
+            promote_roles(selected, Member.Role.SUSTENTADOR)
 
     def create(self, validated_data):
         selected_members = validated_data.pop("_selected_members", None)
@@ -123,8 +117,6 @@ class AgendaEntrySerializer(serializers.ModelSerializer):
         if selected_members:
             self._sync_members(instance, selected_members)
             instance.duty.members.add(*selected_members)
-            for m in selected_members:
-                promote_role(m, Member.Role.SUSTENTADOR)
         request = self.context.get("request")
         actor = request.user if request and request.user.is_authenticated else None
         sync_agenda_credit_entries(instance, actor=actor)
@@ -136,8 +128,6 @@ class AgendaEntrySerializer(serializers.ModelSerializer):
         if selected_members is not None:
             self._sync_members(instance, selected_members)
             instance.duty.members.add(*selected_members)
-            for m in selected_members:
-                promote_role(m, Member.Role.SUSTENTADOR)
         request = self.context.get("request")
         actor = request.user if request and request.user.is_authenticated else None
         sync_agenda_credit_entries(instance, actor=actor)
@@ -0,0 +1,48 @@
+from collections.abc import Iterable
+from datetime import date, time
+
+from django.db.models import F
+from django.db.models.functions import Coalesce
+
+from apps.agenda.models import AgendaEntry
+
+AgendaMembership = AgendaEntry.members.through
+
+
+def find_schedule_conflicts(
+    member_ids: Iterable[int],
+    on_date: date,
+    start_time: time,
+    end_time: time | None = None,
+    *,
+    exclude_entry_id: int | None = None,
+) -> list[dict]:
+    """
+    Every `(member, agenda_entry)` pair where one of the members already has an entry on
+    `on_date` overlapping `[start_time, end_time)`, from a single query over the membership
+    table. Entries without `end_time` last until their start, as in the form validation.
+    Results follow the order of `member_ids`, then the agenda ordering.
+    """
+    member_ids = list(dict.fromkeys(member_ids))
+    if not member_ids:
+        return []
+    end_time = end_time or start_time
+    rows = (
+        AgendaMembership.objects.filter(
+            member_id__in=member_ids,
+            agendaentry__date=on_date,
+            agendaentry__start_time__lt=end_time,
+        )
+        .alias(existing_end=Coalesce(F("agendaentry__end_time"), F("agendaentry__start_time")))
+        .filter(existing_end__gt=start_time)
+        .order_by("agendaentry__start_time", "agendaentry__duty__name", "agendaentry_id")
+        .values_list("member_id", "agendaentry_id")
+    )
+    if exclude_entry_id is not None:
+        rows = rows.exclude(agendaentry_id=exclude_entry_id)
+
+    position = {member_id: index for index, member_id in enumerate(member_ids)}
+    return [
+        {"member": member_id, "agenda_entry": entry_id}
+        for member_id, entry_id in sorted(rows, key=lambda row: position[row[0]])
+    ]
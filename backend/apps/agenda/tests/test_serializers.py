@@ -1,6 +1,10 @@
+from datetime import date, time
+
 import pytest
 
+from apps.agenda.models import AgendaEntry
 from apps.agenda.serializers import AgendaEntrySerializer
+from apps.agenda.services import find_schedule_conflicts
 from apps.duties.tests.factories import DutyFactory
 from apps.users.models import Member
 from apps.users.tests.factories import MemberFactory
@@ -126,3 +130,54 @@ def test_agenda_entry_rejects_notes_above_limit():
 
     assert not serializer.is_valid()
     assert "notes" in serializer.errors
+
+
+@pytest.mark.django_db
+def test_schedule_conflicts_for_many_members_come_from_one_query(django_assert_num_queries):
+    duty = DutyFactory()
+    members = MemberFactory.create_batch(8)
+    day = date(2025, 12, 6)
+    morning = AgendaEntry.objects.create(date=day, start_time=time(9), end_time=time(10), duty=duty)
+    morning.members.add(members[1], members[0])
+    open_ended = AgendaEntry.objects.create(date=day, start_time=time(10), duty=duty)
+    open_ended.members.add(members[2])
+    AgendaEntry.objects.create(
+        date=day, start_time=time(11), end_time=time(12), duty=duty
+    ).members.add(members[3])
+    AgendaEntry.objects.create(
+        date=date(2025, 12, 7), start_time=time(9), end_time=time(12), duty=duty
+    ).members.add(members[4])
+
+    with django_assert_num_queries(1):
+        conflicts = find_schedule_conflicts(
+            [member.id for member in members], day, time(9, 30), time(11)
+        )
+
+    assert conflicts == [
+        {"member": members[0].id, "agenda_entry": morning.id},
+        {"member": members[1].id, "agenda_entry": morning.id},
+        {"member": members[2].id, "agenda_entry": open_ended.id},
+    ]
+    assert (
+        find_schedule_conflicts(
+            [members[0].id], day, time(9), time(10), exclude_entry_id=morning.id
+        )
+        == []
+    )
+
+
+@pytest.mark.django_db
+def test_agenda_entry_update_does_not_conflict_with_itself():
+    duty = DutyFactory()
+    member = MemberFactory()
+    duty.members.add(member)
+    entry = AgendaEntry.objects.create(
+        date=date(2025, 12, 8), start_time=time(9), end_time=time(10), duty=duty
+    )
+    entry.members.add(member)
+
+    serializer = AgendaEntrySerializer(
+        entry, data={"end_time": "10:30", "member_ids": [member.id]}, partial=True
+    )
+
+    assert serializer.is_valid(), serializer.errors
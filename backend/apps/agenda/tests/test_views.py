@@ -1,5 +1,8 @@
+from io import BytesIO
+
 import pytest
 from django.contrib.auth import get_user_model
+from openpyxl import load_workbook
 from rest_framework.reverse import reverse
 from rest_framework.test import APIClient
 
@@ -76,3 +79,19 @@ def test_anonymous_cannot_list_agenda(api_client):
     response = api_client.get(url)
 
     assert response.status_code == 401
+
+
+@pytest.mark.django_db
+def test_export_streams_filtered_entries_with_members(api_client, superuser):
+    first_member = MemberFactory(full_name="Ana Lima")
+    second_member = MemberFactory(full_name="Bruno Reis")
+    AgendaEntryFactory(date="2025-12-05", members=[first_member, second_member])
+    AgendaEntryFactory(date="2025-12-06")
+    api_client.force_authenticate(user=superuser)
+
+    response = api_client.get(reverse("agenda-entry-export"), {"date": "2025-12-05"})
+
+    assert response.status_code == 200
+    worksheet = load_workbook(BytesIO(b"".join(response.streaming_content))).active
+    assert worksheet.max_row == 2
+    assert worksheet["E2"].value in {"Ana Lima, Bruno Reis", "Bruno Reis, Ana Lima"}
@@ -1,11 +1,13 @@
 import django_filters
 from rest_framework import viewsets
-from rest_framework.decorators import action
 
 from apps.agenda.models import AgendaEntry
 from apps.agenda.serializers import AgendaEntrySerializer
-from apps.common.exports import create_xlsx_response
+from apps.common.conditional import ConditionalGetMixin
+from apps.common.exports import ExportMixin
 from apps.common.permissions import SuperuserOnly
+from apps.duties.models import Duty
+from apps.users.models import Member
 
 
 class AgendaEntryFilter(django_filters.FilterSet):
@@ -22,7 +24,7 @@ class AgendaEntryFilter(django_filters.FilterSet):
         fields = ["date", "status", "duty", "member", "date_range", "date_from", "date_to"]
 
 
-class AgendaEntryViewSet(viewsets.ModelViewSet):
+class AgendaEntryViewSet(ConditionalGetMixin, ExportMixin, viewsets.ModelViewSet):
     queryset = (
         AgendaEntry.objects.select_related("duty")
         .prefetch_related("members")
@@ -31,29 +33,25 @@ class AgendaEntryViewSet(viewsets.ModelViewSet):
     serializer_class = AgendaEntrySerializer
     permission_classes = [SuperuserOnly]
     filterset_class = AgendaEntryFilter
+    watermark_models = (AgendaEntry, Duty, Member)
+    export_filename = "agenda"
+    export_headers = [
+        "Data",
+        "Início",
+        "Fim",
+        "Função",
+        "Integrantes",
+        "Status",
+        "Observações",
+    ]
 
-    @action(detail=False, methods=["get"], url_path="export")
-    def export(self, request):
-        queryset = self.filter_queryset(self.get_queryset())
-        headers = [
-            "Data",
-            "Início",
-            "Fim",
-            "Função",
-            "Integrantes",
-            "Status",
-            "Observações",
+    def build_export_row(self, entry):
+        return [
+            entry.date.strftime("%Y-%m-%d"),
+            entry.start_time.strftime("%H:%M"),
+            entry.end_time.strftime("%H:%M") if entry.end_time else "",
+            entry.duty.name,
+            ", ".join(member.full_name for member in entry.members.all()),
+            entry.get_status_display(),
+            entry.notes or "",
         ]
-        rows = [
-            [
-                entry.date.strftime("%Y-%m-%d"),
-                entry.start_time.strftime("%H:%M"),
-                entry.end_time.strftime("%H:%M") if entry.end_time else "",
-                entry.duty.name,
-                ", ".join(member.full_name for member in entry.members.all()),
-                entry.get_status_display(),
-                entry.notes or "",
-            ]
-            for entry in queryset
-        ]
-        return create_xlsx_response("agenda", headers, rows)
@@ -0,0 +1,24 @@
+from django.contrib import admin
+
+from apps.common.models import ExportJob
+
+
+@admin.register(ExportJob)
+class ExportJobAdmin(admin.ModelAdmin):
+    list_display = ("id", "source", "export_format", "status", "row_count", "created_at")
+    list_filter = ("source", "status", "export_format")
+    readonly_fields = (
+        "source",
+        "export_format",
+        "params",
+        "params_hash",
+        "status",
+        "source_version",
+        "filename",
+        "file",
+        "row_count",
+        "error",
+        "requested_by",
+        "started_at",
+        "finished_at",
+    )
@@ -0,0 +1,101 @@
+import hashlib
+import json
+from datetime import UTC, datetime
+
+from django.utils.http import http_date, parse_etags, quote_etag
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from rest_framework.response import Response
+
+from apps.common.watermarks import table_watermark
+
+CONDITIONAL_METHODS = ("GET", "HEAD")
+
+
+class NotModified(APIException):
+    status_code = status.HTTP_304_NOT_MODIFIED
+
+
+class ConditionalGetMixin:
+    """
+    `ETag`/`Last-Modified` for read endpoints, derived from the watermark (change counter and
+    latest `updated_at`) of the tables behind the response, so a client revalidating with
+    `If-None-Match` gets a `304` after one watermark query and before any filtering,
+    pagination or serialization runs.
+
+    Views list the models their payload reads in `watermark_models` (viewsets default to the
+    queryset model) and add any other input that changes the payload, such as today's date,
+    through `get_watermark_context`. On viewsets only `conditional_actions` are covered, so
+    actions that read other tables (e.g. export job status) are left alone.
+    """
+
+    watermark_models: tuple = ()
+    conditional_actions = ("list", "retrieve", "export")
+    watermark = None
+
+    def get_watermark_models(self) -> tuple:
+        if self.watermark_models:
+            return tuple(self.watermark_models)
+        queryset = getattr(self, "queryset", None)
+        return (queryset.model,) if queryset is not None else ()
+
+    def get_watermark_context(self, request) -> list:
+        return []
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self.watermark = None
+        self._conditional_headers = {}
+        action = getattr(self, "action", None)
+        if request.method not in CONDITIONAL_METHODS or (
+            action is not None and action not in self.conditional_actions
+        ):
+            return
+        models = self.get_watermark_models()
+        if not models:
+            return
+
+        self.watermark = table_watermark(*models)
+        payload = json.dumps(
+            [
+                self.watermark,
+                self.get_watermark_context(request),
+                request.get_full_path(),
+                request.accepted_media_type,
+            ],
+            sort_keys=True,
+            default=str,
+        )
+        etag = quote_etag(hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32])
+        self._conditional_headers["ETag"] = etag
+        last_modified = self._last_modified(models)
+        if last_modified is not None:
+            self._conditional_headers["Last-Modified"] = http_date(last_modified.timestamp())
+
+        if_none_match = request.headers.get("If-None-Match")
+        if if_none_match and ("*" in (tags := parse_etags(if_none_match)) or etag in tags):
+            raise NotModified()
+
+    def _last_modified(self, models) -> datetime | None:
+        latest = []
+        for model in models:
+            if not any(field.name == "updated_at" for field in model._meta.concrete_fields):
+                continue
+            value = self.watermark[model._meta.label_lower][1]
+            if value is None:
+                continue
+            parsed = datetime.fromisoformat(value)
+            latest.append(parsed if parsed.tzinfo else parsed.replace(tzinfo=UTC))
+        return max(latest) if latest else None
+
+    def handle_exception(self, exc):
+        if isinstance(exc, NotModified):
+            return Response(status=status.HTTP_304_NOT_MODIFIED)
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if response.status_code in (status.HTTP_200_OK, status.HTTP_304_NOT_MODIFIED):
+            for header, value in getattr(self, "_conditional_headers", {}).items():
+                response.setdefault(header, value)
+        return response
@@ -0,0 +1,270 @@
+import hashlib
+import json
+import logging
+from datetime import timedelta
+from tempfile import SpooledTemporaryFile
+
+from django.conf import settings
+from django.core.files import File
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.http import FileResponse
+from django.utils import timezone
+from django.utils.module_loading import import_string
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+from rest_framework.reverse import reverse
+
+from apps.common.exports import (
+    SPOOL_MAX_SIZE,
+    ExportMixin,
+    get_export_content_type,
+    iter_export_rows,
+    write_export_file,
+)
+from apps.common.models import ExportJob
+from apps.common.serializers import ExportJobSerializer
+from apps.common.watermarks import table_watermark
+
+logger = logging.getLogger("apps.common")
+
+EXPORT_JOB_SOURCES = {
+    "financial": "apps.financial.views.FinancialEntryViewSet",
+    "lunches": "apps.lunch.views.LunchViewSet",
+    "members": "apps.users.views.MemberViewSet",
+}
+IGNORED_EXPORT_PARAMS = {"format", "page", "page_size", "cursor"}
+STALE_EXPORT_JOB_ERROR = "Exportação interrompida: o processamento excedeu o tempo limite."
+
+
+def build_params_hash(source: str, export_format: str, params: dict) -> str:
+    payload = json.dumps([source, export_format, params], sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def stale_export_job_cutoff():
+    """Jobs claimed before this instant and still `PROCESSANDO` lost their worker."""
+    return timezone.now() - timedelta(seconds=settings.EXPORT_JOB_STALE_TIMEOUT)
+
+
+def request_export_job(
+    viewset_class, export_format: str, params: dict, *, user=None
+) -> tuple[ExportJob, bool]:
+    """
+    Return a job for the export, creating it only when needed: a queued or running job with the
+    same filters is shared (a job running for longer than `EXPORT_JOB_STALE_TIMEOUT` is failed
+    first), and a finished one is reused while the exported tables still have the watermark they
+    had when its file was built. A unique constraint keeps one queued or running job per export,
+    so concurrent requests end up sharing it. The boolean tells whether a job was created.
+    """
+    source = viewset_class.export_job_source
+    params_hash = build_params_hash(source, export_format, params)
+    jobs = ExportJob.objects.filter(params_hash=params_hash)
+    fail_stale_export_jobs(jobs)
+
+    active = jobs.filter(
+        status__in=[ExportJob.Status.PENDENTE, ExportJob.Status.PROCESSANDO]
+    ).first()
+    if active:
+        return active, False
+
+    finished = jobs.filter(status=ExportJob.Status.CONCLUIDO).first()
+    if finished and finished.source_version == table_watermark(*viewset_class.export_tables):
+        return finished, False
+
+    try:
+        with transaction.atomic():
+            job = ExportJob.objects.create(
+                source=source,
+                export_format=export_format,
+                params=params,
+                params_hash=params_hash,
+                requested_by=user if user and user.is_authenticated else None,
+            )
+    except IntegrityError:
+        # Another request queued the same export in the meantime.
+        return request_export_job(viewset_class, export_format, params, user=user)
+    return job, True
+
+
+def run_export_job(job: ExportJob) -> ExportJob:
+    """
+    Build the file of a pending job. The job is claimed with a conditional UPDATE, so several
+    workers can poll the same queue; jobs claimed elsewhere are returned untouched.
+    """
+    claimed = ExportJob.objects.filter(id=job.id, status=ExportJob.Status.PENDENTE).update(
+        status=ExportJob.Status.PROCESSANDO, started_at=timezone.now()
+    )
+    if not claimed:
+        return job
+
+    row_count = 0
+
+    def count_rows(rows):
+        nonlocal row_count
+        for row in rows:
+            row_count += 1
+            yield row
+
+    try:
+        viewset_class = import_string(EXPORT_JOB_SOURCES[job.source])
+        view = viewset_class()
+        filterset = viewset_class.filterset_class(data=job.params, queryset=view.get_queryset())
+        if not filterset.is_valid():
+            raise ValueError(json.dumps(filterset.errors, ensure_ascii=False))
+        source_version = table_watermark(*viewset_class.export_tables)
+        rows = iter_export_rows(view.get_export_queryset(filterset.qs), view.build_export_row)
+        filename = f"{view.export_filename}.{job.export_format}"
+        # The file goes to storage through a spooled temporary file, never whole into memory.
+        with SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE) as output:
+            write_export_file(
+                output, view.export_headers, count_rows(rows), export_format=job.export_format
+            )
+            output.seek(0)
+            job.file.save(f"{job.id}-{filename}", File(output), save=False)
+    except Exception as exc:
+        logger.exception("export_job_failed job_id=%s", job.id)
+        ExportJob.objects.filter(id=job.id).update(
+            status=ExportJob.Status.ERRO, error=str(exc), finished_at=timezone.now()
+        )
+    else:
+        ExportJob.objects.filter(id=job.id).update(
+            status=ExportJob.Status.CONCLUIDO,
+            filename=filename,
+            file=job.file.name,
+            row_count=row_count,
+            source_version=source_version,
+            finished_at=timezone.now(),
+        )
+    job.refresh_from_db()
+    return job
+
+
+def fail_stale_export_jobs(jobs=None) -> int:
+    """
+    Mark as `ERRO` the jobs (of `jobs`, or all of them) left `PROCESSANDO` past
+    `EXPORT_JOB_STALE_TIMEOUT`, e.g. by a worker that was killed mid-export. Returns how many
+    were marked.
+    """
+    jobs = ExportJob.objects.all() if jobs is None else jobs
+    return jobs.filter(
+        status=ExportJob.Status.PROCESSANDO, started_at__lt=stale_export_job_cutoff()
+    ).update(status=ExportJob.Status.ERRO, error=STALE_EXPORT_JOB_ERROR, finished_at=timezone.now())
+
+
+def process_pending_export_jobs(limit: int | None = None) -> int:
+    """
+    Fail stale jobs, then run queued jobs in request order. Returns how many were processed by
+    this call.
+    """
+    fail_stale_export_jobs()
+    pending = ExportJob.objects.filter(status=ExportJob.Status.PENDENTE).order_by("id")
+    processed = 0
+    for job_id in pending.values_list("id", flat=True)[:limit]:
+        job = run_export_job(ExportJob.objects.get(id=job_id))
+        if job.status in (ExportJob.Status.CONCLUIDO, ExportJob.Status.ERRO):
+            processed += 1
+    return processed
+
+
+def purge_export_jobs(retention_days: int) -> int:
+    """
+    Delete finished or failed jobs older than `retention_days`, and jobs of that age whose worker
+    never finished them, together with their files.
+    """
+    cutoff = timezone.now() - timedelta(days=retention_days)
+    expired = ExportJob.objects.filter(
+        Q(status__in=[ExportJob.Status.CONCLUIDO, ExportJob.Status.ERRO])
+        | Q(status=ExportJob.Status.PROCESSANDO, started_at__lt=stale_export_job_cutoff()),
+        created_at__lt=cutoff,
+    )
+    for job in expired.exclude(file="").only("id", "file").iterator():
+        job.file.delete(save=False)
+    deleted, _ = expired.delete()
+    return deleted
+
+
+class ExportJobMixin(ExportMixin):
+    """
+    Adds background exports to an `ExportMixin` viewset listed in `EXPORT_JOB_SOURCES`:
+
+    - `POST <list>/export-jobs/` queues (or reuses) a job for the current query-string filters;
+      the body may set `format` (`xlsx`, `csv` or `tsv`)
+    - `GET <list>/export-jobs/{id}/` reports its status
+    - `GET <list>/export-jobs/{id}/download/` serves the finished file
+
+    The viewset declares `export_job_source` and `export_tables`, the models whose changes
+    invalidate a finished file.
+    """
+
+    export_job_source: str
+    export_tables: tuple = ()
+
+    def _get_export_job(self, job_id):
+        return ExportJob.objects.filter(id=job_id, source=self.export_job_source).first()
+
+    def _export_job_response(self, job, status_code=status.HTTP_200_OK):
+        download_url = None
+        if job.status == ExportJob.Status.CONCLUIDO:
+            download_url = reverse(
+                f"{self.basename}-export-job-download",
+                kwargs={"job_id": job.id},
+                request=self.request,
+            )
+        serializer = ExportJobSerializer(job, context={"download_url": download_url})
+        return Response(serializer.data, status=status_code)
+
+    @action(detail=False, methods=["post"], url_path="export-jobs")
+    def export_jobs(self, request):
+        export_format = request.data.get("format") or ExportJob.Format.XLSX
+        if export_format not in ExportJob.Format.values:
+            return Response(
+                {"format": "Formato inválido. Use xlsx, csv ou tsv."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        params = {
+            key: value
+            for key, value in sorted(request.query_params.items())
+            if key not in IGNORED_EXPORT_PARAMS
+        }
+        filterset = self.filterset_class(data=params, queryset=self.get_queryset(), request=request)
+        if not filterset.is_valid():
+            return Response(filterset.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        job, created = request_export_job(type(self), export_format, params, user=request.user)
+        return self._export_job_response(
+            job, status.HTTP_202_ACCEPTED if created else status.HTTP_200_OK
+        )
+
+    @action(detail=False, methods=["get"], url_path=r"export-jobs/(?P<job_id>\d+)")
+    def export_job_detail(self, request, job_id=None):
+        job = self._get_export_job(job_id)
+        if not job:
+            return Response({"detail": "Exportação não encontrada."}, status=404)
+        return self._export_job_response(job)
+
+    @action(detail=False, methods=["get"], url_path=r"export-jobs/(?P<job_id>\d+)/download")
+    def export_job_download(self, request, job_id=None):
+        job = self._get_export_job(job_id)
+        if not job:
+            return Response({"detail": "Exportação não encontrada."}, status=404)
+        if job.status != ExportJob.Status.CONCLUIDO:
+            return Response(
+                {"detail": "A exportação ainda não foi concluída."},
+                status=status.HTTP_409_CONFLICT,
+            )
+        try:
+            file = job.file.open("rb")
+        except (FileNotFoundError, ValueError):
+            return Response(
+                {"detail": "O arquivo da exportação não está mais disponível."},
+                status=status.HTTP_410_GONE,
+            )
+        return FileResponse(
+            file,
+            as_attachment=True,
+            filename=job.filename,
+            content_type=get_export_content_type(job.export_format),
+        )
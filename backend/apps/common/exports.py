@@ -1,15 +1,36 @@
 from __future__ import annotations
 
-from collections.abc import Iterable
+import csv
+from abc import ABC, abstractmethod
+from collections.abc import Callable, Iterable, Iterator
 from decimal import Decimal
-from io import BytesIO
+from itertools import chain, islice
+from tempfile import SpooledTemporaryFile
 
-from django.http import HttpResponse
+from django.db.models import QuerySet
+from django.http import FileResponse, HttpResponseBase, StreamingHttpResponse
 from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.styles import Font
 from openpyxl.utils import get_column_letter
+from rest_framework.decorators import action
+from rest_framework.settings import api_settings
+
+from apps.common.renderers import CSVRenderer, TSVRenderer
 
 EXCEL_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+XLSX_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+EXPORT_CHUNK_SIZE = 2000
+WIDTH_SAMPLE_ROWS = 200
+MAX_COLUMN_WIDTH = 50
+SPOOL_MAX_SIZE = 5 * 1024 * 1024
+
+DELIMITED_FORMATS = {
+    "csv": (",", "text/csv"),
+    "tsv": ("\t", "text/tab-separated-values"),
+}
+EXPORT_RENDERER_CLASSES = [*api_settings.DEFAULT_RENDERER_CLASSES, CSVRenderer, TSVRenderer]
 
 
 def cents_to_reais(value_cents: int | None) -> Decimal | str:
@@ -30,32 +51,161 @@ def sanitize_excel_value(value):
     return value
 
 
+def iter_export_rows(
+    queryset: QuerySet, build_row: Callable[[object], list], chunk_size: int = EXPORT_CHUNK_SIZE
+) -> Iterator[list]:
+    """
+    Yield one export row per object, reading the queryset in chunks with `.iterator()` so the
+    result set is never materialized (prefetches run once per chunk).
+    """
+    for obj in queryset.iterator(chunk_size=chunk_size):
+        yield build_row(obj)
+
+
+def estimate_column_widths(headers: list[str], sample_rows: list[list]) -> list[int]:
+    widths = [len(str(header)) for header in headers]
+    for row in sample_rows:
+        for index, value in enumerate(row):
+            if value is None or index >= len(widths):
+                continue
+            widths[index] = max(widths[index], len(str(value)))
+    return [min(width + 2, MAX_COLUMN_WIDTH) for width in widths]
+
+
+def write_xlsx(output, headers: list[str], rows: Iterable[Iterable]) -> None:
+    """
+    Write an XLSX workbook to the binary file object `output` in openpyxl write-only mode.
+
+    Rows are consumed once, as they come: column widths are estimated from the first
+    `WIDTH_SAMPLE_ROWS` rows only.
+    """
+    rows = iter(rows)
+    sample = [
+        [sanitize_excel_value(value) for value in row] for row in islice(rows, WIDTH_SAMPLE_ROWS)
+    ]
+
+    workbook = Workbook(write_only=True)
+    worksheet = workbook.create_sheet()
+    for index, width in enumerate(estimate_column_widths(headers, sample), start=1):
+        worksheet.column_dimensions[get_column_letter(index)].width = width
+
+    header_cells = []
+    for header in headers:
+        cell = WriteOnlyCell(worksheet, value=header)
+        cell.font = Font(bold=True)
+        header_cells.append(cell)
+    worksheet.append(header_cells)
+
+    remaining = ([sanitize_excel_value(value) for value in row] for row in rows)
+    for row in chain(sample, remaining):
+        worksheet.append(row)
+
+    workbook.save(output)
+
+
 def create_xlsx_response(
     filename: str, headers: list[str], rows: Iterable[Iterable]
-) -> HttpResponse:
-    workbook = Workbook()
-    worksheet = workbook.active
-    worksheet.append(headers)
+) -> FileResponse:
+    """
+    Stream an XLSX file written to a spooled temporary file (memory up to `SPOOL_MAX_SIZE`,
+    disk beyond) that the response serves in blocks.
+    """
+    output = SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+    write_xlsx(output, headers, rows)
+    output.seek(0)
+    return FileResponse(
+        output,
+        as_attachment=True,
+        filename=f"{filename}.xlsx",
+        content_type=XLSX_CONTENT_TYPE,
+    )
 
-    for cell in worksheet[1]:
-        cell.font = Font(bold=True)
 
+class _LineBuffer:
+    """File-like object whose `write` hands the formatted line back to the caller."""
+
+    def write(self, value: str) -> str:
+        return value
+
+
+def iter_delimited_lines(
+    headers: list[str], rows: Iterable[Iterable], *, export_format: str = "csv"
+) -> Iterator[str]:
+    """
+    Yield CSV/TSV lines one at a time. Values go through `sanitize_excel_value` like the XLSX
+    export; the UTF-8 BOM lets spreadsheet apps detect the encoding.
+    """
+    delimiter, _ = DELIMITED_FORMATS[export_format]
+    writer = csv.writer(_LineBuffer(), delimiter=delimiter)
+    yield "\ufeff" + writer.writerow(headers)
     for row in rows:
-        worksheet.append([sanitize_excel_value(value) for value in row])
+        yield writer.writerow([sanitize_excel_value(value) for value in row])
 
-    for idx, column in enumerate(worksheet.columns, start=1):
-        max_len = 0
-        for cell in column:
-            if cell.value is None:
-                continue
-            max_len = max(max_len, len(str(cell.value)))
-        worksheet.column_dimensions[get_column_letter(idx)].width = min(max_len + 2, 50)
-
-    buffer = BytesIO()
-    workbook.save(buffer)
-    response = HttpResponse(
-        buffer.getvalue(),
-        content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+
+def create_delimited_response(
+    filename: str, headers: list[str], rows: Iterable[Iterable], *, export_format: str = "csv"
+) -> StreamingHttpResponse:
+    """Stream rows as CSV/TSV, so memory stays flat whatever the row count."""
+    _, content_type = DELIMITED_FORMATS[export_format]
+    response = StreamingHttpResponse(
+        iter_delimited_lines(headers, rows, export_format=export_format),
+        content_type=f"{content_type}; charset=utf-8",
     )
-    response["Content-Disposition"] = f'attachment; filename="{filename}.xlsx"'
+    response["Content-Disposition"] = f'attachment; filename="{filename}.{export_format}"'
     return response
+
+
+def write_export_file(
+    output, headers: list[str], rows: Iterable[Iterable], *, export_format: str = "xlsx"
+) -> None:
+    """Write a whole export file to the binary file object `output`, e.g. a background job's."""
+    if export_format in DELIMITED_FORMATS:
+        for line in iter_delimited_lines(headers, rows, export_format=export_format):
+            output.write(line.encode("utf-8"))
+        return
+    write_xlsx(output, headers, rows)
+
+
+def get_export_content_type(export_format: str) -> str:
+    if export_format in DELIMITED_FORMATS:
+        return f"{DELIMITED_FORMATS[export_format][1]}; charset=utf-8"
+    return XLSX_CONTENT_TYPE
+
+
+def create_export_response(
+    request, filename: str, headers: list[str], rows: Iterable[Iterable]
+) -> HttpResponseBase:
+    """Build the export in the format requested with `?format=` (XLSX by default)."""
+    export_format = request.query_params.get(api_settings.URL_FORMAT_OVERRIDE)
+    if export_format in DELIMITED_FORMATS:
+        return create_delimited_response(filename, headers, rows, export_format=export_format)
+    return create_xlsx_response(filename, headers, rows)
+
+
+class ExportMixin(ABC):
+    """
+    Adds `GET <list>/export/` to a viewset. The viewset declares `export_filename`,
+    `export_headers` and `build_export_row(obj)`; `get_export_queryset` may add joins the rows
+    need. The filtered queryset is streamed as XLSX, or CSV/TSV with `?format=`.
+    """
+
+    export_filename: str
+    export_headers: list[str]
+
+    @abstractmethod
+    def build_export_row(self, obj) -> list:
+        """The cells of `obj`'s row, in `export_headers` order."""
+
+    def get_export_queryset(self, queryset):
+        return queryset
+
+    @action(
+        detail=False,
+        methods=["get"],
+        url_path="export",
+        renderer_classes=EXPORT_RENDERER_CLASSES,
+    )
+    def export(self, request):
+        queryset = self.get_export_queryset(self.filter_queryset(self.get_queryset()))
+        rows = iter_export_rows(queryset, self.build_export_row)
+        return create_export_response(request, self.export_filename, self.export_headers, rows)
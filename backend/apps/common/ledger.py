@@ -0,0 +1,461 @@
+"""
+Posting engine for the ledger rows derived from lunches and packages.
+
+A lunch implies up to three derived rows: the package debit (`PackageEntry`), the credit debit
+(`CreditEntry`) and the cash entry (`FinancialEntry`). Each of them moves a balance: the
+package's `remaining_quantity`, the owner's `CreditBalance` and the daily financial rollups.
+Creating a lunch or a package also promotes its member to mensalista.
+
+`post_lunches` computes the target state of all of those rows for a batch of lunches, reads
+what exists with one prefetch, and writes only the differences, with one bulk statement per
+kind of change. `unpost_lunches` posts an empty target before a lunch is deleted. Packages
+work the same way for their own financial entry (`post_packages`/`unpost_packages`).
+
+Callers post right after saving the lunches, inside the same atomic block.
+"""
+
+from collections import Counter
+from collections.abc import Iterable, Mapping
+from copy import copy
+
+from django.contrib.auth.models import User
+from django.core.exceptions import ObjectDoesNotExist
+from django.db import models, transaction
+from django.db.models import F
+from django.db.models.functions import Least
+from django.utils import timezone
+from rest_framework import serializers
+
+from apps.common.roles import promote_roles
+from apps.credits.models import CreditBalance, CreditEntry
+from apps.credits.services import (
+    apply_credit_balance_delta,
+    build_lunch_credit_description,
+    can_use_credit_advance,
+    lock_members,
+)
+from apps.financial.models import FinancialEntry
+from apps.financial.services import (
+    bulk_create_financial_entries,
+    bulk_delete_financial_entries,
+    bulk_update_financial_entries,
+    rollup_snapshot,
+)
+from apps.lunch.models import Lunch, Package, PackageEntry
+from apps.users.models import Member
+
+INSUFFICIENT_PACKAGE_ERROR = {"package": ["Pacote sem saldo."]}
+INSUFFICIENT_CREDIT_ERROR = {
+    "credit_owner": ["Saldo de créditos insuficiente para este lançamento."]
+}
+
+
+class InsufficientCreditError(serializers.ValidationError):
+    """
+    A credit owner without advance would go negative. `lunch_ids` are the lunches whose debits
+    do not fit, taking the batch in order and skipping each debit that would overdraw.
+    """
+
+    def __init__(self, lunch_ids: list[int]):
+        super().__init__(INSUFFICIENT_CREDIT_ERROR)
+        self.lunch_ids = lunch_ids
+
+
+def build_package_usage_description(lunch: Lunch) -> str:
+    return f"Uso em almoço - {lunch.date}"
+
+
+def build_lunch_payment_description(lunch: Lunch) -> str:
+    return f"Pagamento almoço - {lunch.member.full_name} - {lunch.date}"
+
+
+def build_package_payment_description(package: Package) -> str:
+    return f"Pagamento pacote - {package.member.full_name} - {package.date}"
+
+
+def lunch_package_entry_fields(lunch: Lunch) -> dict | None:
+    if not lunch.package_id:
+        return None
+    return {
+        "package_id": lunch.package_id,
+        "entry_type": PackageEntry.EntryType.DEBITO,
+        "origin": PackageEntry.Origin.LUNCH,
+        "quantity": 1,
+        "description": build_package_usage_description(lunch),
+        "beneficiary_id": lunch.package_beneficiary_id,
+    }
+
+
+def lunch_credit_entry_fields(lunch: Lunch, *, actor: User | None = None) -> dict | None:
+    if (
+        lunch.payment_mode != Lunch.PaymentMode.TROCA
+        or lunch.credit_owner_id is None
+        or lunch.package_id
+        or lunch.value_cents <= 0
+    ):
+        return None
+    fields = {
+        "owner_id": lunch.credit_owner_id,
+        "beneficiary_id": lunch.member_id,
+        "entry_type": CreditEntry.EntryType.DEBITO,
+        "origin": CreditEntry.Origin.LUNCH,
+        "value_cents": lunch.value_cents,
+        "description": build_lunch_credit_description(lunch),
+    }
+    if actor is not None:
+        fields["created_by_id"] = actor.id
+    return fields
+
+
+def lunch_financial_entry_fields(lunch: Lunch) -> dict | None:
+    if (
+        lunch.package_id
+        or lunch.payment_mode == Lunch.PaymentMode.TROCA
+        or lunch.payment_status != Lunch.PaymentStatus.PAGO
+        or lunch.value_cents <= 0
+    ):
+        return None
+    return {
+        "entry_type": FinancialEntry.EntryType.ENTRADA,
+        "category": FinancialEntry.EntryCategory.ALMOCO,
+        "description": build_lunch_payment_description(lunch),
+        "value_cents": lunch.value_cents,
+        "date": lunch.date,
+    }
+
+
+def package_financial_entry_fields(package: Package) -> dict | None:
+    if package.payment_status != Package.PaymentStatus.PAGO or package.value_cents <= 0:
+        return None
+    return {
+        "entry_type": FinancialEntry.EntryType.ENTRADA,
+        "category": FinancialEntry.EntryCategory.ALMOCO,
+        "description": build_package_payment_description(package),
+        "value_cents": package.value_cents,
+        "date": package.date,
+    }
+
+
+class _RowChanges:
+    """Creates, updates (as `(before, after)` pairs) and deletes needed for one derived model."""
+
+    def __init__(self, model: type[models.Model]):
+        self.model = model
+        self.created: list[models.Model] = []
+        self.updated: list[tuple[models.Model, models.Model]] = []
+        self.update_fields: set[str] = set()
+        self.deleted: list[models.Model] = []
+
+    def reconcile(
+        self,
+        existing: models.Model | None,
+        target: dict | None,
+        links: dict,
+        *,
+        replace_on: tuple[str, ...] = (),
+    ) -> None:
+        if existing is not None and target is not None:
+            if any(getattr(existing, name) != target[name] for name in replace_on):
+                self.deleted.append(existing)
+                existing = None
+        if target is None:
+            if existing is not None:
+                self.deleted.append(existing)
+            return
+        if existing is None:
+            self.created.append(self.model(**links, **target))
+            return
+
+        changed = [name for name, value in target.items() if getattr(existing, name) != value]
+        for name, value in links.items():
+            setattr(existing, name, value)
+        if not changed:
+            return
+        before = copy(existing)
+        for name in changed:
+            setattr(existing, name, target[name])
+        self.updated.append((before, existing))
+        self.update_fields.update(changed)
+
+    def write(self) -> None:
+        """Deletes first, so a replaced row frees its one-to-one link before the new insert."""
+        if self.deleted:
+            self.model.objects.filter(pk__in=[row.pk for row in self.deleted]).delete()
+        if self.updated:
+            now = timezone.now()
+            rows = [after for _, after in self.updated]
+            for row in rows:
+                row.updated_at = now
+            self.model.objects.bulk_update(rows, [*self.update_fields, "updated_at"])
+        if self.created:
+            self.model.objects.bulk_create(self.created)
+
+
+def _related_or_none(instance: models.Model, name: str):
+    try:
+        return getattr(instance, name)
+    except ObjectDoesNotExist:
+        return None
+
+
+def take_package_meals(package_id: int, quantity: int) -> bool:
+    """
+    Take `quantity` meals from a package with one conditional UPDATE
+    (`remaining_quantity >= quantity`). Returns False when the balance is insufficient.
+    """
+    updated = Package.objects.filter(id=package_id, remaining_quantity__gte=quantity).update(
+        remaining_quantity=F("remaining_quantity") - quantity,
+        updated_at=timezone.now(),
+    )
+    return bool(updated)
+
+
+def give_back_package_meals(package_id: int, quantity: int, *, clamp: bool = False) -> bool:
+    """
+    Give `quantity` meals back to a package with one conditional UPDATE. Without `clamp` it only
+    applies while the result stays within the package quantity; with `clamp` the balance is
+    capped at the package quantity instead.
+    """
+    queryset = Package.objects.filter(id=package_id)
+    if clamp:
+        remaining = Least(F("remaining_quantity") + quantity, F("quantity"))
+    else:
+        queryset = queryset.filter(remaining_quantity__lte=F("quantity") - quantity)
+        remaining = F("remaining_quantity") + quantity
+    return bool(queryset.update(remaining_quantity=remaining, updated_at=timezone.now()))
+
+
+def _move_package_balances(
+    lunches: list[Lunch], targets: Mapping[int, int | None], held: Mapping[int, int | None]
+) -> None:
+    """
+    Give back the meal of every lunch that leaves a package (capped at the package quantity)
+    and take one from every package a lunch newly uses, one conditional UPDATE per package.
+    """
+    restored: Counter = Counter()
+    consumed: Counter = Counter()
+    for lunch in lunches:
+        before, after = held.get(lunch.id), targets[lunch.id]
+        if before == after:
+            continue
+        if before:
+            restored[before] += 1
+        if after:
+            consumed[after] += 1
+
+    for package_id, amount in restored.items():
+        give_back_package_meals(package_id, amount, clamp=True)
+    for package_id, amount in consumed.items():
+        if not take_package_meals(package_id, amount):
+            raise serializers.ValidationError(INSUFFICIENT_PACKAGE_ERROR)
+
+    packages = {
+        id(lunch.package): lunch.package
+        for lunch in lunches
+        if lunch.package_id and lunch.package_id in consumed
+    }
+    for package in packages.values():
+        package.remaining_quantity -= consumed[package.id]
+
+
+def _overdrawn_lunch_ids(changes: _RowChanges, owner_ids: set[int]) -> list[int]:
+    """
+    Walk the debits of `owner_ids` in batch order from their stored balances, after what deleted
+    and replaced entries give back, and return the lunches of the debits that do not fit.
+    """
+    balances = Counter(
+        dict(
+            CreditBalance.objects.filter(owner_id__in=owner_ids).values_list(
+                "owner_id", "balance_cents"
+            )
+        )
+    )
+    for entry in [*changes.deleted, *(before for before, _ in changes.updated)]:
+        balances[entry.owner_id] += entry.value_cents
+
+    overdrawn = []
+    for entry in [*(after for _, after in changes.updated), *changes.created]:
+        if entry.owner_id not in owner_ids or not entry.value_cents:
+            continue
+        if balances[entry.owner_id] < entry.value_cents:
+            overdrawn.append(entry.lunch_id)
+            continue
+        balances[entry.owner_id] -= entry.value_cents
+    return overdrawn
+
+
+def _post_credit_entries(changes: _RowChanges, owners: dict[int, Member]) -> None:
+    """
+    Write credit debit changes and move `CreditBalance` by the net delta per owner, after
+    checking that no owner without credit advance whose debt grows ends below zero. Deleted
+    entries leave the balance through the `post_delete` receiver of the credits services.
+    """
+    debits: Counter = Counter()
+    released: Counter = Counter()
+    for entry in changes.deleted:
+        debits[entry.owner_id] -= entry.value_cents
+        released[entry.owner_id] += entry.value_cents
+    for before, after in changes.updated:
+        debits[before.owner_id] -= before.value_cents
+        debits[after.owner_id] += after.value_cents
+    for entry in changes.created:
+        debits[entry.owner_id] += entry.value_cents
+    if not debits and not changes.update_fields:
+        return
+
+    lock_members(set(debits) | set(owners))
+    checked = {
+        owner.id
+        for owner in owners.values()
+        if debits[owner.id] > 0 and not can_use_credit_advance(owner)
+    }
+    if checked:
+        overdrawn = _overdrawn_lunch_ids(changes, checked)
+        if overdrawn:
+            raise InsufficientCreditError(overdrawn)
+
+    changes.write()
+    for owner_id, delta in debits.items():
+        apply_credit_balance_delta(
+            owner_id, CreditEntry.EntryType.DEBITO, delta + released[owner_id]
+        )
+
+
+def _post_financial_entries(changes: _RowChanges) -> None:
+    bulk_delete_financial_entries(changes.deleted)
+    bulk_update_financial_entries(
+        [after for _, after in changes.updated],
+        changes.update_fields,
+        before={after.id: rollup_snapshot(before) for before, after in changes.updated},
+    )
+    bulk_create_financial_entries(changes.created)
+
+
+def _post_lunches(
+    lunches: list[Lunch],
+    *,
+    actor: User | None,
+    held_package_ids: Mapping[int, int | None],
+    created: bool,
+    remove: bool,
+) -> None:
+    existing = {}
+    if not created:
+        existing = {
+            lunch.id: lunch
+            for lunch in Lunch.objects.filter(id__in=[lunch.id for lunch in lunches])
+            .select_related("package_entry", "credit_entry", "financial_entry")
+            .only("id", "package_entry", "credit_entry", "financial_entry")
+        }
+
+    package_entries = _RowChanges(PackageEntry)
+    credit_entries = _RowChanges(CreditEntry)
+    financial_entries = _RowChanges(FinancialEntry)
+    credit_owners: dict[int, Member] = {}
+    target_packages: dict[int, int | None] = {}
+    for lunch in lunches:
+        stored = existing.get(lunch.id)
+        links = {"lunch": lunch}
+        package_target = None if remove else lunch_package_entry_fields(lunch)
+        credit_target = None if remove else lunch_credit_entry_fields(lunch, actor=actor)
+        financial_target = None if remove else lunch_financial_entry_fields(lunch)
+        package_entries.reconcile(
+            stored and _related_or_none(stored, "package_entry"),
+            package_target,
+            links,
+            replace_on=("package_id",),
+        )
+        credit_entries.reconcile(
+            stored and _related_or_none(stored, "credit_entry"), credit_target, links
+        )
+        financial_entries.reconcile(
+            stored and _related_or_none(stored, "financial_entry"), financial_target, links
+        )
+        target_packages[lunch.id] = package_target and package_target["package_id"]
+        if credit_target is not None:
+            credit_owners[lunch.credit_owner_id] = lunch.credit_owner
+
+    _move_package_balances(lunches, target_packages, held_package_ids)
+    package_entries.write()
+    _post_credit_entries(credit_entries, credit_owners)
+    _post_financial_entries(financial_entries)
+    if created:
+        promote_roles([lunch.member for lunch in lunches], Member.Role.MENSALISTA)
+
+
+@transaction.atomic(savepoint=False)
+def post_lunches(
+    lunches: Iterable[Lunch],
+    *,
+    actor: User | None = None,
+    held_package_ids: Mapping[int, int | None] | None = None,
+    created: bool = False,
+) -> None:
+    """
+    Bring the derived rows and balances of already-saved lunches in line with their fields.
+
+    `held_package_ids` maps a lunch id to the package it already holds a meal of: the package
+    it had before an update, or the one bulk registration reserved up front. Lunches not in
+    it take a meal from their package. With `created`, the lunches were just inserted and the
+    prefetch of existing rows is skipped. Raises `ValidationError` when a package has no
+    balance left, or `InsufficientCreditError` when a credit owner without advance would go
+    negative; the postings join the
+    caller's transaction without a savepoint, so the caller's atomic block rolls back whole.
+    """
+    lunches = list(lunches)
+    if lunches:
+        _post_lunches(
+            lunches,
+            actor=actor,
+            held_package_ids=held_package_ids or {},
+            created=created,
+            remove=False,
+        )
+
+
+@transaction.atomic(savepoint=False)
+def unpost_lunches(lunches: Iterable[Lunch]) -> None:
+    """Remove the derived rows of lunches about to be deleted and give their meals back."""
+    lunches = list(lunches)
+    if lunches:
+        _post_lunches(
+            lunches,
+            actor=None,
+            held_package_ids={lunch.id: lunch.package_id for lunch in lunches},
+            created=False,
+            remove=True,
+        )
+
+
+def _post_packages(packages: list[Package], *, created: bool, remove: bool) -> None:
+    existing = {}
+    if not created:
+        existing = {
+            entry.package_id: entry for entry in FinancialEntry.objects.filter(package__in=packages)
+        }
+    financial_entries = _RowChanges(FinancialEntry)
+    for package in packages:
+        financial_entries.reconcile(
+            existing.get(package.id),
+            None if remove else package_financial_entry_fields(package),
+            {"package": package},
+        )
+    _post_financial_entries(financial_entries)
+    if created:
+        promote_roles([package.member for package in packages], Member.Role.MENSALISTA)
+
+
+@transaction.atomic(savepoint=False)
+def post_packages(packages: Iterable[Package], *, created: bool = False) -> None:
+    """Bring the financial entry of already-saved packages in line with their payment."""
+    packages = list(packages)
+    if packages:
+        _post_packages(packages, created=created, remove=False)
+
+
+@transaction.atomic(savepoint=False)
+def unpost_packages(packages: Iterable[Package]) -> None:
+    """Remove the financial entry of packages about to be deleted."""
+    packages = list(packages)
+    if packages:
+        _post_packages(packages, created=False, remove=True)
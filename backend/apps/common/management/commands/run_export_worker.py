@@ -0,0 +1,39 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from apps.common.export_jobs import process_pending_export_jobs, purge_export_jobs
+
+
+class Command(BaseCommand):
+    help = "Processa a fila de exportações em segundo plano."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Processa os pedidos pendentes e encerra.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=settings.EXPORT_WORKER_POLL_INTERVAL,
+            help="Intervalo, em segundos, entre consultas à fila.",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            try:
+                processed = process_pending_export_jobs()
+                purged = purge_export_jobs(settings.EXPORT_JOB_RETENTION_DAYS)
+            finally:
+                close_old_connections()
+            if processed or purged:
+                self.stdout.write(
+                    f"{processed} exportação(ões) processada(s), {purged} removida(s)."
+                )
+            if options["once"]:
+                return
+            time.sleep(options["interval"])
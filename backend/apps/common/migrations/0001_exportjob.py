@@ -0,0 +1,94 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:39
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ExportJob",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                (
+                    "source",
+                    models.CharField(help_text="Export source, e.g. `financial`.", max_length=50),
+                ),
+                (
+                    "export_format",
+                    models.CharField(
+                        choices=[("xlsx", "XLSX"), ("csv", "CSV"), ("tsv", "TSV")],
+                        default="xlsx",
+                        max_length=10,
+                    ),
+                ),
+                (
+                    "params",
+                    models.JSONField(
+                        blank=True, default=dict, help_text="Filter query parameters."
+                    ),
+                ),
+                ("params_hash", models.CharField(max_length=64)),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("PENDENTE", "Pendente"),
+                            ("PROCESSANDO", "Processando"),
+                            ("CONCLUIDO", "Concluído"),
+                            ("ERRO", "Erro"),
+                        ],
+                        default="PENDENTE",
+                        max_length=20,
+                    ),
+                ),
+                (
+                    "source_version",
+                    models.JSONField(
+                        blank=True,
+                        help_text="Watermark of the exported tables when the file was built.",
+                        null=True,
+                    ),
+                ),
+                ("filename", models.CharField(blank=True, max_length=150)),
+                ("content", models.BinaryField(blank=True, null=True)),
+                ("row_count", models.PositiveIntegerField(blank=True, null=True)),
+                ("error", models.TextField(blank=True)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("started_at", models.DateTimeField(blank=True, null=True)),
+                ("finished_at", models.DateTimeField(blank=True, null=True)),
+                (
+                    "requested_by",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="export_jobs",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["-created_at", "-id"],
+                "indexes": [
+                    models.Index(
+                        fields=["params_hash", "status"], name="common_exportjob_lookup_idx"
+                    ),
+                    models.Index(fields=["status", "id"], name="common_exportjob_queue_idx"),
+                ],
+            },
+        ),
+    ]
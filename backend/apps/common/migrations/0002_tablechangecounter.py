@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("common", "0001_exportjob"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TableChangeCounter",
+            fields=[
+                ("table", models.CharField(max_length=100, primary_key=True, serialize=False)),
+                ("changes", models.BigIntegerField(default=0)),
+            ],
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:50
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def drop_stored_results(apps, schema_editor):
+    """
+    Finished jobs lose their stored content with the column, so they are dropped (the next
+    request queues them again), and only the newest queued or running job of each export is
+    kept active for the new constraint.
+    """
+    export_job_model = apps.get_model("common", "ExportJob")
+    export_job_model.objects.filter(status="CONCLUIDO").delete()
+    seen = set()
+    active = export_job_model.objects.filter(status__in=["PENDENTE", "PROCESSANDO"])
+    for job_id, params_hash in active.order_by("-id").values_list("id", "params_hash"):
+        if params_hash in seen:
+            export_job_model.objects.filter(id=job_id).update(
+                status="ERRO", error="Pedido duplicado descartado."
+            )
+        seen.add(params_hash)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("common", "0002_tablechangecounter"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_stored_results, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name="exportjob",
+            name="content",
+        ),
+        migrations.AddField(
+            model_name="exportjob",
+            name="file",
+            field=models.FileField(blank=True, editable=False, upload_to="exports/"),
+        ),
+        migrations.AddConstraint(
+            model_name="exportjob",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("status__in", ["PENDENTE", "PROCESSANDO"])),
+                fields=("params_hash",),
+                name="common_exportjob_active_unique",
+            ),
+        ),
+    ]
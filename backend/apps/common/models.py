@@ -0,0 +1,71 @@
+from django.conf import settings
+from django.db import models
+
+
+class ExportJob(models.Model):
+    class Status(models.TextChoices):
+        PENDENTE = "PENDENTE", "Pendente"
+        PROCESSANDO = "PROCESSANDO", "Processando"
+        CONCLUIDO = "CONCLUIDO", "Concluído"
+        ERRO = "ERRO", "Erro"
+
+    class Format(models.TextChoices):
+        XLSX = "xlsx", "XLSX"
+        CSV = "csv", "CSV"
+        TSV = "tsv", "TSV"
+
+    source = models.CharField(max_length=50, help_text="Export source, e.g. `financial`.")
+    export_format = models.CharField(max_length=10, choices=Format.choices, default=Format.XLSX)
+    params = models.JSONField(default=dict, blank=True, help_text="Filter query parameters.")
+    params_hash = models.CharField(max_length=64)
+    status = models.CharField(max_length=20, choices=Status.choices, default=Status.PENDENTE)
+    source_version = models.JSONField(
+        null=True,
+        blank=True,
+        help_text="Watermark of the exported tables when the file was built.",
+    )
+    filename = models.CharField(max_length=150, blank=True)
+    file = models.FileField(upload_to="exports/", blank=True, editable=False)
+    row_count = models.PositiveIntegerField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    requested_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name="export_jobs",
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-created_at", "-id"]
+        indexes = [
+            models.Index(fields=["params_hash", "status"], name="common_exportjob_lookup_idx"),
+            models.Index(fields=["status", "id"], name="common_exportjob_queue_idx"),
+        ]
+        constraints = [
+            # One queued or running job per export: concurrent requests share it.
+            models.UniqueConstraint(
+                fields=["params_hash"],
+                condition=models.Q(status__in=["PENDENTE", "PROCESSANDO"]),
+                name="common_exportjob_active_unique",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.source}.{self.export_format} #{self.pk} ({self.get_status_display()})"
+
+
+class TableChangeCounter(models.Model):
+    """
+    Per-table count of the writes `MAX(updated_at)` cannot see: deletes and many-to-many
+    changes. Bumped by the receivers in `apps.common.watermarks`.
+    """
+
+    table = models.CharField(max_length=100, primary_key=True)
+    changes = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.table}: {self.changes}"
@@ -1,4 +1,22 @@
-from rest_framework.pagination import PageNumberPagination
+import base64
+import binascii
+import hashlib
+import json
+from functools import partial, reduce
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from apps.common.watermarks import table_watermark
 
 
 class DefaultPagination(PageNumberPagination):
@@ -7,8 +25,303 @@ class DefaultPagination(PageNumberPagination):
     max_page_size = 200
 
 
-class OptionalPagination(DefaultPagination):
+class CountingPaginator(Paginator):
+    """Django paginator whose `count` comes from a callable instead of `QuerySet.count()`."""
+
+    def __init__(self, object_list, per_page, *, count_function, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.count_function = count_function
+
+    @cached_property
+    def count(self):
+        return self.count_function(self.object_list)
+
+
+class UncountedPage(list):
+    """A page fetched with one extra row to learn whether a next page exists, without COUNT."""
+
+    def __init__(self, rows, number: int, has_next: bool):
+        super().__init__(rows)
+        self.number = number
+        self._has_next = has_next
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self.number > 1
+
+    def next_page_number(self):
+        return self.number + 1
+
+    def previous_page_number(self):
+        return self.number - 1
+
+
+class CachedCountPagination(DefaultPagination):
+    """
+    Page-number pagination that caches the total per (count SQL, params, table watermark), so
+    repeated pages of an unchanged list skip `COUNT(*)`. `?count=` picks the mode:
+
+    - `exact` (default): cached exact count
+    - `estimate`: the planner's row estimate on Postgres (`count_estimated: true` in the
+      response); other databases fall back to the cached exact count
+    - `false`: no count at all; the page reads one extra row to know whether `next` exists
+
+    The watermark is the one `ConditionalGetMixin` already read for the view when it covers the
+    queryset model; otherwise the model's own, which is read from indexes (no `COUNT(*)`).
+    """
+
+    count_query_param = "count"
+    count_modes = ("exact", "estimate", "false")
+    invalid_count_message = "Use count=exact, count=estimate ou count=false."
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.count_mode = request.query_params.get(self.count_query_param) or "exact"
+        if self.count_mode not in self.count_modes:
+            raise ValidationError({self.count_query_param: [self.invalid_count_message]})
+        self.count_estimated = False
+        self.view = view
+        if self.count_mode == "false":
+            return self._paginate_without_count(queryset, request)
+        self.django_paginator_class = partial(CountingPaginator, count_function=self.get_count)
+        return super().paginate_queryset(queryset, request, view=view)
+
+    def get_count(self, queryset) -> int:
+        if self.count_mode == "estimate":
+            estimate = self._estimate_count(queryset)
+            if estimate is not None:
+                self.count_estimated = True
+                return estimate
+        return self._cached_count(queryset)
+
+    def get_paginated_response(self, data):
+        if self.count_mode == "false":
+            return Response(
+                {
+                    "next": self.get_next_link(),
+                    "previous": self.get_previous_link(),
+                    "results": data,
+                }
+            )
+        response = super().get_paginated_response(data)
+        if self.count_estimated:
+            response.data["count_estimated"] = True
+        return response
+
+    def _paginate_without_count(self, queryset, request):
+        self.request = request
+        page_size = self.get_page_size(request)
+        try:
+            number = int(request.query_params.get(self.page_query_param) or 1)
+        except ValueError:
+            number = 0
+        if number < 1:
+            raise NotFound(self.invalid_page_message)
+        offset = (number - 1) * page_size
+        rows = list(queryset[offset : offset + page_size + 1])
+        self.page = UncountedPage(rows[:page_size], number, has_next=len(rows) > page_size)
+        return list(self.page)
+
+    def _cached_count(self, queryset) -> int:
+        sql, params = queryset.query.sql_with_params()
+        watermark = getattr(self.view, "watermark", None)
+        if not watermark or queryset.model._meta.label_lower not in watermark:
+            watermark = table_watermark(queryset.model)
+        key_source = json.dumps([sql, params, watermark], default=str, sort_keys=True)
+        cache_key = "pagination:count:" + hashlib.sha256(key_source.encode("utf-8")).hexdigest()
+        count = cache.get(cache_key)
+        if count is None:
+            count = queryset.count()
+            cache.set(cache_key, count, timeout=settings.PAGINATION_COUNT_CACHE_TIMEOUT)
+        return count
+
+    @staticmethod
+    def _estimate_count(queryset) -> int | None:
+        connection = connections[queryset.db]
+        if connection.vendor != "postgresql":
+            return None
+        sql, params = queryset.order_by().query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+            plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+
+
+class OptionalPagination(CachedCountPagination):
     def paginate_queryset(self, queryset, request, view=None):
         if request.query_params.get(self.page_query_param) is None:
             return None
         return super().paginate_queryset(queryset, request, view=view)
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset (seek) pagination over a unique ordering, e.g. ("full_name", "id").
+
+    The cursor stores the ordering values of the last row returned, so every page is a
+    `WHERE (a, b) > (x, y) ORDER BY a, b LIMIT n` query: no OFFSET and no COUNT(*).
+    Views may override the ordering with a `keyset_ordering` attribute.
+    """
+
+    cursor_query_param = "cursor"
+    page_size = DefaultPagination.page_size
+    page_size_query_param = DefaultPagination.page_size_query_param
+    max_page_size = DefaultPagination.max_page_size
+    ordering: tuple[str, ...] = ("-id",)
+    invalid_cursor_message = "Cursor inválido."
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.ordering = tuple(getattr(view, "keyset_ordering", None) or self.ordering)
+        page_size = self.get_page_size(request)
+
+        position, reverse = self.decode_cursor(request)
+        ordering = self._reverse_ordering(self.ordering) if reverse else self.ordering
+
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            try:
+                queryset = queryset.filter(self._seek_filter(ordering, position))
+            except (DjangoValidationError, ValueError, TypeError) as exc:
+                # Cursor values the ordering columns cannot hold, e.g. text for a date.
+                raise NotFound(self.invalid_cursor_message) from exc
+
+        results = list(queryset[: page_size + 1])
+        has_more = len(results) > page_size
+        results = results[:page_size]
+        if reverse:
+            results.reverse()
+
+        self.next_position = None
+        self.previous_position = None
+        if results:
+            if has_more or reverse:
+                self.next_position = self._row_position(results[-1])
+            if position is not None and (has_more or not reverse):
+                self.previous_position = self._row_position(results[0])
+        return results
+
+    def get_page_size(self, request):
+        value = request.query_params.get(self.page_size_query_param)
+        try:
+            size = int(value) if value else self.page_size
+        except ValueError:
+            size = self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def get_next_link(self):
+        if self.next_position is None:
+            return None
+        return self.encode_cursor(self.next_position, reverse=False)
+
+    def get_previous_link(self):
+        if self.previous_position is None:
+            return None
+        return self.encode_cursor(self.previous_position, reverse=True)
+
+    def get_paginated_response(self, data):
+        return Response(
+            {
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+                "results": data,
+            }
+        )
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded.encode("ascii")).decode("utf-8"))
+            position = payload["p"]
+            reverse = bool(payload.get("r", False))
+        except (binascii.Error, UnicodeError, ValueError, KeyError, TypeError) as exc:
+            raise NotFound(self.invalid_cursor_message) from exc
+        if not isinstance(position, list) or len(position) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        return position, reverse
+
+    def encode_cursor(self, position, *, reverse):
+        payload = {"p": position}
+        if reverse:
+            payload["r"] = True
+        raw = json.dumps(payload, default=str, separators=(",", ":")).encode("utf-8")
+        encoded = base64.urlsafe_b64encode(raw).decode("ascii")
+        url = remove_query_param(self.base_url, self.cursor_query_param)
+        return replace_query_param(url, self.cursor_query_param, encoded)
+
+    def _row_position(self, row):
+        position = []
+        for field in self.ordering:
+            value = row
+            for attr in field.lstrip("-").split("__"):
+                value = value.get(attr) if isinstance(value, dict) else getattr(value, attr)
+            position.append(value if isinstance(value, int | str) else str(value))
+        return position
+
+    @staticmethod
+    def _reverse_ordering(ordering):
+        return tuple(field[1:] if field.startswith("-") else f"-{field}" for field in ordering)
+
+    @staticmethod
+    def _seek_filter(ordering, position):
+        clauses = []
+        for index, field in enumerate(ordering):
+            name = field.lstrip("-")
+            lookup = "lt" if field.startswith("-") else "gt"
+            equal_prefix = {
+                prefix.lstrip("-"): value
+                for prefix, value in zip(ordering[:index], position[:index], strict=True)
+            }
+            clauses.append(Q(**equal_prefix, **{f"{name}__{lookup}": position[index]}))
+        return reduce(lambda left, right: left | right, clauses)
+
+
+class CursorOptInPagination(BasePagination):
+    """
+    Page-number pagination by default; `?cursor=` (empty for the first page) switches the
+    request to `KeysetPagination` over the view's `keyset_ordering`, which should be the
+    view's natural ordering plus a unique tiebreaker, e.g. `("-date", "-created_at", "-id")`.
+    Deep cursor pages cost neither an OFFSET scan nor a COUNT(*).
+    """
+
+    page_pagination_class = CachedCountPagination
+    cursor_pagination_class = KeysetPagination
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.cursor_pagination_class.cursor_query_param in request.query_params:
+            self.paginator = self.cursor_pagination_class()
+        else:
+            self.paginator = self.page_pagination_class()
+        return self.paginator.paginate_queryset(queryset, request, view=view)
+
+    def get_paginated_response(self, data):
+        return self.paginator.get_paginated_response(data)
+
+    def get_paginated_response_schema(self, schema):
+        return self.page_pagination_class().get_paginated_response_schema(schema)
+
+    def get_schema_operation_parameters(self, view):
+        return self.page_pagination_class().get_schema_operation_parameters(view)
+
+
+class CursorOptionalPagination(CursorOptInPagination):
+    """`OptionalPagination` (unpaginated without `?page=`) plus the `?cursor=` opt-in."""
+
+    page_pagination_class = OptionalPagination
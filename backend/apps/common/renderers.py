@@ -0,0 +1,63 @@
+import json
+from collections.abc import Iterable, Iterator
+
+from rest_framework.compat import LONG_SEPARATORS, SHORT_SEPARATORS
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+
+class DelimitedTextRenderer(BaseRenderer):
+    """
+    Lets `?format=csv|tsv` through DRF content negotiation on export actions. The file itself is
+    streamed by `apps.common.exports`; this renderer only renders error payloads.
+    """
+
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        if isinstance(data, str | bytes):
+            return data
+        return json.dumps(data, ensure_ascii=False)
+
+
+class CSVRenderer(DelimitedTextRenderer):
+    media_type = "text/csv"
+    format = "csv"
+
+
+class TSVRenderer(DelimitedTextRenderer):
+    media_type = "text/tab-separated-values"
+    format = "tsv"
+
+
+class StreamingJSONArrayRenderer:
+    """
+    Renders a JSON array piece by piece from chunks of already-serialized rows, with the same
+    encoder and options as DRF's `JSONRenderer`, for use as `StreamingHttpResponse` content.
+    """
+
+    media_type = "application/json"
+    charset = "utf-8"
+
+    def iter_render(self, chunks: Iterable[list]) -> Iterator[bytes]:
+        renderer = JSONRenderer()
+        separators = SHORT_SEPARATORS if renderer.compact else LONG_SEPARATORS
+        first = True
+        yield b"["
+        for chunk in chunks:
+            if not chunk:
+                continue
+            items = ",".join(
+                json.dumps(
+                    item,
+                    cls=renderer.encoder_class,
+                    ensure_ascii=renderer.ensure_ascii,
+                    allow_nan=not renderer.strict,
+                    separators=separators,
+                )
+                for item in chunk
+            )
+            yield (items if first else "," + items).encode(self.charset)
+            first = False
+        yield b"]"
@@ -1,3 +1,8 @@
+from collections.abc import Iterable
+
+from django.db.models import Case, IntegerField, Value, When
+from django.utils import timezone
+
 from apps.users.models import Member
 
 ROLE_PRIORITY = {
@@ -7,14 +12,33 @@ ROLE_PRIORITY = {
 }
 
 
-def promote_role(member: Member, target: str) -> Member:
+def role_priority() -> Case:
+    """`ROLE_PRIORITY` as a SQL expression over `Member.role` (no role counts as the lowest)."""
+    return Case(
+        *(When(role=role, then=Value(priority)) for role, priority in ROLE_PRIORITY.items()),
+        default=Value(0),
+        output_field=IntegerField(),
+    )
+
+
+def promote_roles(members: Iterable[Member | int], target: str) -> int:
     """
-    Promote a member to the target role if it has higher priority than the current one.
-    Returns the (possibly updated) member instance.
+    Promote every given member (instances or ids) whose role has lower priority than `target`,
+    with a single UPDATE whose priority comparison runs in SQL, so a stale instance never
+    demotes anyone. Instances passed in get the new role in memory. Returns the rows updated.
     """
-    current_priority = ROLE_PRIORITY.get(member.role, 0)
+    members = list(members)
+    member_ids = {member.pk if isinstance(member, Member) else member for member in members}
+    if not member_ids:
+        return 0
     target_priority = ROLE_PRIORITY.get(target, 0)
-    if target_priority > current_priority:
-        member.role = target
-        member.save(update_fields=["role"])
-    return member
+    updated = (
+        Member.objects.filter(id__in=member_ids)
+        .alias(role_priority=role_priority())
+        .filter(role_priority__lt=target_priority)
+        .update(role=target, updated_at=timezone.now())
+    )
+    for member in members:
+        if isinstance(member, Member) and ROLE_PRIORITY.get(member.role, 0) < target_priority:
+            member.role = target
+    return updated
@@ -0,0 +1,42 @@
+import unicodedata
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db import DatabaseError
+
+SEARCH_TEXT_SEPARATOR = "\n"
+TRIGRAM_EXTENSION_ERROR = (
+    "A extensão pg_trgm não está instalada e o usuário do banco não tem permissão para criá-la. "
+    "Um superusuário do Postgres deve executar `CREATE EXTENSION pg_trgm;` neste banco antes "
+    "das migrations."
+)
+
+
+def normalize_search_text(value: str) -> str:
+    normalized = unicodedata.normalize("NFKD", value)
+    return "".join(char for char in normalized if not unicodedata.combining(char)).casefold()
+
+
+def build_search_text(*values: str | None) -> str:
+    """
+    Join the normalized values into a single stored search column. The separator keeps a
+    query from matching across two values.
+    """
+    return SEARCH_TEXT_SEPARATOR.join(
+        normalize_search_text(value).strip() for value in values if value
+    )
+
+
+def ensure_trigram_extension(connection) -> None:
+    """
+    Install pg_trgm on a Postgres `connection` unless it is already there. Since Postgres 13
+    it is a trusted extension, so the database owner may create it; older servers need a
+    superuser to run `CREATE EXTENSION pg_trgm` once beforehand, after which this only checks.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+        if cursor.fetchone():
+            return
+        try:
+            cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        except DatabaseError as exc:
+            raise ImproperlyConfigured(TRIGRAM_EXTENSION_ERROR) from exc
@@ -0,0 +1,28 @@
+from rest_framework import serializers
+
+from apps.common.models import ExportJob
+
+
+class ExportJobSerializer(serializers.ModelSerializer):
+    format = serializers.CharField(source="export_format", read_only=True)
+    download_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ExportJob
+        fields = [
+            "id",
+            "source",
+            "format",
+            "params",
+            "status",
+            "row_count",
+            "error",
+            "download_url",
+            "created_at",
+            "started_at",
+            "finished_at",
+        ]
+        read_only_fields = fields
+
+    def get_download_url(self, obj: ExportJob) -> str | None:
+        return self.context.get("download_url")
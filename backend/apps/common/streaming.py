@@ -0,0 +1,62 @@
+from collections.abc import Iterator
+from itertools import islice
+
+from django.conf import settings
+from django.db.models import QuerySet
+from django.http import StreamingHttpResponse
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+
+from apps.common.renderers import StreamingJSONArrayRenderer
+
+STREAM_CHUNK_SIZE = 500
+
+
+class PaginationRequired(APIException):
+    status_code = status.HTTP_400_BAD_REQUEST
+    default_code = "pagination_required"
+
+
+class StreamingListMixin:
+    """
+    For viewsets whose pagination returns `None` when the client asks for the whole list
+    (`OptionalPagination` without `?page=`): the list is read with `queryset.iterator()` and
+    written as a streamed JSON array, serializing `stream_chunk_size` rows at a time instead
+    of building the entire payload in memory. Lists longer than `UNPAGINATED_LIST_MAX_ROWS`
+    are refused with a `400` asking the client to paginate.
+    """
+
+    stream_chunk_size = STREAM_CHUNK_SIZE
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+
+        self.ensure_within_row_cap(queryset)
+        if not isinstance(request.accepted_renderer, JSONRenderer):
+            # The browsable API renders the whole payload anyway.
+            return Response(self.get_serializer(queryset, many=True).data)
+
+        renderer = StreamingJSONArrayRenderer()
+        return StreamingHttpResponse(
+            renderer.iter_render(self.iter_serialized_chunks(queryset)),
+            content_type=f"{renderer.media_type}; charset={renderer.charset}",
+        )
+
+    def ensure_within_row_cap(self, queryset: QuerySet) -> None:
+        max_rows = settings.UNPAGINATED_LIST_MAX_ROWS
+        if queryset.order_by()[max_rows : max_rows + 1].exists():
+            raise PaginationRequired(
+                f"A lista tem mais de {max_rows} registros. "
+                "Use ?page= (ou ?cursor=, quando disponível) para paginar."
+            )
+
+    def iter_serialized_chunks(self, queryset: QuerySet) -> Iterator[list]:
+        rows = queryset.iterator(chunk_size=self.stream_chunk_size)
+        while chunk := list(islice(rows, self.stream_chunk_size)):
+            yield self.get_serializer(chunk, many=True).data
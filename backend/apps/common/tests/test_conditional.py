@@ -0,0 +1,97 @@
+import pytest
+from django.contrib.auth import get_user_model
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+
+from apps.duties.tests.factories import DutyFactory
+from apps.lunch.tests.factories import LunchFactory
+from apps.users.models import Member
+from apps.users.tests.factories import MemberFactory
+
+User = get_user_model()
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture
+def superuser():
+    return User.objects.create_superuser(
+        username="admin",
+        email="admin@example.com",
+        password="strong-password",
+    )
+
+
+@pytest.mark.django_db
+def test_list_answers_if_none_match_with_304_until_a_source_table_changes(
+    api_client, superuser, django_assert_num_queries
+):
+    lunch = LunchFactory()
+    other = LunchFactory()
+    url = reverse("lunch-list")
+    api_client.force_authenticate(user=superuser)
+
+    response = api_client.get(url)
+    etag = response["ETag"]
+    assert response.status_code == 200
+    assert response.has_header("Last-Modified")
+
+    with django_assert_num_queries(1):
+        response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 304
+    assert response["ETag"] == etag
+    assert not response.content
+
+    assert api_client.get(f"{url}?payment_status=PAGO", HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+    # Lunch rows embed the member name, so renaming a member is a change too.
+    lunch.member.full_name = "Outro nome"
+    lunch.member.save()
+    response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    etag = response["ETag"]
+
+    # Deleting a row that is not the latest one leaves MAX(updated_at) alone.
+    lunch.delete()
+    assert other.updated_at > lunch.updated_at
+    response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert response["ETag"] != etag
+
+
+@pytest.mark.django_db
+def test_many_to_many_writes_move_the_watermark(api_client, superuser):
+    duty = DutyFactory()
+    member = MemberFactory(role=Member.Role.SUSTENTADOR)  # no role promotion to see
+    api_client.force_authenticate(user=superuser)
+    url = reverse("duty-list")
+    etag = api_client.get(url)["ETag"]
+
+    # Scheduling the member links them to the duty through `Duty.members` only.
+    response = api_client.post(
+        reverse("agenda-entry-list"),
+        {"date": "2026-03-02", "start_time": "09:00", "duty": duty.id, "member_ids": [member.id]},
+        format="json",
+    )
+    assert response.status_code == 201
+    assert duty.members.filter(id=member.id).exists()
+
+    response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert response["ETag"] != etag
+
+
+@pytest.mark.django_db
+def test_summary_views_and_uncovered_actions(api_client, superuser):
+    api_client.force_authenticate(user=superuser)
+
+    for name in ("dashboard-summary", "financial-summary"):
+        etag = api_client.get(reverse(name))["ETag"]
+        assert api_client.get(reverse(name), HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+    response = api_client.get(reverse("financial-entry-export-job-detail", args=[1]))
+    assert response.status_code == 404
+    assert not response.has_header("ETag")
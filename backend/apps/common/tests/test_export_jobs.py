@@ -0,0 +1,169 @@
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+
+from apps.common.export_jobs import process_pending_export_jobs, purge_export_jobs
+from apps.common.models import ExportJob
+from apps.financial.models import FinancialEntry
+from apps.financial.tests.factories import FinancialEntryFactory
+
+User = get_user_model()
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture
+def superuser():
+    return User.objects.create_superuser(
+        username="admin",
+        email="admin@example.com",
+        password="strong-password",
+    )
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    return tmp_path
+
+
+def request_job(api_client, **filters):
+    url = reverse("financial-entry-export-jobs")
+    if filters:
+        url = f"{url}?{'&'.join(f'{key}={value}' for key, value in filters.items())}"
+    return api_client.post(url, {"format": "csv"}, format="json")
+
+
+@pytest.mark.django_db
+def test_export_job_is_built_by_worker_and_downloaded(api_client, superuser):
+    FinancialEntryFactory(description="Entrada A", date="2026-01-10")
+    FinancialEntryFactory(description="Entrada B", date="2026-02-10")
+    api_client.force_authenticate(user=superuser)
+
+    response = request_job(api_client, date_from="2026-02-01")
+
+    assert response.status_code == 202
+    assert response.data["status"] == ExportJob.Status.PENDENTE
+    assert response.data["params"] == {"date_from": "2026-02-01"}
+    job_id = response.data["id"]
+
+    download_url = reverse("financial-entry-export-job-download", kwargs={"job_id": job_id})
+    assert api_client.get(download_url).status_code == 409
+
+    assert process_pending_export_jobs() == 1
+
+    detail = api_client.get(reverse("financial-entry-export-job-detail", kwargs={"job_id": job_id}))
+    assert detail.data["status"] == ExportJob.Status.CONCLUIDO
+    assert detail.data["row_count"] == 1
+    assert detail.data["download_url"].endswith(download_url)
+
+    download = api_client.get(download_url)
+    assert download.status_code == 200
+    assert download["Content-Disposition"] == 'attachment; filename="financeiro.csv"'
+    lines = b"".join(download.streaming_content).decode("utf-8-sig").splitlines()
+    assert len(lines) == 2
+    assert "Entrada B" in lines[1]
+
+
+@pytest.mark.django_db
+def test_export_job_is_reused_until_the_table_changes(api_client, superuser):
+    FinancialEntryFactory()
+    api_client.force_authenticate(user=superuser)
+
+    first = request_job(api_client, entry_type=FinancialEntry.EntryType.ENTRADA)
+    queued_again = request_job(api_client, entry_type=FinancialEntry.EntryType.ENTRADA)
+    assert queued_again.status_code == 200
+    assert queued_again.data["id"] == first.data["id"]
+
+    process_pending_export_jobs()
+    reused = request_job(api_client, entry_type=FinancialEntry.EntryType.ENTRADA)
+    assert reused.status_code == 200
+    assert reused.data["id"] == first.data["id"]
+    assert reused.data["status"] == ExportJob.Status.CONCLUIDO
+
+    other_filters = request_job(api_client, entry_type=FinancialEntry.EntryType.SAIDA)
+    assert other_filters.status_code == 202
+
+    FinancialEntryFactory()
+    rebuilt = request_job(api_client, entry_type=FinancialEntry.EntryType.ENTRADA)
+    assert rebuilt.status_code == 202
+    assert rebuilt.data["id"] != first.data["id"]
+
+
+@pytest.mark.django_db
+def test_export_job_rejects_invalid_format_and_filters(api_client, superuser):
+    api_client.force_authenticate(user=superuser)
+    url = reverse("financial-entry-export-jobs")
+
+    assert api_client.post(url, {"format": "pdf"}, format="json").status_code == 400
+    assert api_client.post(f"{url}?date_from=ontem", {}, format="json").status_code == 400
+    assert ExportJob.objects.count() == 0
+
+
+@pytest.mark.django_db
+def test_stale_processing_job_is_failed_replaced_and_purged(api_client, superuser, settings):
+    settings.EXPORT_JOB_STALE_TIMEOUT = 60
+    api_client.force_authenticate(user=superuser)
+    first = request_job(api_client)
+    # A worker claimed the job and died before finishing it.
+    ExportJob.objects.filter(id=first.data["id"]).update(
+        status=ExportJob.Status.PROCESSANDO,
+        started_at=timezone.now() - timedelta(minutes=5),
+    )
+
+    replacement = request_job(api_client)
+    assert replacement.status_code == 202
+    assert replacement.data["id"] != first.data["id"]
+
+    assert process_pending_export_jobs() == 1
+    stale = ExportJob.objects.get(id=first.data["id"])
+    assert stale.status == ExportJob.Status.ERRO
+    assert stale.finished_at is not None
+    assert ExportJob.objects.get(id=replacement.data["id"]).status == ExportJob.Status.CONCLUIDO
+
+    abandoned = ExportJob.objects.create(
+        source="financial",
+        params_hash="abandoned",
+        status=ExportJob.Status.PROCESSANDO,
+        started_at=timezone.now() - timedelta(days=10),
+    )
+    ExportJob.objects.filter(id=abandoned.id).update(created_at=timezone.now() - timedelta(days=10))
+    assert purge_export_jobs(retention_days=7) == 1
+    assert not ExportJob.objects.filter(id=abandoned.id).exists()
+
+
+@pytest.mark.django_db
+def test_export_files_live_in_storage_and_are_purged_with_their_job(
+    api_client, superuser, media_root
+):
+    FinancialEntryFactory()
+    api_client.force_authenticate(user=superuser)
+    job_id = request_job(api_client).data["id"]
+    process_pending_export_jobs()
+
+    job = ExportJob.objects.get(id=job_id)
+    stored = media_root / job.file.name
+    assert stored.exists()
+
+    ExportJob.objects.filter(id=job_id).update(created_at=timezone.now() - timedelta(days=10))
+    assert purge_export_jobs(retention_days=7) == 1
+    assert not stored.exists()
+
+
+@pytest.mark.django_db
+def test_only_one_queued_job_per_export():
+    fields = {"source": "financial", "export_format": "csv", "params_hash": "same-filters"}
+    ExportJob.objects.create(**fields)
+
+    with pytest.raises(IntegrityError), transaction.atomic():
+        ExportJob.objects.create(**fields, status=ExportJob.Status.PROCESSANDO)
+    ExportJob.objects.create(**fields, status=ExportJob.Status.CONCLUIDO)
+    assert ExportJob.objects.count() == 2
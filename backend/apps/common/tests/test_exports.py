@@ -1,4 +1,10 @@
-from apps.common.exports import sanitize_excel_value
+from io import BytesIO
+
+import pytest
+from openpyxl import load_workbook
+from rest_framework import viewsets
+
+from apps.common.exports import ExportMixin, create_xlsx_response, sanitize_excel_value
 
 
 def test_sanitize_excel_value_prefixes_formula_like_content():
@@ -15,3 +21,28 @@ def test_sanitize_excel_value_prefixes_leading_whitespace_formula_like_content()
 def test_sanitize_excel_value_keeps_safe_strings_and_non_strings():
     assert sanitize_excel_value("Ana Pereira") == "Ana Pereira"
     assert sanitize_excel_value(1200) == 1200
+
+
+def test_create_xlsx_response_streams_rows_from_a_generator():
+    rows = ([f"Integrante {index}", index, "=1+1"] for index in range(500))
+
+    response = create_xlsx_response("integrantes", ["Nome", "Número", "Obs"], rows)
+
+    assert response.streaming
+    assert response["Content-Disposition"] == 'attachment; filename="integrantes.xlsx"'
+    worksheet = load_workbook(BytesIO(b"".join(response.streaming_content))).active
+    assert worksheet.max_row == 501
+    assert [cell.value for cell in worksheet[1]] == ["Nome", "Número", "Obs"]
+    assert worksheet["A1"].font.bold
+    assert worksheet["A501"].value == "Integrante 499"
+    assert worksheet["C2"].value == "'=1+1"
+    assert worksheet.column_dimensions["A"].width == len("Integrante 199") + 2
+
+
+def test_export_viewsets_must_build_their_rows():
+    class IncompleteViewSet(ExportMixin, viewsets.GenericViewSet):
+        export_filename = "incompleto"
+        export_headers = ["Nome"]
+
+    with pytest.raises(TypeError, match="build_export_row"):
+        IncompleteViewSet()
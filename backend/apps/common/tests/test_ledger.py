@@ -0,0 +1,115 @@
+from datetime import date, timedelta
+
+import pytest
+from django.db import transaction
+from rest_framework.exceptions import ValidationError
+
+from apps.common.ledger import post_lunches, unpost_lunches
+from apps.credits.models import CreditEntry
+from apps.credits.services import get_credit_balance
+from apps.credits.tests.factories import CreditEntryFactory
+from apps.financial.models import FinancialDailyRollup, FinancialEntry
+from apps.lunch.models import Lunch, PackageEntry
+from apps.lunch.tests.factories import LunchFactory, PackageFactory
+from apps.users.models import Member
+from apps.users.tests.factories import MemberFactory
+
+
+@pytest.mark.django_db
+def test_posting_unchanged_lunches_writes_no_derived_rows(django_assert_num_queries):
+    lunches = LunchFactory.create_batch(3, date=date.today())
+    post_lunches(lunches, created=True)
+
+    with django_assert_num_queries(1):  # the prefetch of the existing derived rows
+        post_lunches(lunches)
+
+    assert FinancialEntry.objects.filter(lunch__in=lunches).count() == 3
+
+
+@pytest.mark.django_db
+def test_only_created_lunches_promote_their_member():
+    member = MemberFactory(role=Member.Role.AVULSO)
+    updated, created = LunchFactory.create_batch(2, member=member, date=date.today())
+
+    post_lunches([updated])
+    member.refresh_from_db()
+    assert member.role == Member.Role.AVULSO
+
+    post_lunches([created], created=True)
+    member.refresh_from_db()
+    assert member.role == Member.Role.MENSALISTA
+
+
+@pytest.mark.django_db
+def test_batch_posting_applies_only_the_differences():
+    today = date.today()
+    paid, unpaid, repriced = LunchFactory.create_batch(3, date=today, value_cents=1000)
+    post_lunches([paid, unpaid, repriced], created=True)
+
+    unpaid.payment_status = Lunch.PaymentStatus.EM_ABERTO
+    repriced.value_cents = 1500
+    post_lunches([paid, unpaid, repriced])
+
+    entries = dict(FinancialEntry.objects.values_list("lunch_id", "value_cents"))
+    assert entries == {paid.id: 1000, repriced.id: 1500}
+    rollup = FinancialDailyRollup.objects.get(date=today)
+    assert (rollup.total_cents, rollup.entry_count) == (2500, 2)
+
+
+@pytest.mark.django_db
+def test_moving_a_lunch_between_packages_moves_the_meal_and_the_history_entry():
+    member = MemberFactory(role=Member.Role.AVULSO)
+    expiration = date.today() + timedelta(days=30)
+    first = PackageFactory(member=member, remaining_quantity=5, expiration=expiration)
+    second = PackageFactory(member=member, remaining_quantity=5, expiration=expiration)
+    lunch = LunchFactory(member=member, package=first, date=date.today())
+    post_lunches([lunch], created=True)
+
+    first.refresh_from_db()
+    member.refresh_from_db()
+    assert first.remaining_quantity == 4
+    assert member.role == Member.Role.MENSALISTA
+
+    lunch.package = second
+    lunch.save()
+    post_lunches([lunch], held_package_ids={lunch.id: first.id})
+
+    first.refresh_from_db()
+    second.refresh_from_db()
+    assert (first.remaining_quantity, second.remaining_quantity) == (5, 4)
+    assert PackageEntry.objects.get(lunch=lunch).package == second
+    assert not FinancialEntry.objects.filter(lunch=lunch).exists()
+
+    unpost_lunches([lunch])
+    second.refresh_from_db()
+    assert second.remaining_quantity == 5
+    assert not PackageEntry.objects.filter(lunch=lunch).exists()
+
+
+@pytest.mark.django_db
+def test_credit_postings_net_balances_per_owner_and_reject_overdrafts():
+    owner = MemberFactory(role=Member.Role.MENSALISTA)
+    CreditEntryFactory(owner=owner, beneficiary=owner, value_cents=3000)
+    lunches = LunchFactory.create_batch(
+        2,
+        credit_owner=owner,
+        payment_mode=Lunch.PaymentMode.TROCA,
+        value_cents=1000,
+        date=date.today(),
+    )
+    post_lunches(lunches, created=True)
+    assert get_credit_balance(owner.id) == 1000
+    assert not FinancialEntry.objects.exists()
+
+    overdraft = LunchFactory(
+        credit_owner=owner,
+        payment_mode=Lunch.PaymentMode.TROCA,
+        value_cents=1500,
+        date=date.today(),
+    )
+    with pytest.raises(ValidationError), transaction.atomic():
+        post_lunches([overdraft], created=True)
+
+    unpost_lunches(lunches)
+    assert get_credit_balance(owner.id) == 3000
+    assert not CreditEntry.objects.filter(lunch__in=lunches).exists()
@@ -0,0 +1,107 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+
+from apps.lunch.tests.factories import LunchFactory
+
+User = get_user_model()
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture
+def superuser():
+    return User.objects.create_superuser(
+        username="admin",
+        email="admin@example.com",
+        password="strong-password",
+    )
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+def _count_queries(captured):
+    """Every statement that counts rows, including counts nested in another query."""
+    return [query["sql"] for query in captured if "COUNT(" in query["sql"].upper()]
+
+
+@pytest.mark.django_db
+def test_page_count_is_cached_until_the_table_changes(
+    api_client, superuser, django_assert_max_num_queries
+):
+    LunchFactory.create_batch(3)
+    url = f"{reverse('lunch-list')}?page=1&page_size=2"
+    api_client.force_authenticate(user=superuser)
+
+    response = api_client.get(url)
+    assert response.data["count"] == 3
+
+    # Other pages of the same filtered list share the cached count.
+    with django_assert_max_num_queries(10) as captured:
+        response = api_client.get(url.replace("page=1", "page=2"))
+    assert response.data["count"] == 3
+    assert len(response.data["results"]) == 1
+    assert not _count_queries(captured)
+
+    LunchFactory()
+    response = api_client.get(url)
+    assert response.data["count"] == 4
+
+
+@pytest.mark.django_db
+def test_warm_page_skips_count_query(api_client, superuser, django_assert_max_num_queries):
+    LunchFactory.create_batch(3)
+    url = f"{reverse('lunch-list')}?page=1&page_size=2"
+    api_client.force_authenticate(user=superuser)
+    api_client.get(url)
+
+    with django_assert_max_num_queries(10) as captured:
+        response = api_client.get(url)
+    assert response.data["count"] == 3
+    assert not _count_queries(captured)
+
+
+@pytest.mark.django_db
+def test_count_false_omits_total_and_reads_one_extra_row(
+    api_client, superuser, django_assert_max_num_queries
+):
+    LunchFactory.create_batch(3)
+    url = f"{reverse('lunch-list')}?page=1&page_size=2&count=false"
+    api_client.force_authenticate(user=superuser)
+
+    with django_assert_max_num_queries(10) as captured:
+        response = api_client.get(url)
+    assert response.status_code == 200
+    assert "count" not in response.data
+    assert len(response.data["results"]) == 2
+    assert "page=2" in response.data["next"]
+    assert response.data["previous"] is None
+    assert not _count_queries(captured)
+
+    response = api_client.get(url.replace("page=1", "page=2"))
+    assert len(response.data["results"]) == 1
+    assert response.data["next"] is None
+    assert response.data["previous"] is not None
+
+
+@pytest.mark.django_db
+def test_count_estimate_falls_back_to_exact_count_outside_postgres(api_client, superuser):
+    LunchFactory.create_batch(2)
+    api_client.force_authenticate(user=superuser)
+
+    response = api_client.get(f"{reverse('lunch-list')}?page=1&count=estimate")
+    assert response.data["count"] == 2
+    assert "count_estimated" not in response.data
+
+    response = api_client.get(f"{reverse('lunch-list')}?page=1&count=talvez")
+    assert response.status_code == 400
@@ -0,0 +1,50 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from apps.common.roles import promote_roles
+from apps.duties.serializers import DutySerializer
+from apps.users.models import Member
+from apps.users.tests.factories import MemberFactory
+
+
+@pytest.mark.django_db
+def test_promote_roles_updates_only_lower_roles_in_one_statement(django_assert_num_queries):
+    avulso = MemberFactory(role=Member.Role.AVULSO)
+    mensalista = MemberFactory(role=Member.Role.MENSALISTA)
+    sustentador = MemberFactory(role=Member.Role.SUSTENTADOR)
+    # A stale instance that still believes it is avulso must not demote the sustentador.
+    stale = Member.objects.get(id=sustentador.id)
+    stale.role = Member.Role.AVULSO
+
+    with django_assert_num_queries(1):
+        updated = promote_roles([avulso, mensalista.id, stale], Member.Role.MENSALISTA)
+
+    assert updated == 1
+    assert avulso.role == Member.Role.MENSALISTA
+    roles = dict(Member.objects.values_list("id", "role"))
+    assert roles == {
+        avulso.id: Member.Role.MENSALISTA,
+        mensalista.id: Member.Role.MENSALISTA,
+        sustentador.id: Member.Role.SUSTENTADOR,
+    }
+
+
+@pytest.mark.django_db
+def test_duty_save_promotes_all_members_with_one_update():
+    members = MemberFactory.create_batch(10, role=Member.Role.AVULSO)
+    serializer = DutySerializer(
+        data={"name": "Cozinha", "remuneration_cents": 1500, "member_ids": [m.id for m in members]}
+    )
+    assert serializer.is_valid(), serializer.errors
+
+    with CaptureQueriesContext(connection) as captured:
+        serializer.save()
+
+    role_updates = [
+        query["sql"]
+        for query in captured.captured_queries
+        if query["sql"].startswith('UPDATE "users_member"')
+    ]
+    assert len(role_updates) == 1
+    assert set(Member.objects.values_list("role", flat=True)) == {Member.Role.SUSTENTADOR}
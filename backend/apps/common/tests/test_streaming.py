@@ -0,0 +1,62 @@
+import json
+
+import pytest
+from django.contrib.auth import get_user_model
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+
+from apps.lunch.tests.factories import PackageFactory
+from apps.lunch.views import PackageViewSet
+from apps.users.tests.factories import MemberFactory
+
+User = get_user_model()
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture
+def superuser():
+    return User.objects.create_superuser(
+        username="admin",
+        email="admin@example.com",
+        password="strong-password",
+    )
+
+
+@pytest.mark.django_db
+def test_unpaginated_list_streams_a_json_array_in_chunks(api_client, superuser, monkeypatch):
+    monkeypatch.setattr(PackageViewSet, "stream_chunk_size", 2)
+    packages = PackageFactory.create_batch(5)
+    api_client.force_authenticate(user=superuser)
+
+    response = api_client.get(reverse("package-list"))
+
+    assert response.status_code == 200
+    assert response.streaming
+    assert response["Content-Type"] == "application/json; charset=utf-8"
+    assert response.has_header("ETag")
+    chunks = list(response.streaming_content)
+    assert len(chunks) == 5  # "[", three chunks of rows, "]"
+    rows = json.loads(b"".join(chunks))
+    assert {row["id"] for row in rows} == {package.id for package in packages}
+    assert rows[0]["member_name"]
+
+
+@pytest.mark.django_db
+def test_unpaginated_list_over_the_row_cap_asks_the_client_to_paginate(
+    api_client, superuser, settings
+):
+    settings.UNPAGINATED_LIST_MAX_ROWS = 2
+    MemberFactory.create_batch(3)
+    api_client.force_authenticate(user=superuser)
+    url = reverse("member-list")
+
+    response = api_client.get(url)
+    assert response.status_code == 400
+    assert response.data["detail"].code == "pagination_required"
+    assert "page=" in response.data["detail"]
+
+    assert len(api_client.get(url, {"page": 1}).data["results"]) == 3
@@ -1,6 +1,7 @@
 from django.contrib import admin
 
-from apps.credits.models import CreditEntry
+from apps.credits.models import CreditBalance, CreditEntry
+from apps.credits.services import rebuild_credit_balances
 
 
 @admin.register(CreditEntry)
@@ -27,3 +28,15 @@ class CreditEntryAdmin(admin.ModelAdmin):
         "lunch",
         "created_by",
     )
+
+    def save_model(self, request, obj, form, change):
+        previous_owner_id = form.initial.get("owner") if change else None
+        super().save_model(request, obj, form, change)
+        rebuild_credit_balances({obj.owner_id, previous_owner_id} - {None})
+
+
+@admin.register(CreditBalance)
+class CreditBalanceAdmin(admin.ModelAdmin):
+    list_display = ("owner", "credits_cents", "debits_cents", "balance_cents", "updated_at")
+    search_fields = ("owner__full_name",)
+    readonly_fields = ("owner", "credits_cents", "debits_cents", "balance_cents", "updated_at")
@@ -1,6 +1,17 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_delete
 
 
 class CreditsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.credits"
+
+    def ready(self):
+        from apps.credits.models import CreditEntry
+        from apps.credits.services import release_deleted_credit_entry
+
+        post_delete.connect(
+            release_deleted_credit_entry,
+            sender=CreditEntry,
+            dispatch_uid="credits:release_deleted_credit_entry",
+        )
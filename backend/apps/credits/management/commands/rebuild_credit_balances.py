@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from apps.credits.services import rebuild_credit_balances
+
+
+class Command(BaseCommand):
+    help = "Recalcula os saldos materializados de créditos a partir do histórico."
+
+    def handle(self, *args, **options):
+        total = rebuild_credit_balances()
+        self.stdout.write(self.style.SUCCESS(f"{total} saldo(s) de créditos recalculado(s)."))
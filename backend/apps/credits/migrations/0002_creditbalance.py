@@ -0,0 +1,74 @@
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Case, IntegerField, Sum, Value, When
+
+
+def backfill_credit_balances(apps, schema_editor):
+    CreditEntry = apps.get_model("credits", "CreditEntry")
+    CreditBalance = apps.get_model("credits", "CreditBalance")
+
+    totals = CreditEntry.objects.values("owner_id").annotate(
+        credits_cents=Sum(
+            Case(
+                When(entry_type="CREDITO", then="value_cents"),
+                default=Value(0),
+                output_field=IntegerField(),
+            )
+        ),
+        debits_cents=Sum(
+            Case(
+                When(entry_type="DEBITO", then="value_cents"),
+                default=Value(0),
+                output_field=IntegerField(),
+            )
+        ),
+    )
+    CreditBalance.objects.bulk_create(
+        [
+            CreditBalance(
+                owner_id=row["owner_id"],
+                credits_cents=row["credits_cents"],
+                debits_cents=row["debits_cents"],
+                balance_cents=row["credits_cents"] - row["debits_cents"],
+            )
+            for row in totals
+        ]
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("credits", "0001_initial"),
+        ("users", "0007_alter_member_address_alter_member_heard_about_and_more"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CreditBalance",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                ("credits_cents", models.BigIntegerField(default=0)),
+                ("debits_cents", models.BigIntegerField(default=0)),
+                ("balance_cents", models.BigIntegerField(default=0)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "owner",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="credit_balance",
+                        to="users.member",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["owner_id"],
+            },
+        ),
+        migrations.RunPython(backfill_credit_balances, migrations.RunPython.noop),
+    ]
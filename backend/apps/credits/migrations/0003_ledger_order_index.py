@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:01
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("agenda", "0002_alter_agendaentry_notes"),
+        ("credits", "0002_creditbalance"),
+        ("lunch", "0012_lunch_date_status_index"),
+        ("users", "0008_member_search_text"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="creditentry",
+            index=models.Index(fields=["created_at", "id"], name="credits_entry_order_idx"),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:44
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("agenda", "0004_updated_at_index"),
+        ("credits", "0003_ledger_order_index"),
+        ("lunch", "0014_updated_at_index"),
+        ("users", "0010_updated_at_index"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="creditbalance",
+            index=models.Index(fields=["updated_at"], name="credits_balance_updated_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="creditentry",
+            index=models.Index(fields=["updated_at"], name="credits_entry_updated_idx"),
+        ),
+    ]
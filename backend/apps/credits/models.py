@@ -66,6 +66,11 @@ class CreditEntry(models.Model):
 
     class Meta:
         ordering = ["-created_at", "-id"]
+        indexes = [
+            # Natural ordering of the list; backs `?cursor=` pagination.
+            models.Index(fields=["created_at", "id"], name="credits_entry_order_idx"),
+            models.Index(fields=["updated_at"], name="credits_entry_updated_idx"),
+        ]
         constraints = [
             models.CheckConstraint(
                 condition=Q(value_cents__gt=0),
@@ -121,3 +126,24 @@ class CreditEntry(models.Model):
 
     def __str__(self):
         return f"{self.get_entry_type_display()} - {self.owner.full_name} - " f"{self.value_cents}c"
+
+
+class CreditBalance(models.Model):
+    owner = models.OneToOneField(
+        Member,
+        related_name="credit_balance",
+        on_delete=models.CASCADE,
+    )
+    credits_cents = models.BigIntegerField(default=0)
+    debits_cents = models.BigIntegerField(default=0)
+    balance_cents = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["owner_id"]
+        indexes = [
+            models.Index(fields=["updated_at"], name="credits_balance_updated_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.owner.full_name} - {self.balance_cents}c"
@@ -68,8 +68,8 @@ class CreditSummarySerializer(serializers.Serializer):
 
 
 class CreditSummaryListSerializer(serializers.Serializer):
-    owner = serializers.IntegerField(source="id")
-    owner_name = serializers.CharField(source="full_name")
+    owner = serializers.IntegerField(source="owner_id")
+    owner_name = serializers.CharField(source="owner.full_name")
     credits_cents = serializers.IntegerField()
     debits_cents = serializers.IntegerField()
     balance_cents = serializers.IntegerField()
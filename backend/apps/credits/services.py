@@ -1,31 +1,32 @@
 from django.contrib.auth.models import User
 from django.db import transaction
-from django.db.models import Sum
+from django.db.models import Case, F, IntegerField, Sum, Value, When
+from django.utils import timezone
 from rest_framework import serializers
 
 from apps.agenda.models import AgendaEntry
-from apps.credits.models import CreditEntry
+from apps.credits.models import CreditBalance, CreditEntry
 from apps.lunch.models import Lunch
 from apps.users.models import Member
 
 
 def get_credit_summary(owner_id: int, *, exclude_entry_id: int | None = None) -> dict[str, int]:
-    queryset = CreditEntry.objects.filter(owner_id=owner_id)
+    balance = CreditBalance.objects.filter(owner_id=owner_id).first()
+    credit_total = balance.credits_cents if balance else 0
+    debit_total = balance.debits_cents if balance else 0
+
     if exclude_entry_id is not None:
-        queryset = queryset.exclude(id=exclude_entry_id)
+        excluded = (
+            CreditEntry.objects.filter(id=exclude_entry_id, owner_id=owner_id)
+            .values("entry_type", "value_cents")
+            .first()
+        )
+        if excluded:
+            if excluded["entry_type"] == CreditEntry.EntryType.CREDITO:
+                credit_total -= excluded["value_cents"]
+            else:
+                debit_total -= excluded["value_cents"]
 
-    credit_total = (
-        queryset.filter(entry_type=CreditEntry.EntryType.CREDITO).aggregate(
-            total=Sum("value_cents")
-        )["total"]
-        or 0
-    )
-    debit_total = (
-        queryset.filter(entry_type=CreditEntry.EntryType.DEBITO).aggregate(
-            total=Sum("value_cents")
-        )["total"]
-        or 0
-    )
     return {
         "credits_cents": credit_total,
         "debits_cents": debit_total,
@@ -33,6 +34,98 @@ def get_credit_summary(owner_id: int, *, exclude_entry_id: int | None = None) ->
     }
 
 
+def apply_credit_balance_delta(owner_id: int, entry_type: str, delta_cents: int) -> None:
+    if not delta_cents:
+        return
+
+    credits_delta = delta_cents if entry_type == CreditEntry.EntryType.CREDITO else 0
+    debits_delta = delta_cents if entry_type == CreditEntry.EntryType.DEBITO else 0
+
+    CreditBalance.objects.get_or_create(owner_id=owner_id)
+    CreditBalance.objects.filter(owner_id=owner_id).update(
+        credits_cents=F("credits_cents") + credits_delta,
+        debits_cents=F("debits_cents") + debits_delta,
+        balance_cents=F("balance_cents") + credits_delta - debits_delta,
+        updated_at=timezone.now(),
+    )
+
+
+def create_credit_entry(**fields) -> CreditEntry:
+    entry = CreditEntry.objects.create(**fields)
+    apply_credit_balance_delta(entry.owner_id, entry.entry_type, entry.value_cents)
+    return entry
+
+
+def update_credit_entry(
+    entry: CreditEntry,
+    fields_to_update: list[str],
+    *,
+    previous_owner_id: int,
+    previous_value_cents: int,
+) -> None:
+    entry.save(update_fields=fields_to_update)
+    if previous_owner_id != entry.owner_id or previous_value_cents != entry.value_cents:
+        apply_credit_balance_delta(previous_owner_id, entry.entry_type, -previous_value_cents)
+        apply_credit_balance_delta(entry.owner_id, entry.entry_type, entry.value_cents)
+
+
+def delete_credit_entry(entry: CreditEntry) -> None:
+    # The balance is moved by `release_deleted_credit_entry`.
+    entry.delete()
+
+
+def release_deleted_credit_entry(sender, instance: CreditEntry, **kwargs) -> None:
+    """
+    `post_delete` receiver: take a deleted entry out of its owner's balance, whatever deleted
+    it (these services, an admin bulk action or a cascade from its lunch or agenda entry).
+    """
+    apply_credit_balance_delta(instance.owner_id, instance.entry_type, -instance.value_cents)
+
+
+@transaction.atomic
+def rebuild_credit_balances(owner_ids: list[int] | set[int] | None = None) -> int:
+    entries = CreditEntry.objects.all()
+    balances = CreditBalance.objects.all()
+    if owner_ids is not None:
+        entries = entries.filter(owner_id__in=owner_ids)
+        balances = balances.filter(owner_id__in=owner_ids)
+
+    totals = entries.values("owner_id").annotate(
+        credits_cents=Sum(
+            Case(
+                When(entry_type=CreditEntry.EntryType.CREDITO, then="value_cents"),
+                default=Value(0),
+                output_field=IntegerField(),
+            )
+        ),
+        debits_cents=Sum(
+            Case(
+                When(entry_type=CreditEntry.EntryType.DEBITO, then="value_cents"),
+                default=Value(0),
+                output_field=IntegerField(),
+            )
+        ),
+    )
+
+    balances.delete()
+    rebuilt = CreditBalance.objects.bulk_create(
+        [
+            CreditBalance(
+                owner_id=row["owner_id"],
+                credits_cents=row["credits_cents"],
+                debits_cents=row["debits_cents"],
+                balance_cents=row["credits_cents"] - row["debits_cents"],
+            )
+            for row in totals
+        ]
+    )
+    return len(rebuilt)
+
+
+def build_lunch_credit_description(lunch: Lunch) -> str:
+    return f"Almoço com crédito - {lunch.member.full_name} - {lunch.date}"
+
+
 def get_credit_balance(owner_id: int, *, exclude_entry_id: int | None = None) -> int:
     return get_credit_summary(owner_id, exclude_entry_id=exclude_entry_id)["balance_cents"]
 
@@ -62,6 +155,7 @@ def ensure_credit_balance(
         )
 
 
+@transaction.atomic
 def sync_agenda_credit_entries(
     agenda_entry: AgendaEntry,
     *,
@@ -81,7 +175,7 @@ def sync_agenda_credit_entries(
 
     if not should_generate:
         for entry in existing_entries.values():
-            entry.delete()
+            delete_credit_entry(entry)
         return
 
     selected_members = list(agenda_entry.members.all())
@@ -92,6 +186,7 @@ def sync_agenda_credit_entries(
     for member in selected_members:
         entry = existing_entries.pop(member.id, None)
         if entry:
+            previous_value_cents = entry.value_cents
             fields_to_update: list[str] = []
             if entry.beneficiary_id != member.id:
                 entry.beneficiary = member
@@ -107,10 +202,15 @@ def sync_agenda_credit_entries(
                 fields_to_update.append("created_by")
             if fields_to_update:
                 fields_to_update.append("updated_at")
-                entry.save(update_fields=fields_to_update)
+                update_credit_entry(
+                    entry,
+                    fields_to_update,
+                    previous_owner_id=entry.owner_id,
+                    previous_value_cents=previous_value_cents,
+                )
             continue
 
-        CreditEntry.objects.create(
+        create_credit_entry(
             owner=member,
             beneficiary=member,
             entry_type=CreditEntry.EntryType.CREDITO,
@@ -123,80 +223,7 @@ def sync_agenda_credit_entries(
 
     for owner_id, entry in existing_entries.items():
         if owner_id not in desired_owner_ids:
-            entry.delete()
-
-
-def sync_lunch_credit_entry(
-    lunch: Lunch,
-    *,
-    actor: User | None = None,
-) -> None:
-    current_entry = getattr(lunch, "credit_entry", None)
-    should_use_credit = (
-        lunch.payment_mode == Lunch.PaymentMode.TROCA
-        and lunch.credit_owner_id is not None
-        and lunch.package_id is None
-        and lunch.value_cents > 0
-    )
-
-    if not should_use_credit:
-        if current_entry:
-            current_entry.delete()
-        return
-
-    owner_ids = {lunch.credit_owner_id}
-    if current_entry and current_entry.owner_id:
-        owner_ids.add(current_entry.owner_id)
-
-    lock_members(owner_ids)
-
-    exclude_entry_id = None
-    if current_entry and current_entry.owner_id == lunch.credit_owner_id:
-        exclude_entry_id = current_entry.id
-
-    owner = lunch.credit_owner
-
-    if not can_use_credit_advance(owner):
-        ensure_credit_balance(
-            lunch.credit_owner_id,
-            lunch.value_cents,
-            exclude_entry_id=exclude_entry_id,
-        )
-
-    description = f"Almoço com crédito - {lunch.member.full_name} - {lunch.date}"
-
-    if current_entry:
-        fields_to_update: list[str] = []
-        if current_entry.owner_id != lunch.credit_owner_id:
-            current_entry.owner = lunch.credit_owner
-            fields_to_update.append("owner")
-        if current_entry.beneficiary_id != lunch.member_id:
-            current_entry.beneficiary = lunch.member
-            fields_to_update.append("beneficiary")
-        if current_entry.value_cents != lunch.value_cents:
-            current_entry.value_cents = lunch.value_cents
-            fields_to_update.append("value_cents")
-        if current_entry.description != description:
-            current_entry.description = description
-            fields_to_update.append("description")
-        if actor and current_entry.created_by_id != actor.id:
-            current_entry.created_by = actor
-            fields_to_update.append("created_by")
-        if fields_to_update:
-            fields_to_update.append("updated_at")
-            current_entry.save(update_fields=fields_to_update)
-        return
-
-    CreditEntry.objects.create(
-        owner=lunch.credit_owner,
-        beneficiary=lunch.member,
-        entry_type=CreditEntry.EntryType.DEBITO,
-        origin=CreditEntry.Origin.LUNCH,
-        value_cents=lunch.value_cents,
-        description=description,
-        lunch=lunch,
-        created_by=actor,
-    )
+            delete_credit_entry(entry)
 
 
 @transaction.atomic
@@ -215,7 +242,7 @@ def create_manual_credit_entry(
 
     resolved_beneficiary = owner if entry_type == CreditEntry.EntryType.CREDITO else beneficiary
 
-    return CreditEntry.objects.create(
+    return create_credit_entry(
         owner=owner,
         beneficiary=resolved_beneficiary,
         entry_type=entry_type,
@@ -1,6 +1,7 @@
 import factory
 
 from apps.credits.models import CreditEntry
+from apps.credits.services import create_credit_entry
 from apps.users.tests.factories import MemberFactory
 
 
@@ -14,3 +15,7 @@ class CreditEntryFactory(factory.django.DjangoModelFactory):
     origin = CreditEntry.Origin.MANUAL
     value_cents = 1000
     description = factory.Faker("sentence")
+
+    @classmethod
+    def _create(cls, model_class, *args, **kwargs):
+        return create_credit_entry(*args, **kwargs)
@@ -3,9 +3,15 @@ from datetime import date
 import pytest
 from rest_framework import serializers
 
+from apps.agenda.models import AgendaEntry
 from apps.agenda.serializers import AgendaEntrySerializer
-from apps.credits.models import CreditEntry
-from apps.credits.services import get_credit_balance
+from apps.credits.models import CreditBalance, CreditEntry
+from apps.credits.services import (
+    delete_credit_entry,
+    get_credit_balance,
+    get_credit_summary,
+    rebuild_credit_balances,
+)
 from apps.credits.tests.factories import CreditEntryFactory
 from apps.duties.tests.factories import DutyFactory
 from apps.financial.models import FinancialEntry
@@ -229,12 +235,15 @@ def test_agenda_credit_offsets_existing_sustentador_debt():
     assert agenda_serializer.is_valid(), agenda_serializer.errors
     agenda_entry = agenda_serializer.save()
 
-    assert CreditEntry.objects.filter(
-        owner=member,
-        agenda_entry=agenda_entry,
-        entry_type=CreditEntry.EntryType.CREDITO,
-        value_cents=2500,
-    ).count() == 1
+    assert (
+        CreditEntry.objects.filter(
+            owner=member,
+            agenda_entry=agenda_entry,
+            entry_type=CreditEntry.EntryType.CREDITO,
+            value_cents=2500,
+        ).count()
+        == 1
+    )
     assert get_credit_balance(member.id) == 700
 
 
@@ -334,3 +343,124 @@ def test_switching_from_cash_to_credit_removes_financial_entry():
 
     assert FinancialEntry.objects.filter(lunch=lunch).count() == 0
     assert CreditEntry.objects.filter(lunch=lunch).count() == 1
+
+
+@pytest.mark.django_db
+def test_credit_balance_tracks_agenda_lunch_and_deletions():
+    member = MemberFactory(role=Member.Role.SUSTENTADOR)
+    duty = DutyFactory(remuneration_cents=3000)
+    agenda_serializer = AgendaEntrySerializer(
+        data={
+            "date": "2026-03-27",
+            "start_time": "09:00",
+            "end_time": "11:00",
+            "duty": duty.id,
+            "status": "CONCLUIDO",
+            "member_ids": [member.id],
+        }
+    )
+    assert agenda_serializer.is_valid(), agenda_serializer.errors
+    agenda_entry = agenda_serializer.save()
+
+    lunch_serializer = LunchSerializer(
+        data={
+            "member": member.id,
+            "credit_owner": member.id,
+            "value_cents": 1800,
+            "date": date.today(),
+            "payment_status": Lunch.PaymentStatus.PAGO,
+            "payment_mode": Lunch.PaymentMode.TROCA,
+        }
+    )
+    assert lunch_serializer.is_valid(), lunch_serializer.errors
+    lunch = lunch_serializer.save()
+
+    balance = CreditBalance.objects.get(owner=member)
+    assert (balance.credits_cents, balance.debits_cents, balance.balance_cents) == (
+        3000,
+        1800,
+        1200,
+    )
+
+    update_serializer = LunchSerializer(lunch, data={"value_cents": 1000}, partial=True)
+    assert update_serializer.is_valid(), update_serializer.errors
+    update_serializer.save()
+    assert get_credit_balance(member.id) == 2000
+
+    delete_credit_entry(CreditEntry.objects.get(agenda_entry=agenda_entry))
+    assert get_credit_summary(member.id) == {
+        "credits_cents": 0,
+        "debits_cents": 1000,
+        "balance_cents": -1000,
+    }
+
+
+@pytest.mark.django_db
+def test_cascade_deletes_release_credit_entries_from_the_balance():
+    member = MemberFactory(role=Member.Role.SUSTENTADOR)
+    duty = DutyFactory(remuneration_cents=3000)
+    agenda_serializer = AgendaEntrySerializer(
+        data={
+            "date": "2026-03-27",
+            "start_time": "09:00",
+            "duty": duty.id,
+            "status": "CONCLUIDO",
+            "member_ids": [member.id],
+        }
+    )
+    assert agenda_serializer.is_valid(), agenda_serializer.errors
+    agenda_entry = agenda_serializer.save()
+    lunch_serializer = LunchSerializer(
+        data={
+            "member": member.id,
+            "credit_owner": member.id,
+            "value_cents": 1800,
+            "date": date.today(),
+            "payment_status": Lunch.PaymentStatus.PAGO,
+            "payment_mode": Lunch.PaymentMode.TROCA,
+        }
+    )
+    assert lunch_serializer.is_valid(), lunch_serializer.errors
+    lunch = lunch_serializer.save()
+    assert get_credit_balance(member.id) == 1200
+
+    # Bulk deletes (admin actions included) cascade to the entries without the services.
+    Lunch.objects.filter(id=lunch.id).delete()
+    assert get_credit_balance(member.id) == 3000
+    AgendaEntry.objects.filter(id=agenda_entry.id).delete()
+    assert not CreditEntry.objects.exists()
+    assert get_credit_summary(member.id) == {
+        "credits_cents": 0,
+        "debits_cents": 0,
+        "balance_cents": 0,
+    }
+
+
+@pytest.mark.django_db
+def test_credit_balance_check_reads_single_row(django_assert_num_queries):
+    owner = MemberFactory()
+    CreditEntryFactory(owner=owner, beneficiary=owner, value_cents=2000)
+    CreditEntryFactory(owner=owner, beneficiary=owner, value_cents=500)
+
+    with django_assert_num_queries(1):
+        assert get_credit_balance(owner.id) == 2500
+
+
+@pytest.mark.django_db
+def test_rebuild_credit_balances_restores_drifted_rows():
+    owner = MemberFactory()
+    CreditEntryFactory(owner=owner, beneficiary=owner, value_cents=2000)
+    CreditEntryFactory(
+        owner=owner,
+        beneficiary=owner,
+        value_cents=700,
+        entry_type=CreditEntry.EntryType.DEBITO,
+    )
+    CreditBalance.objects.filter(owner=owner).update(balance_cents=0, credits_cents=0)
+
+    assert rebuild_credit_balances() == 1
+
+    balance = CreditBalance.objects.get(owner=owner)
+    assert balance.credits_cents == 2000
+    assert balance.debits_cents == 700
+    assert balance.balance_cents == 1300
@@ -153,3 +153,45 @@ def test_credit_summary_list_can_filter_by_search(api_client, superuser):
     assert response.status_code == 200
     assert response.data["count"] == 1
     assert response.data["results"][0]["owner_name"] == "Carlos Silva"
+
+
+@pytest.mark.django_db
+def test_credit_summary_cursor_mode_walks_pages_by_name(api_client, superuser):
+    names = ["Ana", "Bia", "Caio", "Davi", "Edu"]
+    for name in names:
+        owner = MemberFactory(full_name=name)
+        CreditEntryFactory(owner=owner, beneficiary=owner, value_cents=1000)
+    zeroed = MemberFactory(full_name="Beto")
+    CreditEntryFactory(owner=zeroed, beneficiary=zeroed, value_cents=500)
+    CreditEntryFactory(
+        owner=zeroed,
+        beneficiary=zeroed,
+        value_cents=500,
+        entry_type=CreditEntry.EntryType.DEBITO,
+    )
+    api_client.force_authenticate(user=superuser)
+
+    first = api_client.get(reverse("credit-summary"), {"cursor": "", "page_size": 2})
+    assert first.status_code == 200
+    assert "count" not in first.data
+    assert [item["owner_name"] for item in first.data["results"]] == ["Ana", "Bia"]
+    assert first.data["previous"] is None
+
+    second = api_client.get(first.data["next"])
+    assert [item["owner_name"] for item in second.data["results"]] == ["Caio", "Davi"]
+
+    third = api_client.get(second.data["next"])
+    assert [item["owner_name"] for item in third.data["results"]] == ["Edu"]
+    assert third.data["next"] is None
+
+    back = api_client.get(third.data["previous"])
+    assert [item["owner_name"] for item in back.data["results"]] == ["Caio", "Davi"]
+
+
+@pytest.mark.django_db
+def test_credit_summary_rejects_invalid_cursor(api_client, superuser):
+    api_client.force_authenticate(user=superuser)
+
+    response = api_client.get(reverse("credit-summary"), {"cursor": "not-a-cursor"})
+
+    assert response.status_code == 404
@@ -1,14 +1,14 @@
 import django_filters
-from django.db.models import Case, F, IntegerField, Sum, Value, When
-from django.db.models.functions import Coalesce
 from django.shortcuts import get_object_or_404
 from rest_framework import status, viewsets
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from apps.common.pagination import DefaultPagination
+from apps.common.conditional import ConditionalGetMixin
+from apps.common.pagination import CursorOptInPagination
 from apps.common.permissions import SuperuserOnly
-from apps.credits.models import CreditEntry
+from apps.common.search import normalize_search_text
+from apps.credits.models import CreditBalance, CreditEntry
 from apps.credits.serializers import (
     CreditEntrySerializer,
     CreditSummaryListSerializer,
@@ -38,7 +38,7 @@ class CreditEntryFilter(django_filters.FilterSet):
         return queryset.filter(created_at__date__lte=value)
 
 
-class CreditEntryViewSet(viewsets.ReadOnlyModelViewSet):
+class CreditEntryViewSet(ConditionalGetMixin, viewsets.ReadOnlyModelViewSet):
     queryset = CreditEntry.objects.select_related(
         "owner",
         "beneficiary",
@@ -49,11 +49,16 @@ class CreditEntryViewSet(viewsets.ReadOnlyModelViewSet):
     serializer_class = CreditEntrySerializer
     permission_classes = [SuperuserOnly]
     filterset_class = CreditEntryFilter
+    pagination_class = CursorOptInPagination
+    keyset_ordering = ("-created_at", "-id")
+    watermark_models = (CreditEntry, Member)
 
 
-class CreditSummaryView(APIView):
+class CreditSummaryView(ConditionalGetMixin, APIView):
     permission_classes = [SuperuserOnly]
-    pagination_class = DefaultPagination
+    watermark_models = (CreditBalance, CreditEntry, Member)
+    pagination_class = CursorOptInPagination
+    keyset_ordering = ("owner__full_name", "owner_id")
 
     def get(self, request):
         owner_id = request.query_params.get("owner")
@@ -62,47 +67,16 @@ class CreditSummaryView(APIView):
             serializer = CreditSummarySerializer(CreditSummarySerializer.from_member(member))
             return Response(serializer.data)
 
-        queryset = (
-            Member.objects.filter(credit_entries__isnull=False)
-            .annotate(
-                credits_cents=Coalesce(
-                    Sum(
-                        Case(
-                            When(
-                                credit_entries__entry_type=CreditEntry.EntryType.CREDITO,
-                                then="credit_entries__value_cents",
-                            ),
-                            default=Value(0),
-                            output_field=IntegerField(),
-                        )
-                    ),
-                    0,
-                ),
-                debits_cents=Coalesce(
-                    Sum(
-                        Case(
-                            When(
-                                credit_entries__entry_type=CreditEntry.EntryType.DEBITO,
-                                then="credit_entries__value_cents",
-                            ),
-                            default=Value(0),
-                            output_field=IntegerField(),
-                        )
-                    ),
-                    0,
-                ),
-            )
-            .annotate(balance_cents=F("credits_cents") - F("debits_cents"))
-        )
+        queryset = CreditBalance.objects.exclude(balance_cents=0).select_related("owner")
 
         search = (request.query_params.get("search") or "").strip()
         if search:
-            queryset = queryset.filter(full_name__icontains=search)
-
-        queryset = queryset.exclude(balance_cents=0).order_by("full_name").distinct()
+            queryset = queryset.filter(owner__search_text__contains=normalize_search_text(search))
 
         paginator = self.pagination_class()
-        page = paginator.paginate_queryset(queryset, request, view=self)
+        page = paginator.paginate_queryset(
+            queryset.order_by(*self.keyset_ordering), request, view=self
+        )
         serializer = CreditSummaryListSerializer(page, many=True)
         return paginator.get_paginated_response(serializer.data)
 
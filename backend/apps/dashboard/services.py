@@ -0,0 +1,142 @@
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q
+
+from apps.common.watermarks import table_watermark
+from apps.financial.models import FinancialDailyRollup, FinancialEntry
+from apps.financial.services import sum_rollups
+from apps.lunch.models import Lunch
+from apps.lunch.services import count_lunches_by_date
+from apps.users.models import Member
+
+DASHBOARD_SOURCE_MODELS = (FinancialDailyRollup, Lunch, Member)
+MAX_ATTENDANCE_DAYS = 366
+
+
+def get_dashboard_summary(today: date, *, watermark: dict | None = None) -> dict:
+    """
+    The dashboard payload, cached per day and reused while the watermark of the tables it
+    reads is unchanged, so a warm load costs the single watermark query. Callers that already
+    read the watermark of `DASHBOARD_SOURCE_MODELS` pass it in.
+    """
+    cache_key = f"dashboard:summary:{today.isoformat()}"
+    if watermark is None:
+        watermark = table_watermark(*DASHBOARD_SOURCE_MODELS)
+    cached = cache.get(cache_key)
+    if cached is not None and cached["watermark"] == watermark:
+        return cached["data"]
+
+    data = build_dashboard_summary(today)
+    cache.set(
+        cache_key,
+        {"watermark": watermark, "data": data},
+        timeout=settings.DASHBOARD_CACHE_TIMEOUT,
+    )
+    return data
+
+
+def build_dashboard_summary(today: date) -> dict:
+    start_month = today.replace(day=1)
+
+    # Monthly balance
+    in_month = Q(date__gte=start_month, date__lte=today)
+    monthly_totals = sum_rollups(
+        entradas=in_month & Q(entry_type=FinancialEntry.EntryType.ENTRADA),
+        saidas=in_month & Q(entry_type=FinancialEntry.EntryType.SAIDA),
+    )
+
+    # Members stats
+    role_counts = dict(Member.objects.order_by().values_list("role").annotate(total=Count("id")))
+
+    # Lunch stats
+    last_30_start = today - timedelta(days=29)
+    lunch_totals = Lunch.objects.aggregate(
+        total=Count("id"),
+        last_30=Count("id", filter=Q(date__gte=last_30_start, date__lte=today)),
+        em_aberto=Count("id", filter=Q(payment_status=Lunch.PaymentStatus.EM_ABERTO)),
+    )
+
+    lunches_today = list(
+        Lunch.objects.filter(date=today)
+        .order_by("member__full_name", "id")
+        .values("id", "member__full_name", "payment_status", "value_cents", "package_id")
+    )
+    lunches_today_items = [
+        {
+            "id": lunch["id"],
+            "member_name": lunch["member__full_name"],
+            "payment_status": lunch["payment_status"],
+            "value_cents": lunch["value_cents"],
+            "has_package": bool(lunch["package_id"]),
+        }
+        for lunch in lunches_today
+    ]
+    total_paid_today = sum(
+        lunch["value_cents"]
+        for lunch in lunches_today
+        if lunch["payment_status"] == Lunch.PaymentStatus.PAGO
+    )
+
+    return {
+        "monthly_balance_cents": monthly_totals["entradas"] - monthly_totals["saidas"],
+        "entradas_cents": monthly_totals["entradas"],
+        "saidas_cents": monthly_totals["saidas"],
+        "members": {
+            "total": sum(role_counts.values()),
+            "sustentadores": role_counts.get(Member.Role.SUSTENTADOR, 0),
+            "mensalistas": role_counts.get(Member.Role.MENSALISTA, 0),
+            "avulsos": role_counts.get(Member.Role.AVULSO, 0),
+        },
+        "lunches": {
+            "average_daily_last_30_days": lunch_totals["last_30"] / 30.0,
+            "total_last_30_days": lunch_totals["last_30"],
+            "total_em_aberto": lunch_totals["em_aberto"],
+            "total": lunch_totals["total"],
+            "today_total": len(lunches_today_items),
+            "today_paid_cents": total_paid_today,
+            "today_items": lunches_today_items,
+        },
+    }
+
+
+def build_attendance(date_from: date, date_to: date) -> dict:
+    """
+    Lunches per day, a weekday x week heatmap and paid/open totals for the range, assembled
+    from the single per-day aggregation of `count_lunches_by_date`.
+    """
+    counts = count_lunches_by_date(date_from, date_to)
+    empty = {"total": 0, "pago": 0, "em_aberto": 0}
+
+    days = []
+    day = date_from
+    while day <= date_to:
+        days.append({"date": day, **counts.get(day, empty)})
+        day += timedelta(days=1)
+
+    # One row per week (starting on Monday) with seven cells; days outside the range are None.
+    first_week = date_from - timedelta(days=date_from.weekday())
+    weeks = []
+    week_start = first_week
+    while week_start <= date_to:
+        weeks.append(week_start)
+        week_start += timedelta(days=7)
+    cells = [[None] * 7 for _ in weeks]
+    for item in days:
+        week_index = (item["date"] - first_week).days // 7
+        cells[week_index][item["date"].weekday()] = item["total"]
+
+    total = sum(item["total"] for item in days)
+    return {
+        "date_from": date_from,
+        "date_to": date_to,
+        "days": days,
+        "heatmap": {"weeks": weeks, "cells": cells},
+        "totals": {
+            "total": total,
+            "pago": sum(item["pago"] for item in days),
+            "em_aberto": sum(item["em_aberto"] for item in days),
+            "average_daily": total / len(days),
+        },
+    }
@@ -1,7 +1,8 @@
-from datetime import timedelta
+from datetime import date, timedelta
 
 import pytest
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.utils import timezone
 from rest_framework.reverse import reverse
 from rest_framework.test import APIClient
@@ -84,3 +85,68 @@ def test_dashboard_summary_requires_authentication(api_client):
     response = api_client.get(url)
 
     assert response.status_code == 401
+
+
+@pytest.mark.django_db
+def test_dashboard_summary_is_cached_until_a_source_table_changes(
+    api_client, superuser, django_assert_num_queries
+):
+    cache.clear()
+    today = timezone.now().date()
+    paid = LunchFactory(date=today, payment_status="PAGO", value_cents=1500)
+    LunchFactory(date=today, payment_status="EM_ABERTO")
+    url = reverse("dashboard-summary")
+    api_client.force_authenticate(user=superuser)
+
+    cold = api_client.get(url).data
+    assert cold["lunches"]["today_total"] == 2
+    assert cold["lunches"]["today_paid_cents"] == 1500
+
+    with django_assert_num_queries(1) as captured:
+        warm = api_client.get(url).data
+    assert warm == cold
+    # The watermark is read from indexes and change counters, never by counting the tables.
+    assert "COUNT(" not in captured.captured_queries[0]["sql"].upper()
+
+    MemberFactory(role=Member.Role.SUSTENTADOR)
+    paid.delete()
+
+    refreshed = api_client.get(url).data
+    assert refreshed["members"]["sustentadores"] == cold["members"]["sustentadores"] + 1
+    assert refreshed["lunches"]["today_total"] == 1
+    assert refreshed["lunches"]["today_paid_cents"] == 0
+
+
+@pytest.mark.django_db
+def test_dashboard_attendance_builds_days_and_heatmap_from_one_grouped_query(
+    api_client, superuser, django_assert_num_queries
+):
+    monday = date(2026, 3, 2)
+    LunchFactory(date=monday, payment_status="PAGO")
+    LunchFactory(date=monday, payment_status="EM_ABERTO")
+    LunchFactory(date=monday + timedelta(days=8), payment_status="PAGO")
+    LunchFactory(date=monday + timedelta(days=30), payment_status="PAGO")
+    api_client.force_authenticate(user=superuser)
+
+    with django_assert_num_queries(2):  # watermark + one GROUP BY date
+        response = api_client.get(
+            reverse("dashboard-attendance"),
+            {"date_from": "2026-03-01", "date_to": "2026-03-10"},
+        )
+
+    assert response.status_code == 200
+    data = response.data
+    assert len(data["days"]) == 10
+    assert data["days"][1] == {"date": monday, "total": 2, "pago": 1, "em_aberto": 1}
+    assert data["totals"] == {"total": 3, "pago": 2, "em_aberto": 1, "average_daily": 0.3}
+    assert data["heatmap"]["weeks"] == [date(2026, 2, 23), monday, date(2026, 3, 9)]
+    assert data["heatmap"]["cells"][0] == [None, None, None, None, None, None, 0]
+    assert data["heatmap"]["cells"][1][0] == 2
+    assert data["heatmap"]["cells"][2] == [0, 1, None, None, None, None, None]
+
+    response = api_client.get(
+        reverse("dashboard-attendance"), {"date_from": "2026-03-10", "date_to": "2026-03-01"}
+    )
+    assert response.status_code == 400
+    response = api_client.get(reverse("dashboard-attendance"), {"date_from": "ontem"})
+    assert response.status_code == 400
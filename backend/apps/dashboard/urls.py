@@ -1,7 +1,8 @@
 from django.urls import path
 
-from apps.dashboard.views import DashboardSummaryView
+from apps.dashboard.views import DashboardAttendanceView, DashboardSummaryView
 
 urlpatterns = [
+    path("attendance/", DashboardAttendanceView.as_view(), name="dashboard-attendance"),
     path("summary/", DashboardSummaryView.as_view(), name="dashboard-summary"),
 ]
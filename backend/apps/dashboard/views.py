@@ -1,91 +1,63 @@
 from datetime import timedelta
 
-from django.db import models
 from django.utils import timezone
+from django.utils.dateparse import parse_date
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from apps.common.conditional import ConditionalGetMixin
 from apps.common.permissions import SuperuserOnly
-from apps.financial.models import FinancialEntry
+from apps.dashboard.services import (
+    DASHBOARD_SOURCE_MODELS,
+    MAX_ATTENDANCE_DAYS,
+    build_attendance,
+    get_dashboard_summary,
+)
 from apps.lunch.models import Lunch
-from apps.users.models import Member
 
 
-class DashboardSummaryView(APIView):
+class DashboardSummaryView(ConditionalGetMixin, APIView):
     permission_classes = [SuperuserOnly]
+    watermark_models = DASHBOARD_SOURCE_MODELS
 
-    def get(self, request):
-        today = timezone.now().date()
-        start_month = today.replace(day=1)
+    def get_watermark_context(self, request):
+        return [timezone.now().date()]
 
-        # Monthly balance
-        monthly_entries = FinancialEntry.objects.filter(date__gte=start_month, date__lte=today)
-        entradas = (
-            monthly_entries.filter(entry_type=FinancialEntry.EntryType.ENTRADA).aggregate(
-                total=models.Sum("value_cents")
-            )["total"]
-            or 0
-        )
-        saidas = (
-            monthly_entries.filter(entry_type=FinancialEntry.EntryType.SAIDA).aggregate(
-                total=models.Sum("value_cents")
-            )["total"]
-            or 0
-        )
-        monthly_balance = entradas - saidas
+    def get(self, request):
+        return Response(get_dashboard_summary(timezone.now().date(), watermark=self.watermark))
 
-        # Members stats
-        total_members = Member.objects.count()
-        total_sustentadores = Member.objects.filter(role=Member.Role.SUSTENTADOR).count()
-        total_mensalistas = Member.objects.filter(role=Member.Role.MENSALISTA).count()
-        total_avulsos = Member.objects.filter(role=Member.Role.AVULSO).count()
 
-        # Lunch stats
-        last_30_start = today - timedelta(days=29)
-        lunches_last_30 = Lunch.objects.filter(date__gte=last_30_start, date__lte=today)
-        total_lunches_last_30 = lunches_last_30.count()
-        avg_lunches_last_30 = total_lunches_last_30 / 30.0
+class DashboardAttendanceView(ConditionalGetMixin, APIView):
+    """Attendance for `date_from`..`date_to` (default: the last 30 days)."""
 
-        total_lunches_open = Lunch.objects.filter(
-            payment_status=Lunch.PaymentStatus.EM_ABERTO
-        ).count()
-        total_lunches = Lunch.objects.count()
+    permission_classes = [SuperuserOnly]
+    watermark_models = (Lunch,)
 
-        lunches_today = Lunch.objects.select_related("member").filter(date=today)
-        lunches_today_paid = lunches_today.filter(payment_status=Lunch.PaymentStatus.PAGO)
-        total_lunches_today = lunches_today.count()
-        total_paid_today = (
-            lunches_today_paid.aggregate(total=models.Sum("value_cents"))["total"] or 0
-        )
-        lunches_today_items = [
-            {
-                "id": lunch.id,
-                "member_name": lunch.member.full_name,
-                "payment_status": lunch.payment_status,
-                "value_cents": lunch.value_cents,
-                "has_package": bool(lunch.package_id),
-            }
-            for lunch in lunches_today.order_by("member__full_name", "id")
-        ]
+    def get_watermark_context(self, request):
+        return [timezone.now().date()]
 
-        data = {
-            "monthly_balance_cents": monthly_balance,
-            "entradas_cents": entradas,
-            "saidas_cents": saidas,
-            "members": {
-                "total": total_members,
-                "sustentadores": total_sustentadores,
-                "mensalistas": total_mensalistas,
-                "avulsos": total_avulsos,
-            },
-            "lunches": {
-                "average_daily_last_30_days": avg_lunches_last_30,
-                "total_last_30_days": total_lunches_last_30,
-                "total_em_aberto": total_lunches_open,
-                "total": total_lunches,
-                "today_total": total_lunches_today,
-                "today_paid_cents": total_paid_today,
-                "today_items": lunches_today_items,
-            },
-        }
-        return Response(data)
+    def get(self, request):
+        today = timezone.now().date()
+        errors = {}
+        dates = {}
+        defaults = {"date_from": today - timedelta(days=29), "date_to": today}
+        for name, default in defaults.items():
+            value = request.query_params.get(name)
+            try:
+                dates[name] = parse_date(value) if value else default
+            except ValueError:
+                dates[name] = None
+            if dates[name] is None:
+                errors[name] = ["Informe uma data válida (AAAA-MM-DD)."]
+        if errors:
+            return Response(errors, status=400)
+
+        date_from, date_to = dates["date_from"], dates["date_to"]
+        if date_from > date_to:
+            return Response({"date_to": ["Deve ser igual ou posterior a date_from."]}, status=400)
+        if (date_to - date_from).days + 1 > MAX_ATTENDANCE_DAYS:
+            return Response(
+                {"date_to": [f"O intervalo pode ter no máximo {MAX_ATTENDANCE_DAYS} dias."]},
+                status=400,
+            )
+        return Response(build_attendance(date_from, date_to))
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("duties", "0001_initial"),
+        ("users", "0010_updated_at_index"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="duty",
+            index=models.Index(fields=["updated_at"], name="duties_duty_updated_idx"),
+        ),
+    ]
@@ -14,6 +14,9 @@ class Duty(models.Model):
 
     class Meta:
         ordering = ["name"]
+        indexes = [
+            models.Index(fields=["updated_at"], name="duties_duty_updated_idx"),
+        ]
 
     def __str__(self):
         return self.name
@@ -1,6 +1,6 @@
 from rest_framework import serializers
 
-from apps.common.roles import promote_role
+from apps.common.roles import promote_roles
 from apps.duties.models import Duty
 from apps.users.models import Member
 
@@ -62,8 +62,7 @@ class DutySerializer(serializers.ModelSerializer):
         duty = super().create(validated_data)
         if selected:
             duty.members.set(selected)
-            for member in duty.members.all():
-                promote_role(member, Member.Role.SUSTENTADOR)
+            promote_roles(selected, Member.Role.SUSTENTADOR)
         return duty
 
     def update(self, instance, validated_data):
@@ -73,6 +72,5 @@ class DutySerializer(serializers.ModelSerializer):
         duty = super().update(instance, validated_data)
         if selected is not None:
             duty.members.set(selected)
-            for member in duty.members.all():
-                promote_role(member, Member.Role.SUSTENTADOR)
+            promote_roles(selected, Member.Role.SUSTENTADOR)
         return duty
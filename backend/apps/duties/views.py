@@ -1,28 +1,25 @@
 from rest_framework import viewsets
-from rest_framework.decorators import action
 
-from apps.common.exports import create_xlsx_response
+from apps.common.conditional import ConditionalGetMixin
+from apps.common.exports import ExportMixin
 from apps.common.permissions import SuperuserOnly
 from apps.duties.models import Duty
 from apps.duties.serializers import DutySerializer
+from apps.users.models import Member
 
 
-class DutyViewSet(viewsets.ModelViewSet):
+class DutyViewSet(ConditionalGetMixin, ExportMixin, viewsets.ModelViewSet):
     queryset = Duty.objects.prefetch_related("members").order_by("name")
     serializer_class = DutySerializer
     permission_classes = [SuperuserOnly]
+    watermark_models = (Duty, Member)
+    export_filename = "funcoes"
+    export_headers = ["Função", "Remuneração (R$)", "Integrantes", "Criado em"]
 
-    @action(detail=False, methods=["get"], url_path="export")
-    def export(self, request):
-        queryset = self.get_queryset()
-        headers = ["Função", "Remuneração (R$)", "Integrantes", "Criado em"]
-        rows = [
-            [
-                duty.name,
-                duty.remuneration_cents / 100,
-                ", ".join(member.full_name for member in duty.members.all()),
-                duty.created_at.strftime("%Y-%m-%d %H:%M"),
-            ]
-            for duty in queryset
+    def build_export_row(self, duty):
+        return [
+            duty.name,
+            duty.remuneration_cents / 100,
+            ", ".join(member.full_name for member in duty.members.all()),
+            duty.created_at.strftime("%Y-%m-%d %H:%M"),
         ]
-        return create_xlsx_response("funcoes", headers, rows)
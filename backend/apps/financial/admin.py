@@ -1,11 +1,101 @@
+from django import forms
 from django.contrib import admin
+from rest_framework import serializers
 
-from apps.financial.models import FinancialEntry
+from apps.financial.models import FinancialDailyRollup, FinancialEntry, FinancialPeriodClosing
+from apps.financial.services import (
+    CLOSED_PERIOD_MESSAGE,
+    apply_financial_entry_change,
+    ensure_financial_period_open,
+    get_closed_through,
+    rebuild_financial_rollups,
+    rollup_snapshot,
+)
+
+
+class FinancialEntryAdminForm(forms.ModelForm):
+    class Meta:
+        model = FinancialEntry
+        fields = "__all__"
+
+    def clean_date(self):
+        value = self.cleaned_data["date"]
+        dates = [value, self.instance.date] if self.instance.pk else [value]
+        try:
+            ensure_financial_period_open(*dates)
+        except serializers.ValidationError as exc:
+            raise forms.ValidationError(CLOSED_PERIOD_MESSAGE) from exc
+        return value
 
 
 @admin.register(FinancialEntry)
 class FinancialEntryAdmin(admin.ModelAdmin):
+    form = FinancialEntryAdminForm
     list_display = ("date", "entry_type", "category", "value_cents", "description")
     list_filter = ("entry_type", "category", "date")
     search_fields = ("description",)
     ordering = ("-date",)
+
+    def _is_closed(self, obj) -> bool:
+        closed_through = get_closed_through()
+        return closed_through is not None and obj.date <= closed_through
+
+    def has_change_permission(self, request, obj=None):
+        if obj is not None and self._is_closed(obj):
+            return False
+        return super().has_change_permission(request, obj)
+
+    def has_delete_permission(self, request, obj=None):
+        if obj is not None and self._is_closed(obj):
+            return False
+        return super().has_delete_permission(request, obj)
+
+    def save_model(self, request, obj, form, change):
+        previous = FinancialEntry.objects.filter(pk=obj.pk).first() if change else None
+        ensure_financial_period_open(obj.date, *([previous.date] if previous else []))
+        before = rollup_snapshot(previous)
+        super().save_model(request, obj, form, change)
+        apply_financial_entry_change(before, rollup_snapshot(obj))
+
+    def delete_model(self, request, obj):
+        ensure_financial_period_open(obj.date)
+        before = rollup_snapshot(obj)
+        super().delete_model(request, obj)
+        apply_financial_entry_change(before, None)
+
+    def delete_queryset(self, request, queryset):
+        dates = set(queryset.values_list("date", flat=True))
+        ensure_financial_period_open(*dates)
+        super().delete_queryset(request, queryset)
+        rebuild_financial_rollups(dates)
+
+
+@admin.register(FinancialDailyRollup)
+class FinancialDailyRollupAdmin(admin.ModelAdmin):
+    list_display = ("date", "entry_type", "category", "total_cents", "entry_count")
+    list_filter = ("entry_type", "category")
+    ordering = ("-date",)
+
+
+@admin.register(FinancialPeriodClosing)
+class FinancialPeriodClosingAdmin(admin.ModelAdmin):
+    list_display = (
+        "period",
+        "opening_balance_cents",
+        "entradas_cents",
+        "saidas_cents",
+        "closing_balance_cents",
+        "closed_by",
+        "closed_at",
+    )
+    ordering = ("-period",)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        # Closings are removed only through the reopen action, which keeps the order.
+        return False
@@ -1,6 +1,24 @@
 from django.apps import AppConfig
+from django.db import connections
+from django.db.models.signals import post_migrate
+
+
+def ensure_search_index(sender, using, **kwargs):
+    from apps.financial.search import ENTRY_TABLE, install_search_index
+
+    connection = connections[using]
+    with connection.cursor() as cursor:
+        if ENTRY_TABLE not in connection.introspection.table_names(cursor):
+            return
+        columns = connection.introspection.get_table_description(cursor, ENTRY_TABLE)
+    if any(column.name == "search_text" for column in columns):
+        install_search_index(connection)
 
 
 class FinancialConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.financial"
+
+    def ready(self):
+        # SQLite drops the FTS triggers whenever a migration rebuilds the entries table.
+        post_migrate.connect(ensure_search_index, sender=self)
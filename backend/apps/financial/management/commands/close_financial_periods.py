@@ -0,0 +1,39 @@
+from datetime import datetime, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from apps.financial.services import (
+    close_financial_period,
+    get_next_closing_period,
+    next_month,
+)
+
+
+class Command(BaseCommand):
+    help = "Fecha, em ordem, os meses financeiros encerrados que ainda estão abertos."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--through",
+            help="Último mês a fechar (AAAA-MM). Padrão: o mês anterior ao atual.",
+        )
+
+    def handle(self, *args, **options):
+        current_month = timezone.localdate().replace(day=1)
+        through = (current_month - timedelta(days=1)).replace(day=1)
+        if options["through"]:
+            try:
+                through = datetime.strptime(options["through"], "%Y-%m").date()
+            except ValueError as exc:
+                raise CommandError("Use --through no formato AAAA-MM.") from exc
+            if through >= current_month:
+                raise CommandError("Só é possível fechar meses já encerrados.")
+
+        closed = 0
+        period = get_next_closing_period()
+        while period is not None and period <= through:
+            close_financial_period(period)
+            closed += 1
+            period = next_month(period)
+        self.stdout.write(self.style.SUCCESS(f"{closed} período(s) fechado(s)."))
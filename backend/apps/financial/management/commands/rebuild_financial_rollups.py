@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from apps.financial.services import rebuild_financial_rollups
+
+
+class Command(BaseCommand):
+    help = "Recria os totais diários do financeiro a partir dos lançamentos."
+
+    def handle(self, *args, **options):
+        total = rebuild_financial_rollups()
+        self.stdout.write(self.style.SUCCESS(f"{total} total(is) diário(s) recalculado(s)."))
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from apps.financial.search import install_search_index
+from apps.financial.services import rebuild_financial_search_text
+
+
+class Command(BaseCommand):
+    help = "Recalcula o texto de busca normalizado dos lançamentos financeiros."
+
+    def handle(self, *args, **options):
+        install_search_index()
+        total = rebuild_financial_search_text()
+        self.stdout.write(self.style.SUCCESS(f"{total} lançamento(s) atualizado(s)."))
@@ -0,0 +1,73 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:42
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def backfill_financial_rollups(apps, schema_editor):
+    FinancialEntry = apps.get_model("financial", "FinancialEntry")
+    FinancialDailyRollup = apps.get_model("financial", "FinancialDailyRollup")
+
+    totals = (
+        FinancialEntry.objects.order_by()
+        .values("date", "entry_type", "category")
+        .annotate(total_cents=Sum("value_cents"), entry_count=Count("id"))
+    )
+    FinancialDailyRollup.objects.bulk_create(
+        [FinancialDailyRollup(**row) for row in totals], batch_size=500
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("financial", "0005_alter_financialentry_description"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="FinancialDailyRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                ("date", models.DateField()),
+                (
+                    "entry_type",
+                    models.CharField(
+                        choices=[("ENTRADA", "Entrada"), ("SAIDA", "Saída")], max_length=10
+                    ),
+                ),
+                (
+                    "category",
+                    models.CharField(
+                        choices=[
+                            ("ALMOCO", "Pagamento de almoço"),
+                            ("DOACAO", "Doação"),
+                            ("NOTA", "Compra / Nota fiscal"),
+                            ("STAFF", "Pagamento de equipe"),
+                            ("DESPESA", "Despesa"),
+                            ("ESTORNO", "Estorno"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("total_cents", models.BigIntegerField(default=0)),
+                ("entry_count", models.IntegerField(default=0)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "ordering": ["date", "entry_type", "category"],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("date", "entry_type", "category"),
+                        name="financial_rollup_unique_key",
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(backfill_financial_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:47
+
+from django.db import migrations, models
+
+from apps.common.search import build_search_text
+from apps.financial.search import drop_search_index, install_search_index
+
+
+def backfill_search_text(apps, schema_editor):
+    FinancialEntry = apps.get_model("financial", "FinancialEntry")
+    entries = list(FinancialEntry.objects.select_related("lunch__member", "package__member"))
+    for entry in entries:
+        linked = entry.lunch if entry.lunch_id else entry.package if entry.package_id else None
+        member_name = linked.member.full_name if linked is not None else None
+        entry.search_text = build_search_text(entry.description, member_name)
+    FinancialEntry.objects.bulk_update(entries, ["search_text"], batch_size=500)
+
+
+def create_search_index(apps, schema_editor):
+    install_search_index(schema_editor.connection)
+
+
+def remove_search_index(apps, schema_editor):
+    drop_search_index(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("financial", "0006_financialdailyrollup"),
+        ("lunch", "0011_package_active_index"),
+        ("users", "0008_member_search_text"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="financialentry",
+            name="search_text",
+            field=models.TextField(
+                blank=True,
+                default="",
+                editable=False,
+                help_text="Normalized description plus the linked member name, used by search.",
+            ),
+        ),
+        migrations.RunPython(backfill_search_text, migrations.RunPython.noop),
+        migrations.RunPython(create_search_index, remove_search_index),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("financial", "0008_financialperiodclosing"),
+        ("lunch", "0012_lunch_date_status_index"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="financialentry",
+            index=models.Index(
+                fields=["date", "created_at", "id"], name="financial_ledger_order_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("financial", "0009_ledger_order_index"),
+        ("lunch", "0014_updated_at_index"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="financialdailyrollup",
+            index=models.Index(fields=["updated_at"], name="financial_rollup_updated_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="financialentry",
+            index=models.Index(fields=["updated_at"], name="financial_entry_updated_idx"),
+        ),
+    ]
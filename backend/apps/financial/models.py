@@ -1,7 +1,9 @@
+from django.conf import settings
 from django.core.exceptions import ValidationError
 from django.core.validators import MaxLengthValidator
 from django.db import models
 
+from apps.common.search import build_search_text
 from apps.common.text_limits import MAX_TEXT_LENGTH
 
 
@@ -39,11 +41,22 @@ class FinancialEntry(models.Model):
         blank=True,
         on_delete=models.SET_NULL,
     )
+    search_text = models.TextField(
+        blank=True,
+        default="",
+        editable=False,
+        help_text="Normalized description plus the linked member name, used by search.",
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ["-date", "-created_at"]
+        indexes = [
+            # Natural ordering of the list; backs `?cursor=` pagination.
+            models.Index(fields=["date", "created_at", "id"], name="financial_ledger_order_idx"),
+            models.Index(fields=["updated_at"], name="financial_entry_updated_idx"),
+        ]
 
     def clean(self):
         entrada_cats = {self.EntryCategory.ALMOCO, self.EntryCategory.DOACAO}
@@ -59,11 +72,74 @@ class FinancialEntry(models.Model):
         if self.entry_type == self.EntryType.SAIDA and self.category not in saida_cats:
             raise ValidationError({"category": "Categoria incompatível com saída."})
 
+    def build_search_text(self) -> str:
+        linked = self.lunch if self.lunch_id else self.package if self.package_id else None
+        member_name = linked.member.full_name if linked is not None else None
+        return build_search_text(self.description, member_name)
+
     def save(self, *args, **kwargs):
         self.full_clean()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is None or {"description", "lunch", "package"} & set(update_fields):
+            self.search_text = self.build_search_text()
+            if update_fields is not None:
+                kwargs["update_fields"] = {*update_fields, "search_text"}
         return super().save(*args, **kwargs)
 
     def __str__(self):
         return (
             f"{self.get_entry_type_display()} - {self.get_category_display()} - {self.value_cents}c"
         )
+
+
+class FinancialDailyRollup(models.Model):
+    """Per-day totals of `FinancialEntry` by type and category, maintained by the services."""
+
+    date = models.DateField()
+    entry_type = models.CharField(max_length=10, choices=FinancialEntry.EntryType.choices)
+    category = models.CharField(max_length=20, choices=FinancialEntry.EntryCategory.choices)
+    total_cents = models.BigIntegerField(default=0)
+    entry_count = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["date", "entry_type", "category"]
+        indexes = [
+            models.Index(fields=["updated_at"], name="financial_rollup_updated_idx"),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["date", "entry_type", "category"],
+                name="financial_rollup_unique_key",
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.date} {self.entry_type}/{self.category}: {self.total_cents}c"
+
+
+class FinancialPeriodClosing(models.Model):
+    """
+    Checkpoint of a closed month. Entries dated up to the end of the last closed month are
+    frozen, and all-time figures start from these rows instead of the first entry ever.
+    """
+
+    period = models.DateField(unique=True, help_text="First day of the closed month.")
+    opening_balance_cents = models.BigIntegerField()
+    entradas_cents = models.BigIntegerField()
+    saidas_cents = models.BigIntegerField()
+    closing_balance_cents = models.BigIntegerField()
+    closed_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        related_name="financial_period_closings",
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+    )
+    closed_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["-period"]
+
+    def __str__(self):
+        return f"{self.period:%Y-%m}: {self.closing_balance_cents}c"
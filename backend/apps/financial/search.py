@@ -0,0 +1,98 @@
+"""
+Indexes behind `FinancialEntry.search_text`.
+
+Postgres gets a pg_trgm GIN index, which serves the `LIKE '%...%'` of `search_text__contains`.
+SQLite has no trigram index, so it gets an FTS5 shadow table with the trigram tokenizer,
+kept in sync with `financial_financialentry` by triggers.
+"""
+
+from django.db import connection as default_connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+from apps.common.search import ensure_trigram_extension
+
+TRIGRAM_INDEX_NAME = "financial_entry_search_trgm_idx"
+FTS_TABLE = "financial_entry_search_fts"
+ENTRY_TABLE = "financial_financialentry"
+# The trigram tokenizer only indexes sequences of three or more characters.
+FTS_MIN_QUERY_LENGTH = 3
+
+_FTS_TRIGGERS = {
+    f"{FTS_TABLE}_ai": (
+        f"AFTER INSERT ON {ENTRY_TABLE} BEGIN "
+        f"INSERT INTO {FTS_TABLE}(rowid, search_text) VALUES (new.id, new.search_text); END"
+    ),
+    f"{FTS_TABLE}_ad": (
+        f"AFTER DELETE ON {ENTRY_TABLE} BEGIN "
+        f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, search_text) "
+        "VALUES ('delete', old.id, old.search_text); END"
+    ),
+    f"{FTS_TABLE}_au": (
+        f"AFTER UPDATE OF search_text ON {ENTRY_TABLE} BEGIN "
+        f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, search_text) "
+        "VALUES ('delete', old.id, old.search_text); "
+        f"INSERT INTO {FTS_TABLE}(rowid, search_text) VALUES (new.id, new.search_text); END"
+    ),
+}
+
+
+def install_search_index(connection=default_connection) -> bool:
+    """
+    Create the vendor-specific search index if it is missing. Returns True when anything was
+    (re)created. On SQLite the triggers are also checked on their own, because Django
+    rebuilds the table (dropping its triggers) on most `ALTER` migrations.
+    """
+    if connection.vendor == "postgresql":
+        ensure_trigram_extension(connection)
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            cursor.execute(
+                f"CREATE INDEX IF NOT EXISTS {TRIGRAM_INDEX_NAME} "
+                f"ON {ENTRY_TABLE} USING gin (search_text gin_trgm_ops)"
+            )
+            return False
+        if connection.vendor != "sqlite":
+            return False
+
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE (type = 'table' AND name = %s) "
+            "OR (type = 'trigger' AND tbl_name = %s AND name LIKE %s)",
+            [FTS_TABLE, ENTRY_TABLE, f"{FTS_TABLE}%"],
+        )
+        existing = {row[0] for row in cursor.fetchall()}
+        missing = ({FTS_TABLE} | set(_FTS_TRIGGERS)) - existing
+        if not missing:
+            return False
+
+        cursor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+            f"search_text, content='{ENTRY_TABLE}', content_rowid='id', tokenize='trigram')"
+        )
+        for name, body in _FTS_TRIGGERS.items():
+            cursor.execute(f"CREATE TRIGGER IF NOT EXISTS {name} {body}")
+        cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+        return True
+
+
+def drop_search_index(connection=default_connection) -> None:
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            cursor.execute(f"DROP INDEX IF EXISTS {TRIGRAM_INDEX_NAME}")
+        elif connection.vendor == "sqlite":
+            for name in _FTS_TRIGGERS:
+                cursor.execute(f"DROP TRIGGER IF EXISTS {name}")
+            cursor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+
+
+def search_text_condition(normalized_query: str, connection=default_connection) -> Q:
+    """Filter for entries whose `search_text` contains the (already normalized) query."""
+    if connection.vendor == "sqlite" and len(normalized_query) >= FTS_MIN_QUERY_LENGTH:
+        phrase = '"{}"'.format(normalized_query.replace('"', '""'))
+        return Q(
+            id__in=RawSQL(
+                f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s",
+                [phrase],
+            )
+        )
+    return Q(search_text__contains=normalized_query)
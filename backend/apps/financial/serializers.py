@@ -1,7 +1,8 @@
 from rest_framework import serializers
 
 from apps.common.validators import validate_text_length
-from apps.financial.models import FinancialEntry
+from apps.financial.models import FinancialEntry, FinancialPeriodClosing
+from apps.financial.services import close_financial_period
 
 ENTRADA_CATEGORIES = {FinancialEntry.EntryCategory.ALMOCO, FinancialEntry.EntryCategory.DOACAO}
 SAIDA_CATEGORIES = {
@@ -43,3 +44,35 @@ class FinancialEntrySerializer(serializers.ModelSerializer):
         if entry_type == FinancialEntry.EntryType.SAIDA and category not in SAIDA_CATEGORIES:
             raise serializers.ValidationError({"category": "Categoria não permitida para saída."})
         return attrs
+
+
+class FinancialPeriodClosingSerializer(serializers.ModelSerializer):
+    closed_by = serializers.CharField(source="closed_by.username", read_only=True, default=None)
+
+    class Meta:
+        model = FinancialPeriodClosing
+        fields = [
+            "id",
+            "period",
+            "opening_balance_cents",
+            "entradas_cents",
+            "saidas_cents",
+            "closing_balance_cents",
+            "closed_by",
+            "closed_at",
+        ]
+        read_only_fields = [
+            "id",
+            "opening_balance_cents",
+            "entradas_cents",
+            "saidas_cents",
+            "closing_balance_cents",
+            "closed_at",
+        ]
+        # `close_financial_period` checks the period (order and uniqueness) itself.
+        extra_kwargs = {"period": {"validators": []}}
+
+    def create(self, validated_data):
+        request = self.context.get("request")
+        user = request.user if request is not None else None
+        return close_financial_period(validated_data["period"], user=user)
@@ -0,0 +1,381 @@
+import calendar
+from collections import Counter
+from collections.abc import Iterable
+from datetime import date, timedelta
+
+from django.db import transaction
+from django.db.models import Count, F, Max, Min, Q, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from rest_framework import serializers
+
+from apps.common.search import build_search_text
+from apps.financial.models import FinancialDailyRollup, FinancialEntry, FinancialPeriodClosing
+
+RollupKey = tuple[date, str, str]
+
+CLOSED_PERIOD_MESSAGE = (
+    "Período financeiro fechado. Reabra o período para alterar lançamentos desta data."
+)
+
+
+def month_end(period: date) -> date:
+    return period.replace(day=calendar.monthrange(period.year, period.month)[1])
+
+
+def next_month(period: date) -> date:
+    return month_end(period) + timedelta(days=1)
+
+
+def get_closed_through() -> date | None:
+    """Last day of the last closed month, or None when no period has been closed."""
+    last_period = FinancialPeriodClosing.objects.aggregate(last=Max("period"))["last"]
+    return month_end(last_period) if last_period else None
+
+
+def ensure_financial_period_open(*dates: date, field_name: str = "date") -> None:
+    """Reject writes to entries dated inside a closed period."""
+    if not dates:
+        return
+    closed_through = get_closed_through()
+    if closed_through is not None and min(dates) <= closed_through:
+        raise serializers.ValidationError({field_name: [CLOSED_PERIOD_MESSAGE]})
+
+
+def rollup_snapshot(entry: FinancialEntry | None) -> tuple[RollupKey, int] | None:
+    """The rollup key and value an entry currently contributes; take it before changing one."""
+    if entry is None or entry.pk is None:
+        return None
+    return (entry.date, entry.entry_type, entry.category), entry.value_cents
+
+
+def apply_rollup_deltas(deltas: dict[RollupKey, tuple[int, int]]) -> None:
+    """Add `(total_cents, entry_count)` deltas to the daily rollup rows, creating missing ones."""
+    for (day, entry_type, category), (delta_cents, delta_count) in deltas.items():
+        if not delta_cents and not delta_count:
+            continue
+        key = {"date": day, "entry_type": entry_type, "category": category}
+        updated = FinancialDailyRollup.objects.filter(**key).update(
+            total_cents=F("total_cents") + delta_cents,
+            entry_count=F("entry_count") + delta_count,
+            updated_at=timezone.now(),
+        )
+        if updated:
+            continue
+        _, created = FinancialDailyRollup.objects.get_or_create(
+            **key, defaults={"total_cents": delta_cents, "entry_count": delta_count}
+        )
+        if not created:
+            FinancialDailyRollup.objects.filter(**key).update(
+                total_cents=F("total_cents") + delta_cents,
+                entry_count=F("entry_count") + delta_count,
+                updated_at=timezone.now(),
+            )
+
+
+def apply_financial_entry_change(
+    before: tuple[RollupKey, int] | None, after: tuple[RollupKey, int] | None
+) -> None:
+    """Move an entry's contribution from its `before` snapshot to its `after` snapshot."""
+    deltas: dict[RollupKey, tuple[int, int]] = {}
+    if before:
+        key, value = before
+        deltas[key] = (-value, -1)
+    if after:
+        key, value = after
+        cents, count = deltas.get(key, (0, 0))
+        deltas[key] = (cents + value, count + 1)
+    apply_rollup_deltas(deltas)
+
+
+@transaction.atomic
+def create_financial_entry(**fields) -> FinancialEntry:
+    ensure_financial_period_open(fields["date"])
+    entry = FinancialEntry.objects.create(**fields)
+    apply_financial_entry_change(None, rollup_snapshot(entry))
+    return entry
+
+
+@transaction.atomic
+def update_financial_entry(entry: FinancialEntry, **changes) -> FinancialEntry:
+    ensure_financial_period_open(entry.date, changes.get("date", entry.date))
+    before = rollup_snapshot(entry)
+    for field, value in changes.items():
+        setattr(entry, field, value)
+    entry.save()
+    apply_financial_entry_change(before, rollup_snapshot(entry))
+    return entry
+
+
+@transaction.atomic
+def delete_financial_entry(entry: FinancialEntry) -> None:
+    ensure_financial_period_open(entry.date)
+    before = rollup_snapshot(entry)
+    entry.delete()
+    apply_financial_entry_change(before, None)
+
+
+def bulk_create_financial_entries(entries: Iterable[FinancialEntry]) -> list[FinancialEntry]:
+    """`bulk_create` plus one rollup delta per key; call it inside the caller's transaction."""
+    entries = list(entries)
+    ensure_financial_period_open(*(entry.date for entry in entries))
+    for entry in entries:
+        entry.search_text = entry.build_search_text()
+    created = FinancialEntry.objects.bulk_create(entries)
+    cents: Counter = Counter()
+    counts: Counter = Counter()
+    for entry in created:
+        key = (entry.date, entry.entry_type, entry.category)
+        cents[key] += entry.value_cents
+        counts[key] += 1
+    apply_rollup_deltas({key: (cents[key], counts[key]) for key in cents})
+    return created
+
+
+def _snapshot_deltas(
+    removed: Iterable[tuple[RollupKey, int] | None], added: Iterable[tuple[RollupKey, int] | None]
+) -> dict[RollupKey, tuple[int, int]]:
+    cents: Counter = Counter()
+    counts: Counter = Counter()
+    for sign, snapshots in ((-1, removed), (1, added)):
+        for snapshot in snapshots:
+            if snapshot is None:
+                continue
+            key, value = snapshot
+            cents[key] += sign * value
+            counts[key] += sign
+    return {key: (cents[key], counts[key]) for key in cents.keys() | counts.keys()}
+
+
+def bulk_update_financial_entries(
+    entries: Iterable[FinancialEntry],
+    fields: Iterable[str],
+    *,
+    before: dict[int, tuple[RollupKey, int]],
+) -> int:
+    """
+    `bulk_update` of already-changed entries plus their rollup deltas. `before` maps each
+    entry id to its `rollup_snapshot` taken before the change. Call it inside the caller's
+    transaction.
+    """
+    entries = list(entries)
+    if not entries:
+        return 0
+    ensure_financial_period_open(
+        *(snapshot[0][0] for snapshot in before.values()), *(entry.date for entry in entries)
+    )
+    now = timezone.now()
+    for entry in entries:
+        entry.search_text = entry.build_search_text()
+        entry.updated_at = now
+    updated = FinancialEntry.objects.bulk_update(
+        entries, [*fields, "search_text", "updated_at"], batch_size=500
+    )
+    apply_rollup_deltas(
+        _snapshot_deltas(
+            (before.get(entry.id) for entry in entries),
+            (rollup_snapshot(entry) for entry in entries),
+        )
+    )
+    return updated
+
+
+def bulk_delete_financial_entries(entries: Iterable[FinancialEntry]) -> int:
+    """Delete entries with one query plus their rollup deltas, inside the caller's transaction."""
+    entries = list(entries)
+    if not entries:
+        return 0
+    ensure_financial_period_open(*(entry.date for entry in entries))
+    FinancialEntry.objects.filter(id__in=[entry.id for entry in entries]).delete()
+    apply_rollup_deltas(_snapshot_deltas((rollup_snapshot(entry) for entry in entries), ()))
+    return len(entries)
+
+
+@transaction.atomic
+def rebuild_financial_rollups(dates: Iterable[date] | None = None) -> int:
+    """Recreate the rollup rows (all of them, or only `dates`) from `FinancialEntry`."""
+    entries = FinancialEntry.objects.all()
+    rollups = FinancialDailyRollup.objects.all()
+    if dates is not None:
+        dates = set(dates)
+        entries = entries.filter(date__in=dates)
+        rollups = rollups.filter(date__in=dates)
+
+    totals = (
+        entries.order_by()
+        .values("date", "entry_type", "category")
+        .annotate(total_cents=Sum("value_cents"), entry_count=Count("id"))
+    )
+    rollups.delete()
+    rebuilt = FinancialDailyRollup.objects.bulk_create(
+        [FinancialDailyRollup(**row) for row in totals]
+    )
+    return len(rebuilt)
+
+
+def refresh_member_financial_search_text(member) -> int:
+    """
+    Rewrite the search column of the entries linked to `member` after a rename. `updated_at` is
+    bumped too, so the table watermark (ETags, cached counts) sees the change.
+    """
+    entries = list(
+        FinancialEntry.objects.filter(Q(lunch__member=member) | Q(package__member=member)).only(
+            "id", "description"
+        )
+    )
+    now = timezone.now()
+    for entry in entries:
+        entry.search_text = build_search_text(entry.description, member.full_name)
+        entry.updated_at = now
+    return FinancialEntry.objects.bulk_update(
+        entries, ["search_text", "updated_at"], batch_size=500
+    )
+
+
+@transaction.atomic
+def rebuild_financial_search_text(entry_ids: Iterable[int] | None = None) -> int:
+    """
+    Recompute the stored `search_text` of the given entries (or all of them), e.g. after a
+    `QuerySet.update` that bypassed `FinancialEntry.save`. Returns the number of rows refreshed.
+    """
+    queryset = FinancialEntry.objects.select_related("lunch__member", "package__member").only(
+        "id",
+        "description",
+        "lunch_id",
+        "lunch__member__full_name",
+        "package_id",
+        "package__member__full_name",
+    )
+    if entry_ids is not None:
+        queryset = queryset.filter(id__in=set(entry_ids))
+    entries = list(queryset)
+    now = timezone.now()
+    for entry in entries:
+        entry.search_text = entry.build_search_text()
+        entry.updated_at = now
+    return FinancialEntry.objects.bulk_update(
+        entries, ["search_text", "updated_at"], batch_size=500
+    )
+
+
+def sum_rollups(**aggregates: Q) -> dict[str, int]:
+    """
+    Conditional sums over the rollup table, e.g.
+    `sum_rollups(entradas=Q(entry_type=ENTRADA))` -> `{"entradas": ...}`.
+    """
+    return FinancialDailyRollup.objects.aggregate(
+        **{
+            name: Coalesce(Sum("total_cents", filter=condition), 0)
+            for name, condition in aggregates.items()
+        }
+    )
+
+
+def summarize_closed_periods() -> dict:
+    """Entradas/saídas of every closed month plus the last day they cover (`closed_through`)."""
+    totals = FinancialPeriodClosing.objects.aggregate(
+        entradas=Coalesce(Sum("entradas_cents"), 0),
+        saidas=Coalesce(Sum("saidas_cents"), 0),
+        last_period=Max("period"),
+    )
+    last_period = totals.pop("last_period")
+    totals["closed_through"] = month_end(last_period) if last_period else None
+    return totals
+
+
+def net_balance_before(
+    start: date, *, entry_type: str | None = None, category: str | None = None
+) -> int:
+    """
+    Entradas minus saídas of the entries dated before `start` (optionally of one type and/or
+    category): closed months that end before `start` come from their checkpoints, the days
+    after them from the daily rollups. Checkpoints carry no category, so a category reads
+    rollups only.
+    """
+    entradas = Q(entry_type=FinancialEntry.EntryType.ENTRADA)
+    saidas = Q(entry_type=FinancialEntry.EntryType.SAIDA)
+    rollups = Q(date__lt=start)
+    if entry_type:
+        rollups &= Q(entry_type=entry_type)
+    if category:
+        rollups &= Q(category=category)
+
+    net = 0
+    if not category:
+        closed = FinancialPeriodClosing.objects.filter(period__lt=start.replace(day=1)).aggregate(
+            entradas=Coalesce(Sum("entradas_cents"), 0),
+            saidas=Coalesce(Sum("saidas_cents"), 0),
+            last_period=Max("period"),
+        )
+        if closed["last_period"]:
+            rollups &= Q(date__gt=month_end(closed["last_period"]))
+        if entry_type in (None, FinancialEntry.EntryType.ENTRADA):
+            net += closed["entradas"]
+        if entry_type in (None, FinancialEntry.EntryType.SAIDA):
+            net -= closed["saidas"]
+
+    totals = sum_rollups(entradas=rollups & entradas, saidas=rollups & saidas)
+    return net + totals["entradas"] - totals["saidas"]
+
+
+def get_next_closing_period(last: FinancialPeriodClosing | None = None) -> date | None:
+    """
+    The only month that may be closed next: the one after `last` (default: the last closed
+    month), or the month of the earliest entry. None when nothing was ever recorded.
+    """
+    if last is None:
+        last = FinancialPeriodClosing.objects.order_by("-period").first()
+    if last is not None:
+        return next_month(last.period)
+    first_date = FinancialEntry.objects.aggregate(first=Min("date"))["first"]
+    return first_date.replace(day=1) if first_date else None
+
+
+@transaction.atomic
+def close_financial_period(period: date, *, user=None) -> FinancialPeriodClosing:
+    """
+    Store the checkpoint of `period`'s month. Months close in order: the first closing must be
+    the month of the earliest entry (so no history is left outside the checkpoints) and each
+    following one the month right after the last closed month.
+    """
+    period = period.replace(day=1)
+    if period >= timezone.localdate().replace(day=1):
+        raise serializers.ValidationError({"period": ["Só é possível fechar meses já encerrados."]})
+
+    last = FinancialPeriodClosing.objects.select_for_update().order_by("-period").first()
+    opening_balance = last.closing_balance_cents if last is not None else 0
+    expected = get_next_closing_period(last) or period
+    if period != expected:
+        raise serializers.ValidationError(
+            {"period": [f"Feche os períodos em ordem: o próximo é {expected:%Y-%m}."]}
+        )
+
+    in_period = Q(date__gte=period, date__lte=month_end(period))
+    totals = sum_rollups(
+        entradas=Q(entry_type=FinancialEntry.EntryType.ENTRADA) & in_period,
+        saidas=Q(entry_type=FinancialEntry.EntryType.SAIDA) & in_period,
+    )
+    return FinancialPeriodClosing.objects.create(
+        period=period,
+        opening_balance_cents=opening_balance,
+        entradas_cents=totals["entradas"],
+        saidas_cents=totals["saidas"],
+        closing_balance_cents=opening_balance + totals["entradas"] - totals["saidas"],
+        closed_by=user,
+    )
+
+
+@transaction.atomic
+def reopen_financial_period(closing: FinancialPeriodClosing) -> None:
+    """Drop the checkpoint of the last closed month so its entries can be edited again."""
+    last_period = (
+        FinancialPeriodClosing.objects.select_for_update()
+        .order_by("-period")
+        .values_list("period", flat=True)
+        .first()
+    )
+    if closing.period != last_period:
+        raise serializers.ValidationError(
+            {"period": ["Reabra primeiro os períodos fechados depois deste."]}
+        )
+    closing.delete()
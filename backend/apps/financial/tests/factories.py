@@ -1,6 +1,7 @@
 import factory
 
 from apps.financial.models import FinancialEntry
+from apps.financial.services import create_financial_entry
 
 
 class FinancialEntryFactory(factory.django.DjangoModelFactory):
@@ -12,3 +13,7 @@ class FinancialEntryFactory(factory.django.DjangoModelFactory):
     description = factory.Faker("sentence")
     value_cents = 1000
     date = factory.Faker("date_this_year")
+
+    @classmethod
+    def _create(cls, model_class, *args, **kwargs):
+        return create_financial_entry(*args, **kwargs)
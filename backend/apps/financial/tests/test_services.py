@@ -0,0 +1,203 @@
+from datetime import date
+from io import StringIO
+
+import pytest
+from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.forms.models import model_to_dict
+from rest_framework import serializers
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+
+from apps.financial.admin import (
+    FinancialEntryAdmin,
+    FinancialEntryAdminForm,
+    FinancialPeriodClosingAdmin,
+)
+from apps.financial.models import FinancialDailyRollup, FinancialEntry, FinancialPeriodClosing
+from apps.financial.services import close_financial_period, rebuild_financial_rollups
+from apps.financial.tests.factories import FinancialEntryFactory
+from apps.lunch.models import Lunch
+from apps.users.tests.factories import MemberFactory
+
+User = get_user_model()
+
+
+def rollup_rows():
+    return {
+        (row.date, row.entry_type, row.category): (row.total_cents, row.entry_count)
+        for row in FinancialDailyRollup.objects.exclude(entry_count=0)
+    }
+
+
+@pytest.mark.django_db
+def test_rollups_follow_every_financial_entry_write_path():
+    client = APIClient()
+    client.force_authenticate(
+        user=User.objects.create_superuser(username="admin", password="strong-password")
+    )
+    day = date(2026, 3, 2)
+
+    response = client.post(
+        reverse("financial-entry-list"),
+        {
+            "entry_type": FinancialEntry.EntryType.SAIDA,
+            "category": FinancialEntry.EntryCategory.NOTA,
+            "description": "Feira",
+            "value_cents": 4000,
+            "date": day,
+        },
+        format="json",
+    )
+    entry_id = response.data["id"]
+    client.patch(
+        reverse("financial-entry-detail", args=[entry_id]),
+        {"category": FinancialEntry.EntryCategory.DESPESA, "value_cents": 4500},
+        format="json",
+    )
+
+    member = MemberFactory()
+    lunch_response = client.post(
+        reverse("lunch-list"),
+        {
+            "member": member.id,
+            "value_cents": 2500,
+            "date": day,
+            "payment_status": Lunch.PaymentStatus.PAGO,
+        },
+        format="json",
+    )
+    client.patch(
+        reverse("lunch-detail", args=[lunch_response.data["id"]]),
+        {"value_cents": 3000},
+        format="json",
+    )
+
+    assert rollup_rows() == {
+        (day, FinancialEntry.EntryType.SAIDA, FinancialEntry.EntryCategory.DESPESA): (4500, 1),
+        (day, FinancialEntry.EntryType.ENTRADA, FinancialEntry.EntryCategory.ALMOCO): (3000, 1),
+    }
+
+    client.delete(reverse("lunch-detail", args=[lunch_response.data["id"]]))
+    client.delete(reverse("financial-entry-detail", args=[entry_id]))
+    assert rollup_rows() == {}
+
+
+@pytest.mark.django_db
+def test_rebuild_financial_rollups_recreates_the_table():
+    FinancialEntry.objects.create(
+        entry_type=FinancialEntry.EntryType.ENTRADA,
+        category=FinancialEntry.EntryCategory.DOACAO,
+        description="Doação",
+        value_cents=700,
+        date=date(2026, 1, 5),
+    )
+    assert rollup_rows() == {}
+
+    assert rebuild_financial_rollups() == 1
+    assert rollup_rows() == {
+        (date(2026, 1, 5), FinancialEntry.EntryType.ENTRADA, FinancialEntry.EntryCategory.DOACAO): (
+            700,
+            1,
+        )
+    }
+
+
+@pytest.mark.django_db
+def test_period_closing_freezes_entries_and_feeds_the_summary():
+    client = APIClient()
+    client.force_authenticate(
+        user=User.objects.create_superuser(username="admin", password="strong-password")
+    )
+    january = FinancialEntryFactory(value_cents=1000, date=date(2026, 1, 10))
+    february = FinancialEntryFactory(
+        entry_type=FinancialEntry.EntryType.SAIDA,
+        category=FinancialEntry.EntryCategory.DESPESA,
+        value_cents=300,
+        date=date(2026, 2, 5),
+    )
+    FinancialEntryFactory(value_cents=200, date=date(2026, 3, 1))
+    closings_url = reverse("financial-closing-list")
+
+    response = client.post(closings_url, {"period": "2026-02-01"}, format="json")
+    assert response.status_code == 400
+    assert "2026-01" in response.data["period"][0]
+
+    assert client.post(closings_url, {"period": "2026-01-01"}, format="json").status_code == 201
+    response = client.post(closings_url, {"period": "2026-02-01"}, format="json")
+    assert response.status_code == 201
+    assert response.data["opening_balance_cents"] == 1000
+    assert response.data["saidas_cents"] == 300
+    assert response.data["closing_balance_cents"] == 700
+    current_month = date.today().replace(day=1).isoformat()
+    assert client.post(closings_url, {"period": current_month}, format="json").status_code == 400
+
+    entry_url = reverse("financial-entry-detail", args=[january.id])
+    response = client.patch(entry_url, {"value_cents": 1}, format="json")
+    assert response.status_code == 400
+    assert "date" in response.data
+    moved = client.patch(
+        reverse("financial-entry-detail", args=[FinancialEntry.objects.get(date="2026-03-01").id]),
+        {"date": "2026-02-20"},
+        format="json",
+    )
+    assert moved.status_code == 400
+    assert client.delete(entry_url).status_code == 400
+
+    summary = client.get(reverse("financial-summary")).data
+    assert summary["closed_through"] == date(2026, 2, 28)
+    assert summary["total"] == {"entradas_cents": 1200, "saidas_cents": 300, "saldo_cents": 900}
+
+    january_closing = FinancialPeriodClosing.objects.get(period=date(2026, 1, 1))
+    reopen_url = reverse("financial-closing-reopen", args=[january_closing.id])
+    assert client.post(reopen_url).status_code == 400
+    february_closing = FinancialPeriodClosing.objects.get(period=date(2026, 2, 1))
+    response = client.post(reverse("financial-closing-reopen", args=[february_closing.id]))
+    assert response.status_code == 204
+
+    response = client.patch(
+        reverse("financial-entry-detail", args=[february.id]), {"value_cents": 500}, format="json"
+    )
+    assert response.status_code == 200
+
+
+@pytest.mark.django_db
+def test_admin_cannot_write_into_a_closed_period_or_delete_closings(rf):
+    superuser = User.objects.create_superuser(username="admin", password="strong-password")
+    request = rf.post("/")
+    request.user = superuser
+    FinancialEntryFactory(value_cents=1000, date=date(2026, 1, 10))
+    closing = close_financial_period(date(2026, 1, 1), user=superuser)
+    march = FinancialEntryFactory(value_cents=200, date=date(2026, 3, 1))
+
+    moved = FinancialEntryAdminForm(
+        data={**model_to_dict(march), "date": "2026-01-20"}, instance=march
+    )
+    assert not moved.is_valid()
+    assert "date" in moved.errors
+
+    entry_admin = FinancialEntryAdmin(FinancialEntry, admin.site)
+    new_entry = FinancialEntryFactory.build(value_cents=300, date=date(2026, 1, 20))
+    with pytest.raises(serializers.ValidationError):
+        entry_admin.save_model(request, new_entry, None, False)
+    assert not FinancialEntry.objects.filter(date=date(2026, 1, 20)).exists()
+
+    closing_admin = FinancialPeriodClosingAdmin(FinancialPeriodClosing, admin.site)
+    assert not closing_admin.has_delete_permission(request, closing)
+
+
+@pytest.mark.django_db
+def test_close_financial_periods_command_closes_months_in_order():
+    FinancialEntryFactory(value_cents=1000, date=date(2026, 1, 10))
+    FinancialEntryFactory(value_cents=500, date=date(2026, 3, 10))
+
+    call_command("close_financial_periods", "--through", "2026-03", stdout=StringIO())
+
+    closings = list(FinancialPeriodClosing.objects.order_by("period"))
+    assert [closing.period for closing in closings] == [
+        date(2026, 1, 1),
+        date(2026, 2, 1),
+        date(2026, 3, 1),
+    ]
+    assert [closing.closing_balance_cents for closing in closings] == [1000, 1000, 1500]
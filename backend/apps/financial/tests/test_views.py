@@ -1,10 +1,15 @@
+from datetime import date, timedelta
+
 import pytest
 from django.contrib.auth import get_user_model
 from rest_framework.reverse import reverse
 from rest_framework.test import APIClient
 
-from apps.financial.models import FinancialEntry
+from apps.financial.models import FinancialDailyRollup, FinancialEntry
+from apps.financial.services import close_financial_period
 from apps.financial.tests.factories import FinancialEntryFactory
+from apps.lunch.tests.factories import LunchFactory, PackageFactory
+from apps.users.tests.factories import MemberFactory
 
 User = get_user_model()
 
@@ -88,3 +93,190 @@ def test_filter_by_entry_type(api_client, superuser):
     assert all(
         item["entry_type"] == FinancialEntry.EntryType.ENTRADA for item in response.data["results"]
     )
+
+
+@pytest.mark.django_db
+def test_export_as_csv_streams_filtered_rows(api_client, superuser):
+    FinancialEntryFactory(
+        entry_type=FinancialEntry.EntryType.SAIDA,
+        category=FinancialEntry.EntryCategory.DESPESA,
+        description="=HYPERLINK(1)",
+        value_cents=1250,
+        date="2026-01-10",
+    )
+    FinancialEntryFactory(entry_type=FinancialEntry.EntryType.ENTRADA)
+    api_client.force_authenticate(user=superuser)
+
+    response = api_client.get(
+        reverse("financial-entry-export"),
+        {"format": "csv", "entry_type": FinancialEntry.EntryType.SAIDA},
+    )
+
+    assert response.status_code == 200
+    assert response.streaming
+    assert response["Content-Type"] == "text/csv; charset=utf-8"
+    assert response["Content-Disposition"] == 'attachment; filename="financeiro.csv"'
+    lines = b"".join(response.streaming_content).decode("utf-8-sig").splitlines()
+    assert lines[0] == "Data,Tipo,Categoria,Descrição,Valor (R$),Almoço,Pacote"
+    assert lines[1:] == ["2026-01-10,Saída,Despesa,'=HYPERLINK(1),12.5,,"]
+
+
+@pytest.mark.django_db
+def test_summary_uses_a_fixed_number_of_queries_and_breaks_down_by_category(
+    api_client, superuser, django_assert_num_queries
+):
+    today = date.today()
+    FinancialEntryFactory(value_cents=1000, date=today)
+    FinancialEntryFactory(category=FinancialEntry.EntryCategory.DOACAO, value_cents=500, date=today)
+    FinancialEntryFactory(
+        entry_type=FinancialEntry.EntryType.SAIDA,
+        category=FinancialEntry.EntryCategory.NOTA,
+        value_cents=300,
+        date=today - timedelta(days=400),
+    )
+    api_client.force_authenticate(user=superuser)
+
+    with django_assert_num_queries(4):  # watermark + closings + rollups + grouped scan
+        response = api_client.get(
+            reverse("financial-summary"),
+            {"breakdown": "category", "date_from": today.isoformat()},
+        )
+
+    assert response.status_code == 200
+    assert response.data["month"]["entradas_cents"] == 1500
+    assert response.data["total"] == {
+        "entradas_cents": 1500,
+        "saidas_cents": 300,
+        "saldo_cents": 1200,
+    }
+    filtered = response.data["filtered"]
+    assert filtered["saldo_cents"] == 1500
+    assert filtered["count"] == 2
+    assert [(row["category"], row["total_cents"]) for row in filtered["breakdown"]] == [
+        (FinancialEntry.EntryCategory.ALMOCO, 1000),
+        (FinancialEntry.EntryCategory.DOACAO, 500),
+    ]
+
+    response = api_client.get(reverse("financial-summary"), {"breakdown": "month"})
+    assert response.status_code == 400
+
+
+@pytest.mark.django_db
+def test_cashflow_buckets_totals_and_running_balance_in_a_single_scan(
+    api_client, superuser, django_assert_num_queries
+):
+    FinancialEntryFactory(value_cents=1000, date=date(2026, 1, 5))
+    FinancialEntryFactory(value_cents=500, date=date(2026, 1, 20))
+    FinancialEntryFactory(
+        entry_type=FinancialEntry.EntryType.SAIDA,
+        category=FinancialEntry.EntryCategory.DESPESA,
+        value_cents=300,
+        date=date(2026, 1, 20),
+    )
+    FinancialEntryFactory(
+        entry_type=FinancialEntry.EntryType.SAIDA,
+        category=FinancialEntry.EntryCategory.DESPESA,
+        value_cents=2000,
+        date=date(2026, 3, 2),
+    )
+    FinancialEntryFactory(value_cents=9999, date=date(2025, 12, 31))
+    api_client.force_authenticate(user=superuser)
+
+    # watermark + checkpoints and rollups before date_from + the windowed query
+    with django_assert_num_queries(4):
+        response = api_client.get(
+            reverse("financial-cashflow"), {"bucket": "month", "date_from": "2026-01-01"}
+        )
+
+    assert response.status_code == 200
+    assert response.data == {
+        "bucket": "month",
+        "periods": ["2026-01-01", "2026-03-01"],
+        "entradas_cents": [1500, 0],
+        "saidas_cents": [300, 2000],
+        "saldo_cents": [1200, -2000],
+        "saldo_acumulado_cents": [11199, 9199],
+    }
+
+    response = api_client.get(
+        reverse("financial-cashflow"),
+        {"bucket": "day", "date_from": "2026-01-01", "entry_type": "ENTRADA"},
+    )
+    assert response.data["periods"] == ["2026-01-05", "2026-01-20"]
+    assert response.data["saldo_acumulado_cents"] == [10999, 11499]
+
+    with django_assert_num_queries(2):  # no start date: the balance opens at zero
+        response = api_client.get(reverse("financial-cashflow"), {"bucket": "month"})
+    assert response.data["saldo_acumulado_cents"] == [9999, 11199, 9199]
+
+    response = api_client.get(reverse("financial-cashflow"), {"bucket": "year"})
+    assert response.status_code == 400
+
+
+@pytest.mark.django_db
+def test_cashflow_opens_with_the_balance_before_date_from(api_client, superuser):
+    FinancialEntryFactory(description="Doação", value_cents=4000, date=date(2025, 11, 5))
+    FinancialEntryFactory(
+        entry_type=FinancialEntry.EntryType.SAIDA,
+        category=FinancialEntry.EntryCategory.DESPESA,
+        description="Gás",
+        value_cents=1000,
+        date=date(2025, 12, 10),
+    )
+    FinancialEntryFactory(description="Almoço", value_cents=500, date=date(2026, 1, 10))
+    FinancialEntryFactory(description="Doação", value_cents=700, date=date(2026, 1, 20))
+    close_financial_period(date(2025, 11, 1), user=superuser)
+    # The closed month is read from its checkpoint, not from its rollups.
+    FinancialDailyRollup.objects.filter(date__lt=date(2025, 12, 1)).delete()
+    api_client.force_authenticate(user=superuser)
+    url = reverse("financial-cashflow")
+
+    response = api_client.get(url, {"bucket": "month", "date_from": "2026-01-15"})
+    assert response.data["periods"] == ["2026-01-01"]
+    assert response.data["saldo_cents"] == [700]
+    assert response.data["saldo_acumulado_cents"] == [4000 - 1000 + 500 + 700]
+
+    response = api_client.get(
+        url, {"bucket": "month", "date_range_after": "2026-01-15", "search": "doacao"}
+    )
+    assert response.data["saldo_acumulado_cents"] == [4000 + 700]
+
+
+@pytest.mark.django_db
+def test_search_uses_stored_text_and_follows_member_rename(api_client, superuser):
+    member = MemberFactory(full_name="Márcia Souza")
+    lunch_entry = FinancialEntryFactory(description="Almoço", lunch=LunchFactory(member=member))
+    package_entry = FinancialEntryFactory(
+        description="Pacote", package=PackageFactory(member=member)
+    )
+    other = FinancialEntryFactory(description="Doação da feira")
+    api_client.force_authenticate(user=superuser)
+
+    def search(value):
+        response = api_client.get(reverse("financial-entry-list"), {"search": value})
+        assert response.status_code == 200
+        return {item["id"] for item in response.data["results"]}
+
+    assert search("MARCIA") == {lunch_entry.id, package_entry.id}
+    assert search("doacao") == {other.id}
+    assert search("ço") == {lunch_entry.id, package_entry.id}
+    before_rename = api_client.get(reverse("financial-entry-list"), {"search": "marcia"})
+    assert before_rename.data["count"] == 2
+
+    member.full_name = "Nádia Lima"
+    member.save()
+
+    lunch_entry.refresh_from_db()
+    assert lunch_entry.search_text == "almoco\nnadia lima"
+    assert search("nadia") == {lunch_entry.id, package_entry.id}
+    assert search("marcia") == set()
+
+    # The rename moves the table watermark: no 304 and no cached count from before it.
+    after_rename = api_client.get(
+        reverse("financial-entry-list"),
+        {"search": "marcia"},
+        HTTP_IF_NONE_MATCH=before_rename["ETag"],
+    )
+    assert after_rename.status_code == 200
+    assert after_rename["ETag"] != before_rename["ETag"]
+    assert after_rename.data["count"] == 0
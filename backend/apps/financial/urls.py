@@ -1,12 +1,19 @@
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
-from apps.financial.views import FinancialEntryViewSet, FinancialSummaryView
+from apps.financial.views import (
+    FinancialCashflowView,
+    FinancialEntryViewSet,
+    FinancialPeriodClosingViewSet,
+    FinancialSummaryView,
+)
 
 router = DefaultRouter()
 router.register(r"entries", FinancialEntryViewSet, basename="financial-entry")
+router.register(r"closings", FinancialPeriodClosingViewSet, basename="financial-closing")
 
 urlpatterns = [
+    path("cashflow/", FinancialCashflowView.as_view(), name="financial-cashflow"),
     path("summary/", FinancialSummaryView.as_view(), name="financial-summary"),
     path("", include(router.urls)),
 ]
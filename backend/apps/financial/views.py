@@ -1,15 +1,38 @@
 import django_filters
-from django.db import models
+from django.db import models, transaction
+from django.db.models.functions import Coalesce, TruncDay, TruncMonth, TruncWeek
 from django.utils import timezone
-from rest_framework import viewsets
+from rest_framework import mixins, status, viewsets
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from apps.common.exports import cents_to_reais, create_xlsx_response
+from apps.common.conditional import ConditionalGetMixin
+from apps.common.export_jobs import ExportJobMixin
+from apps.common.exports import cents_to_reais
+from apps.common.pagination import CursorOptInPagination
 from apps.common.permissions import SuperuserOnly
-from apps.financial.models import FinancialEntry
-from apps.financial.serializers import FinancialEntrySerializer
+from apps.common.search import normalize_search_text
+from apps.financial.models import (
+    FinancialDailyRollup,
+    FinancialEntry,
+    FinancialPeriodClosing,
+)
+from apps.financial.search import search_text_condition
+from apps.financial.serializers import (
+    FinancialEntrySerializer,
+    FinancialPeriodClosingSerializer,
+)
+from apps.financial.services import (
+    apply_financial_entry_change,
+    delete_financial_entry,
+    ensure_financial_period_open,
+    net_balance_before,
+    reopen_financial_period,
+    rollup_snapshot,
+    sum_rollups,
+    summarize_closed_periods,
+)
 
 
 class FinancialEntryFilter(django_filters.FilterSet):
@@ -28,11 +51,11 @@ class FinancialEntryFilter(django_filters.FilterSet):
         if not value:
             return queryset
 
-        return queryset.filter(
-            models.Q(description__icontains=value)
-            | models.Q(lunch__member__full_name__icontains=value)
-            | models.Q(package__member__full_name__icontains=value)
-        ).distinct()
+        normalized_query = normalize_search_text(value).strip()
+        if not normalized_query:
+            return queryset
+
+        return queryset.filter(search_text_condition(normalized_query))
 
     class Meta:
         model = FinancialEntry
@@ -50,109 +73,298 @@ class FinancialEntryFilter(django_filters.FilterSet):
         ]
 
 
-class FinancialEntryViewSet(viewsets.ModelViewSet):
+class FinancialEntryViewSet(ConditionalGetMixin, ExportJobMixin, viewsets.ModelViewSet):
     queryset = FinancialEntry.objects.all().order_by("-date", "-created_at")
     serializer_class = FinancialEntrySerializer
     permission_classes = [SuperuserOnly]
     filterset_class = FinancialEntryFilter
+    pagination_class = CursorOptInPagination
+    keyset_ordering = ("-date", "-created_at", "-id")
+    export_filename = "financeiro"
+    export_job_source = "financial"
+    export_tables = (FinancialEntry,)
+    export_headers = [
+        "Data",
+        "Tipo",
+        "Categoria",
+        "Descrição",
+        "Valor (R$)",
+        "Almoço",
+        "Pacote",
+    ]
 
-    @action(detail=False, methods=["get"], url_path="export")
-    def export(self, request):
-        queryset = self.filter_queryset(self.get_queryset())
-        headers = [
-            "Data",
-            "Tipo",
-            "Categoria",
-            "Descrição",
-            "Valor (R$)",
-            "Almoço",
-            "Pacote",
-        ]
-        rows = [
-            [
-                entry.date.strftime("%Y-%m-%d"),
-                entry.get_entry_type_display(),
-                entry.get_category_display(),
-                entry.description,
-                cents_to_reais(entry.value_cents),
-                entry.lunch_id or "",
-                entry.package_id or "",
-            ]
-            for entry in queryset
+    @transaction.atomic
+    def perform_create(self, serializer):
+        ensure_financial_period_open(serializer.validated_data["date"])
+        entry = serializer.save()
+        apply_financial_entry_change(None, rollup_snapshot(entry))
+
+    @transaction.atomic
+    def perform_update(self, serializer):
+        instance = serializer.instance
+        ensure_financial_period_open(
+            instance.date, serializer.validated_data.get("date", instance.date)
+        )
+        before = rollup_snapshot(instance)
+        entry = serializer.save()
+        apply_financial_entry_change(before, rollup_snapshot(entry))
+
+    def perform_destroy(self, instance):
+        delete_financial_entry(instance)
+
+    def build_export_row(self, entry):
+        return [
+            entry.date.strftime("%Y-%m-%d"),
+            entry.get_entry_type_display(),
+            entry.get_category_display(),
+            entry.description,
+            cents_to_reais(entry.value_cents),
+            entry.lunch_id or "",
+            entry.package_id or "",
         ]
-        return create_xlsx_response("financeiro", headers, rows)
 
 
-class FinancialSummaryView(APIView):
+class FinancialPeriodClosingViewSet(
+    ConditionalGetMixin,
+    mixins.CreateModelMixin,
+    mixins.ListModelMixin,
+    mixins.RetrieveModelMixin,
+    viewsets.GenericViewSet,
+):
+    queryset = FinancialPeriodClosing.objects.select_related("closed_by").order_by("-period")
+    serializer_class = FinancialPeriodClosingSerializer
+    permission_classes = [SuperuserOnly]
+
+    @action(detail=True, methods=["post"])
+    def reopen(self, request, pk=None):
+        reopen_financial_period(self.get_object())
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+def summarize_entry_totals(entradas: int, saidas: int) -> dict:
+    return {
+        "entradas_cents": entradas,
+        "saidas_cents": saidas,
+        "saldo_cents": entradas - saidas,
+    }
+
+
+class FinancialSummaryView(ConditionalGetMixin, APIView):
+    """
+    Month, all-time and filtered totals in three queries: the closed-period checkpoints, one
+    conditional aggregation over the daily rollups after the last checkpoint and one grouped
+    scan of the filtered entries (which also feeds `?breakdown=category`).
+    """
+
     permission_classes = [SuperuserOnly]
+    watermark_models = (FinancialEntry, FinancialDailyRollup, FinancialPeriodClosing)
+    breakdown_choices = ("category",)
+
+    def get_watermark_context(self, request):
+        return [timezone.localdate()]
 
     def get(self, request):
-        today = timezone.localdate()
-        start_month = today.replace(day=1)
+        breakdown = request.query_params.get("breakdown")
+        if breakdown and breakdown not in self.breakdown_choices:
+            return Response({"breakdown": "Use breakdown=category."}, status=400)
 
-        entries = FinancialEntry.objects.all()
-        month_entries = entries.filter(date__gte=start_month, date__lte=today)
+        filterset = FinancialEntryFilter(request.GET, queryset=FinancialEntry.objects.all())
+        if not filterset.is_valid():
+            return Response(filterset.errors, status=400)
 
-        month_entradas = (
-            month_entries.filter(entry_type=FinancialEntry.EntryType.ENTRADA).aggregate(
-                total=models.Sum("value_cents")
-            )["total"]
-            or 0
+        today = timezone.localdate()
+        start_month = today.replace(day=1)
+        entrada = models.Q(entry_type=FinancialEntry.EntryType.ENTRADA)
+        saida = models.Q(entry_type=FinancialEntry.EntryType.SAIDA)
+        in_month = models.Q(date__gte=start_month, date__lte=today)
+        closed = summarize_closed_periods()
+        after_closing = (
+            models.Q(date__gt=closed["closed_through"]) if closed["closed_through"] else models.Q()
         )
-        month_saidas = (
-            month_entries.filter(entry_type=FinancialEntry.EntryType.SAIDA).aggregate(
-                total=models.Sum("value_cents")
-            )["total"]
-            or 0
+        totals = sum_rollups(
+            month_entradas=entrada & in_month,
+            month_saidas=saida & in_month,
+            total_entradas=entrada & after_closing,
+            total_saidas=saida & after_closing,
         )
-        total_entradas = (
-            entries.filter(entry_type=FinancialEntry.EntryType.ENTRADA).aggregate(
-                total=models.Sum("value_cents")
-            )["total"]
-            or 0
+
+        group_fields = ["entry_type", "category"] if breakdown else ["entry_type"]
+        groups = list(
+            filterset.qs.order_by()
+            .values(*group_fields)
+            .annotate(total=models.Sum("value_cents"), count=models.Count("id"))
+        )
+        filtered_totals = {entry_type: 0 for entry_type in FinancialEntry.EntryType.values}
+        for group in groups:
+            filtered_totals[group["entry_type"]] += group["total"]
+
+        filtered = summarize_entry_totals(
+            filtered_totals[FinancialEntry.EntryType.ENTRADA],
+            filtered_totals[FinancialEntry.EntryType.SAIDA],
         )
-        total_saidas = (
-            entries.filter(entry_type=FinancialEntry.EntryType.SAIDA).aggregate(
-                total=models.Sum("value_cents")
-            )["total"]
-            or 0
+        filtered["count"] = sum(group["count"] for group in groups)
+        if breakdown:
+            filtered["breakdown"] = self._build_category_breakdown(groups)
+
+        return Response(
+            {
+                "month": summarize_entry_totals(totals["month_entradas"], totals["month_saidas"]),
+                "total": summarize_entry_totals(
+                    closed["entradas"] + totals["total_entradas"],
+                    closed["saidas"] + totals["total_saidas"],
+                ),
+                "closed_through": closed["closed_through"],
+                "filtered": filtered,
+            }
         )
 
-        filterset = FinancialEntryFilter(request.GET, queryset=entries)
+    @staticmethod
+    def _build_category_breakdown(groups: list[dict]) -> list[dict]:
+        category_order = FinancialEntry.EntryCategory.values
+        labels = dict(FinancialEntry.EntryCategory.choices)
+        return [
+            {
+                "entry_type": group["entry_type"],
+                "category": group["category"],
+                "category_label": labels.get(group["category"], group["category"]),
+                "total_cents": group["total"],
+                "count": group["count"],
+            }
+            for group in sorted(
+                groups,
+                key=lambda group: (
+                    group["entry_type"],
+                    (
+                        category_order.index(group["category"])
+                        if group["category"] in category_order
+                        else len(category_order)
+                    ),
+                ),
+            )
+        ]
+
+
+class FinancialCashflowView(ConditionalGetMixin, APIView):
+    """
+    Entradas, saídas and running balance per day/week/month in a single query.
+
+    Bucket totals are window sums partitioned by the truncated date and the running balance
+    is a window sum ordered by it, so the database returns one row per bucket (`DISTINCT`)
+    without a second pass. The response is columnar: one array per series, aligned by index.
+
+    With a start date, the running balance opens with the net of the matching entries before
+    it: from closing checkpoints and daily rollups when the other filters are only
+    `entry_type`/`category`, else from one aggregate over those entries.
+    """
+
+    permission_classes = [SuperuserOnly]
+    watermark_models = (FinancialEntry, FinancialDailyRollup, FinancialPeriodClosing)
+    bucket_functions = {"day": TruncDay, "week": TruncWeek, "month": TruncMonth}
+    default_bucket = "month"
+    date_filters = ("date", "date_from", "date_to", "date_range")
+    rollup_filters = ("entry_type", "category")
+
+    def get(self, request):
+        bucket = request.query_params.get("bucket") or self.default_bucket
+        trunc = self.bucket_functions.get(bucket)
+        if trunc is None:
+            return Response({"bucket": "Use bucket=day, bucket=week ou bucket=month."}, status=400)
+
+        filterset = FinancialEntryFilter(request.GET, queryset=FinancialEntry.objects.all())
         if not filterset.is_valid():
             return Response(filterset.errors, status=400)
 
-        filtered_entries = filterset.qs
-        filtered_entradas = (
-            filtered_entries.filter(entry_type=FinancialEntry.EntryType.ENTRADA).aggregate(
-                total=models.Sum("value_cents")
-            )["total"]
-            or 0
-        )
-        filtered_saidas = (
-            filtered_entries.filter(entry_type=FinancialEntry.EntryType.SAIDA).aggregate(
-                total=models.Sum("value_cents")
-            )["total"]
-            or 0
+        entrada = models.Q(entry_type=FinancialEntry.EntryType.ENTRADA)
+        saida = models.Q(entry_type=FinancialEntry.EntryType.SAIDA)
+        zero = models.Value(0)
+        by_bucket = {"partition_by": [models.F("period")]}
+        rows = (
+            filterset.qs.order_by()
+            .annotate(period=trunc("date"))
+            .annotate(
+                entradas=models.Window(
+                    models.Sum(models.Case(models.When(entrada, then="value_cents"), default=zero)),
+                    **by_bucket,
+                ),
+                saidas=models.Window(
+                    models.Sum(models.Case(models.When(saida, then="value_cents"), default=zero)),
+                    **by_bucket,
+                ),
+                running_balance=models.Window(
+                    models.Sum(
+                        models.Case(
+                            models.When(entrada, then=models.F("value_cents")),
+                            models.When(saida, then=-models.F("value_cents")),
+                            default=zero,
+                        )
+                    ),
+                    order_by=models.F("period").asc(),
+                ),
+            )
+            .values_list("period", "entradas", "saidas", "running_balance")
+            .distinct()
+            .order_by("period")
         )
 
+        opening = self._opening_balance(request, filterset.form.cleaned_data)
+        periods, entradas, saidas, saldos, running = [], [], [], [], []
+        for period, period_entradas, period_saidas, period_running in rows:
+            periods.append(period.isoformat())
+            entradas.append(period_entradas)
+            saidas.append(period_saidas)
+            saldos.append(period_entradas - period_saidas)
+            running.append(opening + period_running)
+
         return Response(
             {
-                "month": {
-                    "entradas_cents": month_entradas,
-                    "saidas_cents": month_saidas,
-                    "saldo_cents": month_entradas - month_saidas,
-                },
-                "total": {
-                    "entradas_cents": total_entradas,
-                    "saidas_cents": total_saidas,
-                    "saldo_cents": total_entradas - total_saidas,
-                },
-                "filtered": {
-                    "entradas_cents": filtered_entradas,
-                    "saidas_cents": filtered_saidas,
-                    "saldo_cents": filtered_entradas - filtered_saidas,
-                    "count": filtered_entries.count(),
-                },
+                "bucket": bucket,
+                "periods": periods,
+                "entradas_cents": entradas,
+                "saidas_cents": saidas,
+                "saldo_cents": saldos,
+                "saldo_acumulado_cents": running,
             }
         )
+
+    def _opening_balance(self, request, filters: dict) -> int:
+        date_range = filters.get("date_range")
+        starts = [
+            value
+            for value in (
+                filters.get("date"),
+                filters.get("date_from"),
+                date_range and date_range.start,
+            )
+            if value
+        ]
+        if not starts:
+            return 0
+        start = max(starts)
+
+        other_filters = {
+            name
+            for name, value in filters.items()
+            if value not in (None, "") and name not in self.date_filters
+        }
+        if other_filters <= set(self.rollup_filters):
+            return net_balance_before(
+                start,
+                entry_type=filters.get("entry_type") or None,
+                category=filters.get("category") or None,
+            )
+
+        # Filters the rollups do not carry (search, value): sum the matching entries instead.
+        params = request.GET.copy()
+        for name in list(params):
+            if name.startswith("date"):
+                del params[name]
+        before = FinancialEntryFilter(
+            params, queryset=FinancialEntry.objects.filter(date__lt=start)
+        )
+        entrada = models.Q(entry_type=FinancialEntry.EntryType.ENTRADA)
+        saida = models.Q(entry_type=FinancialEntry.EntryType.SAIDA)
+        totals = before.qs.order_by().aggregate(
+            entradas=Coalesce(models.Sum("value_cents", filter=entrada), 0),
+            saidas=Coalesce(models.Sum("value_cents", filter=saida), 0),
+        )
+        return totals["entradas"] - totals["saidas"]
@@ -0,0 +1,43 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from apps.lunch.services import expire_packages
+
+
+class Command(BaseCommand):
+    help = "Marca como expirados os pacotes válidos cuja validade já passou."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help="Ignora a marca da última execução e verifica todos os pacotes válidos.",
+        )
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Repete a varredura a cada --interval segundos, em vez de encerrar.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=settings.PACKAGE_EXPIRATION_SWEEP_INTERVAL,
+            help="Intervalo, em segundos, entre varreduras com --loop.",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            try:
+                expired = expire_packages(full=options["full"])
+            finally:
+                close_old_connections()
+            if expired or not options["loop"]:
+                self.stdout.write(
+                    self.style.SUCCESS(f"{expired} pacote(s) marcado(s) como expirado(s).")
+                )
+            if not options["loop"]:
+                return
+            time.sleep(options["interval"])
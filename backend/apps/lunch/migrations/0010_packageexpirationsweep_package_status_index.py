@@ -0,0 +1,42 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("lunch", "0009_lunch_package_beneficiary_and_packageentry_beneficiary"),
+        ("users", "0007_alter_member_address_alter_member_heard_about_and_more"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PackageExpirationSweep",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                (
+                    "swept_through",
+                    models.DateField(
+                        help_text="Pacotes com validade anterior a esta data já foram marcados como expirados."
+                    ),
+                ),
+                ("expired_count", models.PositiveIntegerField(default=0)),
+                ("ran_at", models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                "ordering": ["-swept_through", "-id"],
+            },
+        ),
+        migrations.AddIndex(
+            model_name="package",
+            index=models.Index(
+                fields=["status", "expiration"], name="lunch_package_status_exp_idx"
+            ),
+        ),
+    ]
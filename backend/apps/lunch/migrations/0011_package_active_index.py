@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("lunch", "0010_packageexpirationsweep_package_status_index"),
+        ("users", "0007_alter_member_address_alter_member_heard_about_and_more"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="package",
+            index=models.Index(
+                condition=models.Q(("remaining_quantity__gt", 0), ("status", "VALIDO")),
+                fields=["member", "date", "id"],
+                name="lunch_package_active_idx",
+            ),
+        ),
+    ]
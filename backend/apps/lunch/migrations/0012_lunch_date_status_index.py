@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("lunch", "0011_package_active_index"),
+        ("users", "0008_member_search_text"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="lunch",
+            index=models.Index(fields=["date", "payment_status"], name="lunch_date_status_idx"),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("lunch", "0012_lunch_date_status_index"),
+        ("users", "0008_member_search_text"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="lunch",
+            index=models.Index(fields=["date", "created_at", "id"], name="lunch_ledger_order_idx"),
+        ),
+    ]
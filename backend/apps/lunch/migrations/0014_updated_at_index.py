@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:44
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("lunch", "0013_ledger_order_index"),
+        ("users", "0010_updated_at_index"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="lunch",
+            index=models.Index(fields=["updated_at"], name="lunch_lunch_updated_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="package",
+            index=models.Index(fields=["updated_at"], name="lunch_package_updated_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="packageentry",
+            index=models.Index(fields=["updated_at"], name="lunch_pkgentry_updated_idx"),
+        ),
+    ]
@@ -40,6 +40,15 @@ class Package(models.Model):
 
     class Meta:
         ordering = ["-date", "-created_at"]
+        indexes = [
+            models.Index(fields=["status", "expiration"], name="lunch_package_status_exp_idx"),
+            models.Index(
+                fields=["member", "date", "id"],
+                condition=models.Q(remaining_quantity__gt=0, status="VALIDO"),
+                name="lunch_package_active_idx",
+            ),
+            models.Index(fields=["updated_at"], name="lunch_package_updated_idx"),
+        ]
 
     def clean(self):
         missing = {}
@@ -123,6 +132,13 @@ class Lunch(models.Model):
 
     class Meta:
         ordering = ["-date", "-created_at"]
+        indexes = [
+            # Covers the per-day attendance counts (`count_lunches_by_date`).
+            models.Index(fields=["date", "payment_status"], name="lunch_date_status_idx"),
+            # Natural ordering of the list; backs `?cursor=` pagination.
+            models.Index(fields=["date", "created_at", "id"], name="lunch_ledger_order_idx"),
+            models.Index(fields=["updated_at"], name="lunch_lunch_updated_idx"),
+        ]
 
     def __str__(self):
         return f"{self.member.full_name} - Almoço - {self.date}"
@@ -168,6 +184,9 @@ class PackageEntry(models.Model):
 
     class Meta:
         ordering = ["-created_at", "-id"]
+        indexes = [
+            models.Index(fields=["updated_at"], name="lunch_pkgentry_updated_idx"),
+        ]
 
     def clean(self):
         errors = {}
@@ -188,3 +207,17 @@ class PackageEntry(models.Model):
 
     def __str__(self):
         return f"{self.get_entry_type_display()} - {self.package_id} - {self.quantity}"
+
+
+class PackageExpirationSweep(models.Model):
+    swept_through = models.DateField(
+        help_text="Pacotes com validade anterior a esta data já foram marcados como expirados."
+    )
+    expired_count = models.PositiveIntegerField(default=0)
+    ran_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["-swept_through", "-id"]
+
+    def __str__(self):
+        return f"Expiração de pacotes até {self.swept_through} - {self.expired_count}"
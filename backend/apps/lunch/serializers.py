@@ -2,10 +2,13 @@ from django.db import transaction
 from django.utils import timezone
 from rest_framework import serializers
 
-from apps.common.roles import promote_role
-from apps.credits.services import sync_lunch_credit_entry
-from apps.financial.models import FinancialEntry
+from apps.common.ledger import post_lunches, post_packages
 from apps.lunch.models import Lunch, Package, PackageEntry
+from apps.lunch.services import (
+    MAX_BULK_LUNCHES,
+    build_bulk_lunch_context,
+    resolve_active_package,
+)
 from apps.users.models import Member
 
 
@@ -135,52 +138,17 @@ class PackageSerializer(serializers.ModelSerializer):
         return attrs
 
     def create(self, validated_data):
-        instance = super().create(validated_data)
-        promote_role(instance.member, Member.Role.MENSALISTA)
-        self._sync_financial_entry(instance, prev_status=None, prev_value=None, prev_date=None)
+        with transaction.atomic():
+            instance = super().create(validated_data)
+            post_packages([instance], created=True)
         return instance
 
     def update(self, instance, validated_data):
-        prev_status = instance.payment_status
-        prev_value = instance.value_cents
-        prev_date = instance.date
-        instance = super().update(instance, validated_data)
-        self._sync_financial_entry(
-            instance, prev_status=prev_status, prev_value=prev_value, prev_date=prev_date
-        )
+        with transaction.atomic():
+            instance = super().update(instance, validated_data)
+            post_packages([instance])
         return instance
 
-    def _sync_financial_entry(self, instance, prev_status, prev_value, prev_date):
-        entry = getattr(instance, "financial_entry", None)
-        is_paid_now = instance.payment_status == Package.PaymentStatus.PAGO
-        was_paid = prev_status == Package.PaymentStatus.PAGO
-
-        if is_paid_now and instance.value_cents > 0:
-            description = f"Pagamento pacote - {instance.member.full_name} - {instance.date}"
-            if entry:
-                if (
-                    (prev_value != instance.value_cents)
-                    or (prev_date != instance.date)
-                    or (entry.description != description)
-                ):
-                    entry.value_cents = instance.value_cents
-                    entry.date = instance.date
-                    entry.description = description
-                    entry.entry_type = FinancialEntry.EntryType.ENTRADA
-                    entry.category = FinancialEntry.EntryCategory.ALMOCO
-                    entry.save()
-            else:
-                FinancialEntry.objects.create(
-                    entry_type=FinancialEntry.EntryType.ENTRADA,
-                    category=FinancialEntry.EntryCategory.ALMOCO,
-                    description=description,
-                    value_cents=instance.value_cents,
-                    date=instance.date,
-                    package=instance,
-                )
-        elif was_paid and entry:
-            entry.delete()
-
 
 class PackageEntrySerializer(serializers.ModelSerializer):
     created_by_name = serializers.CharField(source="created_by.get_username", read_only=True)
@@ -226,21 +194,43 @@ class ManualPackageEntrySerializer(serializers.Serializer):
     description = serializers.CharField(allow_blank=False, trim_whitespace=True)
 
 
+class PrefetchedPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """
+    Resolve primary keys from `context["prefetched"][Model]` when a bulk caller has already
+    loaded the rows, falling back to the regular per-value query otherwise.
+    """
+
+    def to_internal_value(self, data):
+        cache = self.context.get("prefetched", {}).get(self.get_queryset().model)
+        if cache is None:
+            return super().to_internal_value(data)
+        if isinstance(data, bool):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+        try:
+            pk = int(data)
+        except (TypeError, ValueError):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+        instance = cache.get(pk)
+        if instance is None:
+            self.fail("does_not_exist", pk_value=data)
+        return instance
+
+
 class LunchSerializer(serializers.ModelSerializer):
-    member = serializers.PrimaryKeyRelatedField(queryset=Member.objects.all())
+    member = PrefetchedPrimaryKeyRelatedField(queryset=Member.objects.all())
     member_name = serializers.CharField(source="member.full_name", read_only=True)
-    credit_owner = serializers.PrimaryKeyRelatedField(
+    credit_owner = PrefetchedPrimaryKeyRelatedField(
         queryset=Member.objects.all(),
         required=False,
         allow_null=True,
     )
     credit_owner_name = serializers.CharField(source="credit_owner.full_name", read_only=True)
-    package = serializers.PrimaryKeyRelatedField(
+    package = PrefetchedPrimaryKeyRelatedField(
         queryset=Package.objects.all(),
         required=False,
         allow_null=True,
     )
-    package_beneficiary = serializers.PrimaryKeyRelatedField(
+    package_beneficiary = PrefetchedPrimaryKeyRelatedField(
         queryset=Member.objects.all(),
         required=False,
         allow_null=True,
@@ -280,8 +270,10 @@ class LunchSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("Valor deve ser maior ou igual a zero.")
         return value
 
-    def _build_package_usage_description(self, instance: Lunch) -> str:
-        return f"Uso em almoço - {instance.date}"
+    def _find_available_package(self, member: Member, date) -> Package | None:
+        return resolve_active_package(
+            member.id, date, candidates=self.context.get("package_candidates")
+        )
 
     def validate(self, attrs):
         member = attrs.get("member") or getattr(self.instance, "member", None)
@@ -310,16 +302,7 @@ class LunchSerializer(serializers.ModelSerializer):
         if use_package and not package:
             if not member or not date:
                 raise serializers.ValidationError({"package": "Informe integrante e data do almoço."})
-            package = (
-                Package.objects.filter(
-                    member=member,
-                    remaining_quantity__gt=0,
-                    status=Package.PackageStatus.VALIDO,
-                    expiration__gte=date,
-                )
-                .order_by("date", "id")
-                .first()
-            )
+            package = self._find_available_package(member, date)
             if not package:
                 raise serializers.ValidationError({"package": "Nenhum pacote válido disponível."})
             attrs["package"] = package
@@ -357,102 +340,53 @@ class LunchSerializer(serializers.ModelSerializer):
         validated_data.pop("use_package", None)
         with transaction.atomic():
             instance = super().create(validated_data)
-            if instance.package_id:
-                package = instance.package
-                if package.remaining_quantity <= 0:
-                    raise serializers.ValidationError({"package": "Pacote sem saldo."})
-                package.remaining_quantity -= 1
-                package.save(update_fields=["remaining_quantity", "updated_at"])
-                PackageEntry.objects.create(
-                    package=package,
-                    entry_type=PackageEntry.EntryType.DEBITO,
-                    origin=PackageEntry.Origin.LUNCH,
-                    quantity=1,
-                    description=self._build_package_usage_description(instance),
-                    lunch=instance,
-                    beneficiary=instance.package_beneficiary,
-                )
-            promote_role(instance.member, Member.Role.MENSALISTA)
-            self._sync_credit_entry(instance)
-            self._sync_financial_entry(instance, prev_status=None, prev_value=None, prev_date=None)
+            post_lunches([instance], actor=self._get_actor(), created=True)
         return instance
 
     def update(self, instance, validated_data):
         validated_data.pop("use_package", None)
-        prev_status = instance.payment_status
-        prev_value = instance.value_cents
-        prev_date = instance.date
-        old_package = instance.package
-        new_package = validated_data.get("package", instance.package)
-        package_changed = (old_package.id if old_package else None) != (
-            new_package.id if new_package else None
-        )
+        held_package_id = instance.package_id
         with transaction.atomic():
             instance = super().update(instance, validated_data)
-            if old_package and package_changed:
-                old_package.remaining_quantity += 1
-                old_package.save(update_fields=["remaining_quantity", "updated_at"])
-                PackageEntry.objects.filter(lunch=instance, origin=PackageEntry.Origin.LUNCH).delete()
-            if new_package and package_changed:
-                if new_package.remaining_quantity <= 0:
-                    raise serializers.ValidationError({"package": "Pacote sem saldo."})
-                new_package.remaining_quantity -= 1
-                new_package.save(update_fields=["remaining_quantity", "updated_at"])
-            if new_package:
-                PackageEntry.objects.update_or_create(
-                    lunch=instance,
-                    defaults={
-                        "package": new_package,
-                        "entry_type": PackageEntry.EntryType.DEBITO,
-                        "origin": PackageEntry.Origin.LUNCH,
-                        "quantity": 1,
-                        "description": self._build_package_usage_description(instance),
-                        "beneficiary": instance.package_beneficiary,
-                    },
-                )
-            self._sync_credit_entry(instance)
-            self._sync_financial_entry(
-                instance, prev_status=prev_status, prev_value=prev_value, prev_date=prev_date
+            post_lunches(
+                [instance],
+                actor=self._get_actor(),
+                held_package_ids={instance.id: held_package_id},
             )
         return instance
 
-    def _sync_credit_entry(self, instance):
+    def _get_actor(self):
         request = self.context.get("request")
-        actor = request.user if request and request.user.is_authenticated else None
-        sync_lunch_credit_entry(instance, actor=actor)
-
-    def _sync_financial_entry(self, instance, prev_status, prev_value, prev_date):
-        entry = getattr(instance, "financial_entry", None)
-        is_paid_now = instance.payment_status == Lunch.PaymentStatus.PAGO
-        was_paid = prev_status == Lunch.PaymentStatus.PAGO
-
-        if instance.package_id or instance.payment_mode == Lunch.PaymentMode.TROCA:
-            if entry:
-                entry.delete()
-            return
-
-        if is_paid_now and instance.value_cents > 0:
-            description = f"Pagamento almoço - {instance.member.full_name} - {instance.date}"
-            if entry:
-                if (
-                    (prev_value != instance.value_cents)
-                    or (prev_date != instance.date)
-                    or (entry.description != description)
-                ):
-                    entry.value_cents = instance.value_cents
-                    entry.date = instance.date
-                    entry.description = description
-                    entry.entry_type = FinancialEntry.EntryType.ENTRADA
-                    entry.category = FinancialEntry.EntryCategory.ALMOCO
-                    entry.save()
-            else:
-                FinancialEntry.objects.create(
-                    entry_type=FinancialEntry.EntryType.ENTRADA,
-                    category=FinancialEntry.EntryCategory.ALMOCO,
-                    description=description,
-                    value_cents=instance.value_cents,
-                    date=instance.date,
-                    lunch=instance,
-                )
-        elif was_paid and entry:
-            entry.delete()
+        return request.user if request and request.user.is_authenticated else None
+
+
+class LunchBulkSerializer(serializers.Serializer):
+    lunches = serializers.ListField(
+        child=serializers.DictField(),
+        allow_empty=False,
+        max_length=MAX_BULK_LUNCHES,
+    )
+    all_or_nothing = serializers.BooleanField(required=False, default=False)
+
+    def validate_rows(self) -> tuple[list[tuple[int, dict]], list[dict]]:
+        """
+        Validate each row with `LunchSerializer` against relations loaded once for the whole
+        batch. Package balances are reserved in memory as rows pass, so later rows of the same
+        batch see what earlier rows consumed.
+        """
+        rows = self.validated_data["lunches"]
+        context = {**self.context, **build_bulk_lunch_context(rows)}
+
+        valid_rows: list[tuple[int, dict]] = []
+        errors: list[dict] = []
+        for index, row in enumerate(rows):
+            serializer = LunchSerializer(data=row, context=context)
+            if not serializer.is_valid():
+                errors.append({"index": index, "errors": serializer.errors})
+                continue
+            data = dict(serializer.validated_data)
+            data.pop("use_package", None)
+            if data.get("package"):
+                data["package"].remaining_quantity -= 1
+            valid_rows.append((index, data))
+        return valid_rows, errors
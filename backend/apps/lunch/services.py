@@ -0,0 +1,313 @@
+from collections import Counter, defaultdict
+from collections.abc import Iterable
+
+from django.contrib.auth.models import User
+from django.db import connections, router, transaction
+from django.db.models import Count, Exists, OuterRef, Q
+from django.utils import timezone
+
+from apps.common.ledger import (
+    INSUFFICIENT_CREDIT_ERROR,
+    INSUFFICIENT_PACKAGE_ERROR,
+    InsufficientCreditError,
+    give_back_package_meals,
+    post_lunches,
+    take_package_meals,
+)
+from apps.lunch.models import Lunch, Package, PackageEntry, PackageExpirationSweep
+from apps.users.models import Member
+
+MAX_BULK_LUNCHES = 200
+# Key of the Postgres advisory lock held by a running package expiration sweep.
+PACKAGE_EXPIRATION_LOCK_KEY = 4_151_802
+
+
+@transaction.atomic
+def consume_package(
+    package: Package, quantity: int = 1, *, entries: Iterable[PackageEntry] = ()
+) -> bool:
+    """
+    Take `quantity` meals from a package with a single conditional UPDATE
+    (`remaining_quantity >= quantity`), writing the given history entries alongside it.
+    Returns False without writing anything when the balance is insufficient.
+    """
+    if not take_package_meals(package.id, quantity):
+        return False
+    PackageEntry.objects.bulk_create(entries)
+    package.refresh_from_db(fields=["remaining_quantity", "updated_at"])
+    return True
+
+
+@transaction.atomic
+def restore_package(
+    package: Package,
+    quantity: int = 1,
+    *,
+    entries: Iterable[PackageEntry] = (),
+    clamp: bool = False,
+) -> bool:
+    """
+    Give `quantity` meals back to a package with a single conditional UPDATE. Without `clamp`
+    the update only applies while the result stays within `quantity`; with `clamp` the balance
+    is capped at the package quantity instead.
+    """
+    if not give_back_package_meals(package.id, quantity, clamp=clamp):
+        return False
+    PackageEntry.objects.bulk_create(entries)
+    package.refresh_from_db(fields=["remaining_quantity", "updated_at"])
+    return True
+
+
+def _claim_package_expiration_sweep() -> bool:
+    """
+    Take a transaction-scoped advisory lock on Postgres so overlapping runs (cron on two hosts,
+    a manual run during the scheduled one) sweep once. Other databases always claim.
+    """
+    connection = connections[router.db_for_write(PackageExpirationSweep)]
+    if connection.vendor != "postgresql":
+        return True
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT pg_try_advisory_xact_lock(%s)", [PACKAGE_EXPIRATION_LOCK_KEY])
+        return cursor.fetchone()[0]
+
+
+def expire_packages(*, today=None, full: bool = False) -> int:
+    """
+    Flip every valid package whose expiration has passed to EXPIRADO with one UPDATE.
+
+    Only expirations since the last sweep's watermark are scanned unless `full` is set. Runs
+    that find the watermark already at `today`, or another run still sweeping, return 0
+    without writing.
+    """
+    today = today or timezone.localdate()
+    last_sweep = PackageExpirationSweep.objects.first()
+    if last_sweep and last_sweep.swept_through >= today and not full:
+        return 0
+
+    queryset = Package.objects.filter(
+        status=Package.PackageStatus.VALIDO,
+        expiration__lt=today,
+    )
+    if last_sweep and not full:
+        queryset = queryset.filter(expiration__gte=last_sweep.swept_through)
+
+    with transaction.atomic():
+        if not _claim_package_expiration_sweep():
+            return 0
+        expired = queryset.update(status=Package.PackageStatus.EXPIRADO, updated_at=timezone.now())
+        PackageExpirationSweep.objects.create(swept_through=today, expired_count=expired)
+    return expired
+
+
+def count_lunches_by_date(date_from, date_to, *, queryset=None) -> dict:
+    """
+    Lunch counts per day in `[date_from, date_to]` from one `GROUP BY date` query, served by
+    the `(date, payment_status)` index. Days without lunches are absent from the result.
+    Returns `{date: {"total": n, "pago": n, "em_aberto": n}}`.
+    """
+    queryset = Lunch.objects.all() if queryset is None else queryset
+    rows = (
+        queryset.filter(date__gte=date_from, date__lte=date_to)
+        .order_by()
+        .values("date")
+        .annotate(
+            total=Count("date"),
+            pago=Count("date", filter=Q(payment_status=Lunch.PaymentStatus.PAGO)),
+            em_aberto=Count("date", filter=Q(payment_status=Lunch.PaymentStatus.EM_ABERTO)),
+        )
+    )
+    return {row.pop("date"): row for row in rows}
+
+
+def active_packages_queryset():
+    """
+    Packages that can still be used automatically, in consumption order (oldest purchase
+    first). Served by the partial index `lunch_package_active_idx`.
+    """
+    return Package.objects.filter(
+        remaining_quantity__gt=0,
+        status=Package.PackageStatus.VALIDO,
+    ).order_by("member_id", "date", "id")
+
+
+def get_active_package_candidates(
+    member_ids: Iterable[int], *, on_date=None
+) -> dict[int, list[Package]]:
+    """
+    Load the usable packages of several members in one query, grouped by member in
+    consumption order. With `on_date`, packages expired by then are left out.
+    """
+    member_ids = set(member_ids)
+    candidates: dict[int, list[Package]] = defaultdict(list)
+    if not member_ids:
+        return candidates
+    queryset = active_packages_queryset().filter(member_id__in=member_ids)
+    if on_date is not None:
+        queryset = queryset.filter(expiration__gte=on_date)
+    for package in queryset:
+        candidates[package.member_id].append(package)
+    return candidates
+
+
+def active_package_exists(on_date, *, member_ref: str = "pk") -> Exists:
+    """`Exists` subquery for annotating members with whether they have a usable package."""
+    return Exists(
+        active_packages_queryset().filter(member_id=OuterRef(member_ref), expiration__gte=on_date)
+    )
+
+
+def resolve_active_package(
+    member_id: int, on_date, *, candidates: dict[int, list[Package]] | None = None
+) -> Package | None:
+    """
+    Return the package a lunch on `on_date` should use automatically: the oldest valid package
+    of the member that still has balance and has not expired by then. When `candidates` (from
+    `get_active_package_candidates`) is given, it is resolved from memory.
+    """
+    if candidates is not None:
+        return next(
+            (
+                package
+                for package in candidates.get(member_id, [])
+                if package.remaining_quantity > 0 and package.expiration >= on_date
+            ),
+            None,
+        )
+    return active_packages_queryset().filter(member_id=member_id, expiration__gte=on_date).first()
+
+
+def _collect_ids(rows: list[dict], field: str) -> set[int]:
+    ids = set()
+    for row in rows:
+        value = row.get(field) if isinstance(row, dict) else None
+        if isinstance(value, int) and not isinstance(value, bool):
+            ids.add(value)
+        elif isinstance(value, str) and value.isdigit():
+            ids.add(int(value))
+    return ids
+
+
+def build_bulk_lunch_context(rows: list[dict]) -> dict:
+    """
+    Load every member and package referenced by a batch in a fixed number of queries, so that
+    per-row `LunchSerializer` validation resolves relations and `use_package` from memory.
+    """
+    member_ids = set()
+    for field in ("member", "credit_owner", "package_beneficiary"):
+        member_ids |= _collect_ids(rows, field)
+    members = Member.objects.in_bulk(member_ids)
+
+    auto_package_member_ids = _collect_ids(
+        [row for row in rows if isinstance(row, dict) and row.get("use_package")], "member"
+    )
+    packages = Package.objects.in_bulk(_collect_ids(rows, "package"))
+    package_candidates = get_active_package_candidates(auto_package_member_ids)
+    for member_packages in package_candidates.values():
+        # Share instances with explicitly referenced packages so in-memory balances agree.
+        member_packages[:] = [
+            packages.setdefault(package.id, package) for package in member_packages
+        ]
+
+    return {
+        "prefetched": {Member: members, Package: packages},
+        "package_candidates": package_candidates,
+    }
+
+
+def _consume_packages(rows: list[tuple[int, dict]]) -> set[int]:
+    """
+    Decrement each package once for all of its rows. Returns the ids of packages that no
+    longer had enough balance.
+    """
+    packages = {data["package"].id: data["package"] for _, data in rows if data.get("package")}
+    usage = Counter(data["package"].id for _, data in rows if data.get("package"))
+    return {
+        package_id
+        for package_id, amount in usage.items()
+        if not consume_package(packages[package_id], amount)
+    }
+
+
+def _write_lunches(rows: list[tuple[int, dict]], *, actor: User | None) -> list[Lunch]:
+    """
+    Insert the lunches and post them. On `InsufficientCreditError`, the error's `rejected`
+    holds the indexes of the rows whose credit debit did not fit.
+    """
+    lunches = Lunch.objects.bulk_create([Lunch(**data) for _, data in rows])
+    try:
+        # `_consume_packages` already took the meals, so the lunches hold their packages.
+        post_lunches(
+            lunches,
+            actor=actor,
+            held_package_ids={lunch.id: lunch.package_id for lunch in lunches},
+            created=True,
+        )
+    except InsufficientCreditError as exc:
+        overdrawn = set(exc.lunch_ids)
+        exc.rejected = {
+            index for (index, _), lunch in zip(rows, lunches, strict=True) if lunch.id in overdrawn
+        }
+        raise
+    return lunches
+
+
+class BulkLunchAborted(Exception):
+    def __init__(self, errors: list[dict]):
+        super().__init__("Bulk lunch registration aborted.")
+        self.errors = errors
+
+
+def create_lunches_bulk(
+    valid_rows: list[tuple[int, dict]],
+    *,
+    actor: User | None = None,
+    all_or_nothing: bool = False,
+) -> tuple[list[tuple[int, Lunch]], list[dict]]:
+    """
+    Persist already-validated lunch rows in one transaction: one conditional UPDATE per
+    package, `bulk_create` for the lunches and `post_lunches` for their package, credit and
+    financial entries, which locks the credit owners and checks their balances once.
+
+    `valid_rows` holds `(index, validated_data)` pairs. Rows rejected for package or credit
+    balance are reported as `{"index": ..., "errors": ...}`; with `all_or_nothing` any rejected
+    row rolls the whole batch back and raises `BulkLunchAborted`.
+    """
+    try:
+        return _create_lunches_bulk(valid_rows, actor=actor, all_or_nothing=all_or_nothing)
+    except InsufficientCreditError as exc:
+        credit_errors = [
+            {"index": index, "errors": INSUFFICIENT_CREDIT_ERROR} for index in sorted(exc.rejected)
+        ]
+        if all_or_nothing:
+            raise BulkLunchAborted(credit_errors) from exc
+        # The batch rolled back whole. The ledger took it in order and skipped each debit that
+        # did not fit, so the other rows fit once the rejected ones are left out.
+        remaining = [(index, data) for index, data in valid_rows if index not in exc.rejected]
+        created, errors = _create_lunches_bulk(remaining, actor=actor, all_or_nothing=False)
+        return created, sorted([*errors, *credit_errors], key=lambda error: error["index"])
+
+
+@transaction.atomic
+def _create_lunches_bulk(
+    valid_rows: list[tuple[int, dict]], *, actor: User | None, all_or_nothing: bool
+) -> tuple[list[tuple[int, Lunch]], list[dict]]:
+    errors: list[dict] = []
+    failed_packages = _consume_packages(valid_rows)
+    if failed_packages:
+        errors.extend(
+            {"index": index, "errors": INSUFFICIENT_PACKAGE_ERROR}
+            for index, data in valid_rows
+            if data.get("package") and data["package"].id in failed_packages
+        )
+        valid_rows = [
+            (index, data)
+            for index, data in valid_rows
+            if not (data.get("package") and data["package"].id in failed_packages)
+        ]
+
+    if errors and all_or_nothing:
+        raise BulkLunchAborted(errors)
+
+    lunches = _write_lunches(valid_rows, actor=actor)
+    created = [(index, lunch) for (index, _), lunch in zip(valid_rows, lunches, strict=True)]
+    return created, errors
@@ -3,7 +3,8 @@ from django.contrib.auth import get_user_model
 from rest_framework.reverse import reverse
 from rest_framework.test import APIClient
 
-from apps.lunch.models import Lunch, PackageEntry
+from apps.lunch.models import Lunch, Package, PackageEntry
+from apps.lunch.services import consume_package, restore_package
 from apps.lunch.tests.factories import LunchFactory, PackageFactory
 from apps.users.tests.factories import MemberFactory
 
@@ -222,3 +223,25 @@ def test_delete_lunch_with_package_restores_package_balance(api_client, superuse
     package.refresh_from_db()
     assert package.remaining_quantity == 5
     assert PackageEntry.objects.filter(package=package).count() == 0
+
+
+@pytest.mark.django_db
+def test_consume_package_never_oversells_from_stale_instance():
+    package = PackageFactory(quantity=2, remaining_quantity=1)
+    stale_copy = Package.objects.get(pk=package.pk)
+    Package.objects.filter(pk=package.pk).update(remaining_quantity=0)
+
+    assert consume_package(stale_copy, 1) is False
+
+    package.refresh_from_db()
+    assert package.remaining_quantity == 0
+    assert PackageEntry.objects.filter(package=package).count() == 0
+
+
+@pytest.mark.django_db
+def test_restore_package_respects_total_unless_clamped():
+    package = PackageFactory(quantity=3, remaining_quantity=2)
+
+    assert restore_package(package, 2) is False
+    assert restore_package(package, 2, clamp=True) is True
+    assert package.remaining_quantity == 3
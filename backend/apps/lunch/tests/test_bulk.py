@@ -0,0 +1,228 @@
+from datetime import date, timedelta
+
+import pytest
+from django.contrib.auth import get_user_model
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+
+from apps.credits.models import CreditEntry
+from apps.credits.services import get_credit_balance
+from apps.credits.tests.factories import CreditEntryFactory
+from apps.financial.models import FinancialEntry
+from apps.lunch.models import Lunch, PackageEntry
+from apps.lunch.tests.factories import PackageFactory
+from apps.users.models import Member
+from apps.users.tests.factories import MemberFactory
+
+User = get_user_model()
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture
+def superuser():
+    return User.objects.create_superuser(
+        username="admin",
+        email="admin@example.com",
+        password="strong-password",
+    )
+
+
+@pytest.mark.django_db
+def test_bulk_registers_lunches_with_all_side_effects(api_client, superuser):
+    today = date.today()
+    package = PackageFactory(
+        quantity=5,
+        remaining_quantity=5,
+        unit_value_cents=1500,
+        expiration=today + timedelta(days=30),
+    )
+    credit_owner = MemberFactory()
+    CreditEntryFactory(owner=credit_owner, beneficiary=credit_owner, value_cents=5000)
+    cash_member = MemberFactory(role=Member.Role.AVULSO)
+    api_client.force_authenticate(user=superuser)
+
+    response = api_client.post(
+        reverse("lunch-bulk"),
+        {
+            "lunches": [
+                {
+                    "member": package.member_id,
+                    "value_cents": 1500,
+                    "date": today,
+                    "payment_status": Lunch.PaymentStatus.PAGO,
+                    "use_package": True,
+                },
+                {
+                    "member": package.member_id,
+                    "package": package.id,
+                    "value_cents": 1500,
+                    "date": today,
+                    "payment_status": Lunch.PaymentStatus.PAGO,
+                },
+                {
+                    "member": cash_member.id,
+                    "credit_owner": credit_owner.id,
+                    "value_cents": 2000,
+                    "date": today,
+                    "payment_status": Lunch.PaymentStatus.EM_ABERTO,
+                    "payment_mode": Lunch.PaymentMode.TROCA,
+                },
+                {
+                    "member": cash_member.id,
+                    "value_cents": 3000,
+                    "date": today,
+                    "payment_status": Lunch.PaymentStatus.PAGO,
+                    "payment_mode": Lunch.PaymentMode.PIX,
+                },
+            ]
+        },
+        format="json",
+    )
+
+    assert response.status_code == 201, response.data
+    assert response.data["errors"] == []
+    assert [item["index"] for item in response.data["created"]] == [0, 1, 2, 3]
+    assert Lunch.objects.count() == 4
+
+    package.refresh_from_db()
+    assert package.remaining_quantity == 3
+    assert PackageEntry.objects.filter(package=package).count() == 2
+
+    credit_entry = CreditEntry.objects.get(origin=CreditEntry.Origin.LUNCH)
+    assert credit_entry.owner == credit_owner
+    assert get_credit_balance(credit_owner.id) == 3000
+
+    financial_entry = FinancialEntry.objects.get()
+    assert financial_entry.value_cents == 3000
+
+    cash_member.refresh_from_db()
+    assert cash_member.role == Member.Role.MENSALISTA
+
+
+@pytest.mark.django_db
+def test_bulk_reports_row_errors_and_keeps_valid_rows(api_client, superuser):
+    today = date.today()
+    package = PackageFactory(quantity=1, remaining_quantity=1, expiration=today)
+    owner = MemberFactory()
+    CreditEntryFactory(owner=owner, beneficiary=owner, value_cents=1000)
+    api_client.force_authenticate(user=superuser)
+
+    response = api_client.post(
+        reverse("lunch-bulk"),
+        {
+            "lunches": [
+                {
+                    "member": package.member_id,
+                    "package": package.id,
+                    "value_cents": 1000,
+                    "date": today,
+                    "payment_status": Lunch.PaymentStatus.PAGO,
+                },
+                {
+                    "member": package.member_id,
+                    "package": package.id,
+                    "value_cents": 1000,
+                    "date": today,
+                    "payment_status": Lunch.PaymentStatus.PAGO,
+                },
+                {"member": 999999, "value_cents": 1000, "date": today, "payment_status": "PAGO"},
+                {
+                    "member": owner.id,
+                    "credit_owner": owner.id,
+                    "value_cents": 800,
+                    "date": today,
+                    "payment_status": Lunch.PaymentStatus.PAGO,
+                    "payment_mode": Lunch.PaymentMode.TROCA,
+                },
+                {
+                    "member": owner.id,
+                    "credit_owner": owner.id,
+                    "value_cents": 800,
+                    "date": today,
+                    "payment_status": Lunch.PaymentStatus.PAGO,
+                    "payment_mode": Lunch.PaymentMode.TROCA,
+                },
+            ]
+        },
+        format="json",
+    )
+
+    assert response.status_code == 201
+    assert [item["index"] for item in response.data["created"]] == [0, 3]
+    errors = {error["index"]: error["errors"] for error in response.data["errors"]}
+    assert set(errors) == {1, 2, 4}
+    assert "package" in errors[1]
+    assert "member" in errors[2]
+    assert errors[4] == {"credit_owner": ["Saldo de créditos insuficiente para este lançamento."]}
+
+    package.refresh_from_db()
+    assert package.remaining_quantity == 0
+    assert get_credit_balance(owner.id) == 200
+
+
+@pytest.mark.django_db
+def test_bulk_all_or_nothing_rolls_back_every_row(api_client, superuser):
+    today = date.today()
+    owner = MemberFactory()
+    api_client.force_authenticate(user=superuser)
+
+    response = api_client.post(
+        reverse("lunch-bulk"),
+        {
+            "all_or_nothing": True,
+            "lunches": [
+                {
+                    "member": owner.id,
+                    "value_cents": 1000,
+                    "date": today,
+                    "payment_status": Lunch.PaymentStatus.PAGO,
+                },
+                {
+                    "member": owner.id,
+                    "credit_owner": owner.id,
+                    "value_cents": 800,
+                    "date": today,
+                    "payment_status": Lunch.PaymentStatus.PAGO,
+                    "payment_mode": Lunch.PaymentMode.TROCA,
+                },
+            ],
+        },
+        format="json",
+    )
+
+    assert response.status_code == 400
+    assert response.data["created"] == []
+    assert [error["index"] for error in response.data["errors"]] == [1]
+    assert Lunch.objects.count() == 0
+    assert FinancialEntry.objects.count() == 0
+
+
+@pytest.mark.django_db
+def test_bulk_query_count_does_not_grow_with_rows(
+    api_client, superuser, django_assert_max_num_queries
+):
+    today = date.today()
+    members = [MemberFactory() for _ in range(20)]
+    api_client.force_authenticate(user=superuser)
+    payload = {
+        "lunches": [
+            {
+                "member": member.id,
+                "value_cents": 1000,
+                "date": today,
+                "payment_status": Lunch.PaymentStatus.PAGO,
+            }
+            for member in members
+        ]
+    }
+
+    with django_assert_max_num_queries(12):
+        response = api_client.post(reverse("lunch-bulk"), payload, format="json")
+
+    assert response.status_code == 201
+    assert Lunch.objects.count() == 20
+    assert FinancialEntry.objects.count() == 20
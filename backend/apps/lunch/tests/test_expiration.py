@@ -0,0 +1,69 @@
+from datetime import date, timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from apps.lunch.models import Package, PackageExpirationSweep
+from apps.lunch.services import expire_packages
+from apps.lunch.tests.factories import PackageFactory
+
+
+@pytest.mark.django_db
+def test_expire_packages_flips_only_past_expirations():
+    today = date(2026, 5, 10)
+    expired = PackageFactory(expiration=today - timedelta(days=1))
+    still_valid = PackageFactory(expiration=today)
+    Package.objects.filter(pk__in=[expired.pk, still_valid.pk]).update(
+        status=Package.PackageStatus.VALIDO
+    )
+
+    assert expire_packages(today=today) == 1
+
+    expired.refresh_from_db()
+    still_valid.refresh_from_db()
+    assert expired.status == Package.PackageStatus.EXPIRADO
+    assert still_valid.status == Package.PackageStatus.VALIDO
+    sweep = PackageExpirationSweep.objects.get()
+    assert sweep.swept_through == today
+    assert sweep.expired_count == 1
+
+
+@pytest.mark.django_db
+def test_expire_packages_uses_watermark_between_runs(django_assert_num_queries):
+    today = date(2026, 5, 10)
+    expire_packages(today=today)
+
+    with django_assert_num_queries(1):
+        assert expire_packages(today=today) == 0
+
+    package = PackageFactory(expiration=today)
+    Package.objects.filter(pk=package.pk).update(status=Package.PackageStatus.VALIDO)
+
+    assert expire_packages(today=today + timedelta(days=1)) == 1
+    assert PackageExpirationSweep.objects.count() == 2
+
+
+@pytest.mark.django_db
+def test_expire_packages_command_reports_changed_rows():
+    package = PackageFactory(expiration=date.today() - timedelta(days=3))
+    Package.objects.filter(pk=package.pk).update(status=Package.PackageStatus.VALIDO)
+    out = StringIO()
+
+    call_command("expire_packages", stdout=out)
+
+    assert "1 pacote(s) marcado(s) como expirado(s)." in out.getvalue()
+
+
+@pytest.mark.django_db
+def test_expire_packages_skips_while_another_run_holds_the_sweep(monkeypatch):
+    today = date(2026, 5, 10)
+    package = PackageFactory(expiration=today - timedelta(days=1))
+    Package.objects.filter(pk=package.pk).update(status=Package.PackageStatus.VALIDO)
+    monkeypatch.setattr("apps.lunch.services._claim_package_expiration_sweep", lambda: False)
+
+    assert expire_packages(today=today) == 0
+
+    package.refresh_from_db()
+    assert package.status == Package.PackageStatus.VALIDO
+    assert not PackageExpirationSweep.objects.exists()
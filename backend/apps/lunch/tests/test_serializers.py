@@ -4,6 +4,8 @@ import pytest
 
 from apps.lunch.models import Lunch, Package
 from apps.lunch.serializers import LunchSerializer, PackageSerializer
+from apps.lunch.services import resolve_active_package
+from apps.lunch.tests.factories import PackageFactory
 from apps.users.models import Member
 from apps.users.tests.factories import MemberFactory
 
@@ -179,3 +181,29 @@ def test_lunch_serializer_updates_package_entry_beneficiary_without_changing_pac
     assert package.remaining_quantity == 4
     assert updated.package_beneficiary == second_beneficiary
     assert updated.package_entry.beneficiary == second_beneficiary
+
+
+@pytest.mark.django_db
+def test_resolve_active_package_picks_oldest_usable_package():
+    today = date.today()
+    first_member = MemberFactory()
+    second_member = MemberFactory()
+    empty_member = MemberFactory()
+    valid_until = today + timedelta(days=30)
+    oldest = PackageFactory(
+        member=first_member, date=today - timedelta(days=10), expiration=valid_until
+    )
+    PackageFactory(member=first_member, date=today - timedelta(days=2), expiration=valid_until)
+    PackageFactory(
+        member=second_member,
+        date=today - timedelta(days=20),
+        expiration=today - timedelta(days=1),
+    )
+    current = PackageFactory(
+        member=second_member, date=today - timedelta(days=5), expiration=valid_until
+    )
+    PackageFactory(member=empty_member, remaining_quantity=0, expiration=valid_until)
+
+    assert resolve_active_package(first_member.id, today) == oldest
+    assert resolve_active_package(second_member.id, today) == current
+    assert resolve_active_package(empty_member.id, today) is None
@@ -1,4 +1,7 @@
-﻿import pytest
+﻿import base64
+import json
+
+import pytest
 from django.contrib.auth import get_user_model
 from rest_framework.reverse import reverse
 from rest_framework.test import APIClient
@@ -29,6 +32,10 @@ def member():
     return MemberFactory()
 
 
+def streamed_json(response):
+    return json.loads(b"".join(response.streaming_content))
+
+
 @pytest.mark.django_db
 def test_superuser_can_filter_lunches_by_member(api_client, superuser, member):
     other_member = MemberFactory()
@@ -41,7 +48,7 @@ def test_superuser_can_filter_lunches_by_member(api_client, superuser, member):
     response = api_client.get(url, {"member": member.id})
 
     assert response.status_code == 200
-    ids = {item["id"] for item in response.data}
+    ids = {item["id"] for item in streamed_json(response)}
     assert lunch1.id in ids
     assert len(ids) == 1
 
@@ -56,7 +63,7 @@ def test_superuser_can_filter_lunches_by_payment_status(api_client, superuser):
     response = api_client.get(url, {"payment_status": Lunch.PaymentStatus.PAGO})
 
     assert response.status_code == 200
-    ids = {item["id"] for item in response.data}
+    ids = {item["id"] for item in streamed_json(response)}
     assert lunch_paid.id in ids
     assert len(ids) == 1
 
@@ -72,7 +79,7 @@ def test_superuser_can_filter_lunches_by_package(api_client, superuser):
     response = api_client.get(url, {"package": package.id})
 
     assert response.status_code == 200
-    ids = {item["id"] for item in response.data}
+    ids = {item["id"] for item in streamed_json(response)}
     assert lunch_with_package.id in ids
     assert len(ids) == 1
 
@@ -102,3 +109,43 @@ def test_delete_package_referenced_by_lunch_returns_conflict(api_client, superus
     assert response.data == {
         "detail": "Não é possível excluir este registro porque ele está vinculado a outros dados."
     }
+
+
+@pytest.mark.django_db
+def test_lunch_list_rejects_cursor_values_of_the_wrong_type(api_client, superuser):
+    LunchFactory()
+    api_client.force_authenticate(user=superuser)
+    payload = json.dumps({"p": ["ontem", "agora", "primeiro"]}).encode("utf-8")
+    cursor = base64.urlsafe_b64encode(payload).decode("ascii")
+
+    response = api_client.get(reverse("lunch-list"), {"cursor": cursor})
+
+    assert response.status_code == 404
+
+
+@pytest.mark.django_db
+def test_lunch_list_cursor_mode_walks_natural_order_without_count(api_client, superuser):
+    for day in ("2026-03-02", "2026-03-02", "2026-03-02", "2026-03-01", "2026-03-03"):
+        LunchFactory(date=day)
+    expected = list(
+        Lunch.objects.order_by("-date", "-created_at", "-id").values_list("id", flat=True)
+    )
+    api_client.force_authenticate(user=superuser)
+
+    seen = []
+    response = api_client.get(reverse("lunch-list"), {"cursor": "", "page_size": 2})
+    while True:
+        assert response.status_code == 200
+        assert "count" not in response.data
+        seen.extend(item["id"] for item in response.data["results"])
+        if response.data["next"] is None:
+            break
+        response = api_client.get(response.data["next"])
+    assert seen == expected
+
+    back = api_client.get(response.data["previous"])
+    assert [item["id"] for item in back.data["results"]] == expected[2:4]
+
+    paged = api_client.get(reverse("lunch-list"), {"page": 1, "page_size": 2})
+    assert paged.data["count"] == 5
+    assert len(streamed_json(api_client.get(reverse("lunch-list")))) == 5
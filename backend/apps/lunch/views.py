@@ -1,19 +1,31 @@
 ﻿import django_filters
 from django.db import models, transaction
-from rest_framework import viewsets
+from rest_framework import status, viewsets
 from rest_framework.decorators import action
 from rest_framework.response import Response
 
-from apps.common.exports import cents_to_reais, create_xlsx_response
-from apps.common.pagination import DefaultPagination, OptionalPagination
+from apps.common.conditional import ConditionalGetMixin
+from apps.common.export_jobs import ExportJobMixin
+from apps.common.exports import ExportMixin, cents_to_reais
+from apps.common.ledger import unpost_lunches, unpost_packages
+from apps.common.pagination import CursorOptionalPagination, DefaultPagination, OptionalPagination
 from apps.common.permissions import SuperuserOnly
+from apps.common.streaming import StreamingListMixin
 from apps.lunch.models import Lunch, Package, PackageEntry
 from apps.lunch.serializers import (
+    LunchBulkSerializer,
     LunchSerializer,
     ManualPackageEntrySerializer,
     PackageEntrySerializer,
     PackageSerializer,
 )
+from apps.lunch.services import (
+    BulkLunchAborted,
+    consume_package,
+    create_lunches_bulk,
+    restore_package,
+)
+from apps.users.models import Member
 
 
 class LunchFilter(django_filters.FilterSet):
@@ -60,34 +72,68 @@ class PackageFilter(django_filters.FilterSet):
         fields = ["payment_status", "status", "member", "date", "expiration"]
 
 
-class LunchViewSet(viewsets.ModelViewSet):
+class LunchViewSet(ConditionalGetMixin, StreamingListMixin, ExportJobMixin, viewsets.ModelViewSet):
     queryset = Lunch.objects.select_related(
         "member", "credit_owner", "package", "package_beneficiary"
-    ).order_by(
-        "-date", "-created_at"
-    )
+    ).order_by("-date", "-created_at")
     serializer_class = LunchSerializer
     permission_classes = [SuperuserOnly]
     filterset_class = LunchFilter
-    pagination_class = OptionalPagination
+    pagination_class = CursorOptionalPagination
+    keyset_ordering = ("-date", "-created_at", "-id")
+    watermark_models = (Lunch, Member, Package)
+    conditional_actions = ("list", "retrieve", "export", "summary")
+    export_filename = "almocos"
+    export_job_source = "lunches"
+    export_tables = (Lunch, Member)
+    export_headers = [
+        "Data",
+        "Integrante",
+        "Tipo",
+        "Status",
+        "Pagamento",
+        "Valor (R$)",
+        "Pacote",
+    ]
 
     @transaction.atomic
     def perform_destroy(self, instance):
-        # Remove linked financial entry to keep financial data consistent
-        entry = getattr(instance, "financial_entry", None)
-        if entry:
-            entry.delete()
-        credit_entry = getattr(instance, "credit_entry", None)
-        if credit_entry:
-            credit_entry.delete()
-        if instance.package_id:
-            package = instance.package
-            if package.remaining_quantity is None:
-                package.remaining_quantity = 0
-            package.remaining_quantity = min(package.remaining_quantity + 1, package.quantity)
-            package.save(update_fields=["remaining_quantity", "updated_at"])
+        # Remove the derived ledger rows and give the package meal back
+        unpost_lunches([instance])
         super().perform_destroy(instance)
 
+    @action(detail=False, methods=["post"], url_path="bulk")
+    def bulk(self, request):
+        serializer = LunchBulkSerializer(data=request.data, context=self.get_serializer_context())
+        serializer.is_valid(raise_exception=True)
+        all_or_nothing = serializer.validated_data["all_or_nothing"]
+
+        valid_rows, errors = serializer.validate_rows()
+        if errors and all_or_nothing:
+            return Response({"created": [], "errors": errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        actor = request.user if request.user.is_authenticated else None
+        try:
+            created, write_errors = create_lunches_bulk(
+                valid_rows, actor=actor, all_or_nothing=all_or_nothing
+            )
+        except BulkLunchAborted as exc:
+            return Response(
+                {"created": [], "errors": exc.errors}, status=status.HTTP_400_BAD_REQUEST
+            )
+
+        errors = sorted(errors + write_errors, key=lambda error: error["index"])
+        return Response(
+            {
+                "created": [
+                    {"index": index, "lunch": LunchSerializer(lunch).data}
+                    for index, lunch in created
+                ],
+                "errors": errors,
+            },
+            status=status.HTTP_201_CREATED if created else status.HTTP_400_BAD_REQUEST,
+        )
+
     @action(detail=False, methods=["get"], url_path="summary")
     def summary(self, request):
         filterset = LunchFilter(request.GET, queryset=self.filter_queryset(self.get_queryset()))
@@ -116,76 +162,56 @@ class LunchViewSet(viewsets.ModelViewSet):
             }
         )
 
-    @action(detail=False, methods=["get"], url_path="export")
-    def export(self, request):
-        queryset = self.filter_queryset(self.get_queryset())
-        headers = [
-            "Data",
-            "Integrante",
-            "Tipo",
-            "Status",
-            "Pagamento",
-            "Valor (R$)",
-            "Pacote",
+    def build_export_row(self, lunch):
+        return [
+            lunch.date.strftime("%Y-%m-%d"),
+            lunch.member.full_name,
+            "Pacote" if lunch.package_id else "Avulso",
+            lunch.get_payment_status_display(),
+            lunch.get_payment_mode_display(),
+            cents_to_reais(lunch.value_cents),
+            lunch.package_id or "",
         ]
-        rows = [
-            [
-                lunch.date.strftime("%Y-%m-%d"),
-                lunch.member.full_name,
-                "Pacote" if lunch.package_id else "Avulso",
-                lunch.get_payment_status_display(),
-                lunch.get_payment_mode_display(),
-                cents_to_reais(lunch.value_cents),
-                lunch.package_id or "",
-            ]
-            for lunch in queryset
-        ]
-        return create_xlsx_response("almocos", headers, rows)
 
 
-class PackageViewSet(viewsets.ModelViewSet):
+class PackageViewSet(ConditionalGetMixin, StreamingListMixin, ExportMixin, viewsets.ModelViewSet):
     queryset = Package.objects.select_related("member").order_by("-date", "-created_at")
     serializer_class = PackageSerializer
     permission_classes = [SuperuserOnly]
     filterset_class = PackageFilter
     pagination_class = OptionalPagination
+    watermark_models = (Package, Member, PackageEntry)
+    conditional_actions = ("list", "retrieve", "export", "history")
+    export_filename = "pacotes"
+    export_headers = [
+        "Compra",
+        "Integrante",
+        "Valor unitario (R$)",
+        "Valor total (R$)",
+        "Quantidade",
+        "Saldo",
+        "Validade",
+        "Status",
+        "Pagamento",
+    ]
 
     @transaction.atomic
     def perform_destroy(self, instance):
-        entry = getattr(instance, "financial_entry", None)
-        if entry:
-            entry.delete()
+        unpost_packages([instance])
         super().perform_destroy(instance)
 
-    @action(detail=False, methods=["get"], url_path="export")
-    def export(self, request):
-        queryset = self.filter_queryset(self.get_queryset())
-        headers = [
-            "Compra",
-            "Integrante",
-            "Valor unitario (R$)",
-            "Valor total (R$)",
-            "Quantidade",
-            "Saldo",
-            "Validade",
-            "Status",
-            "Pagamento",
-        ]
-        rows = [
-            [
-                package.date.strftime("%Y-%m-%d"),
-                package.member.full_name,
-                cents_to_reais(package.unit_value_cents),
-                cents_to_reais(package.value_cents),
-                package.quantity,
-                package.remaining_quantity,
-                package.expiration.strftime("%Y-%m-%d"),
-                package.get_status_display(),
-                package.get_payment_status_display(),
-            ]
-            for package in queryset
+    def build_export_row(self, package):
+        return [
+            package.date.strftime("%Y-%m-%d"),
+            package.member.full_name,
+            cents_to_reais(package.unit_value_cents),
+            cents_to_reais(package.value_cents),
+            package.quantity,
+            package.remaining_quantity,
+            package.expiration.strftime("%Y-%m-%d"),
+            package.get_status_display(),
+            package.get_payment_status_display(),
         ]
-        return create_xlsx_response("pacotes", headers, rows)
 
     @action(detail=True, methods=["post"], url_path="decrement")
     def decrement(self, request, pk=None):
@@ -193,13 +219,9 @@ class PackageViewSet(viewsets.ModelViewSet):
         amount = int(request.data.get("amount", 1))
         if amount <= 0:
             return Response({"detail": "Quantidade deve ser maior que zero."}, status=400)
-        if package.remaining_quantity is None:
-            package.remaining_quantity = package.quantity
-        if package.remaining_quantity is None or package.remaining_quantity < amount:
+        if not consume_package(package, amount):
             return Response({"detail": "Saldo insuficiente no pacote."}, status=400)
 
-        package.remaining_quantity -= amount
-        package.save(update_fields=["remaining_quantity", "updated_at"])
         serializer = self.get_serializer(package)
         return Response(serializer.data)
 
@@ -209,16 +231,11 @@ class PackageViewSet(viewsets.ModelViewSet):
         amount = int(request.data.get("amount", 1))
         if amount <= 0:
             return Response({"detail": "Quantidade deve ser maior que zero."}, status=400)
-        if package.remaining_quantity is None:
-            package.remaining_quantity = package.quantity
-        target = package.remaining_quantity + amount
-        if package.quantity is not None and target > package.quantity:
+        if not restore_package(package, amount):
             return Response(
                 {"detail": "Não é possível exceder a quantidade total do pacote."}, status=400
             )
 
-        package.remaining_quantity = target
-        package.save(update_fields=["remaining_quantity", "updated_at"])
         serializer = self.get_serializer(package)
         return Response(serializer.data)
 
@@ -241,31 +258,22 @@ class PackageViewSet(viewsets.ModelViewSet):
         entry_type = serializer.validated_data["entry_type"]
         quantity = serializer.validated_data["quantity"]
 
-        if package.remaining_quantity is None:
-            package.remaining_quantity = package.quantity
+        entry = PackageEntry(
+            package=package,
+            entry_type=entry_type,
+            origin=PackageEntry.Origin.MANUAL,
+            quantity=quantity,
+            description=serializer.validated_data["description"],
+            created_by=request.user if request.user.is_authenticated else None,
+        )
 
         if entry_type == PackageEntry.EntryType.DEBITO:
-            if package.remaining_quantity < quantity:
+            if not consume_package(package, quantity, entries=[entry]):
                 return Response({"detail": "Saldo insuficiente no pacote."}, status=400)
-            package.remaining_quantity -= quantity
-        else:
-            target = package.remaining_quantity + quantity
-            if target > package.quantity:
-                return Response(
-                    {"detail": "Não é possível exceder a quantidade total do pacote."},
-                    status=400,
-                )
-            package.remaining_quantity = target
-
-        with transaction.atomic():
-            package.save(update_fields=["remaining_quantity", "updated_at"])
-            PackageEntry.objects.create(
-                package=package,
-                entry_type=entry_type,
-                origin=PackageEntry.Origin.MANUAL,
-                quantity=quantity,
-                description=serializer.validated_data["description"],
-                created_by=request.user if request.user.is_authenticated else None,
+        elif not restore_package(package, quantity, entries=[entry]):
+            return Response(
+                {"detail": "Não é possível exceder a quantidade total do pacote."},
+                status=400,
             )
 
         return Response(self.get_serializer(package).data)
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from apps.users.services import rebuild_member_search_text
+
+
+class Command(BaseCommand):
+    help = "Recalcula o texto de busca normalizado dos integrantes."
+
+    def handle(self, *args, **options):
+        total = rebuild_member_search_text()
+        self.stdout.write(self.style.SUCCESS(f"{total} integrante(s) atualizado(s)."))
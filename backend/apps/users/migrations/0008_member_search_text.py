@@ -0,0 +1,56 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:32
+
+from django.db import migrations, models
+
+from apps.common.search import build_search_text, ensure_trigram_extension
+
+TRIGRAM_INDEX_NAME = "users_member_search_trgm_idx"
+
+
+def backfill_search_text(apps, schema_editor):
+    Member = apps.get_model("users", "Member")
+    members = list(Member.objects.select_related("responsible"))
+    for member in members:
+        responsible_name = member.responsible.full_name if member.responsible_id else None
+        member.search_text = build_search_text(member.full_name, responsible_name)
+    Member.objects.bulk_update(members, ["search_text"], batch_size=500)
+
+
+def create_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    ensure_trigram_extension(schema_editor.connection)
+    schema_editor.execute(
+        f"CREATE INDEX IF NOT EXISTS {TRIGRAM_INDEX_NAME} "
+        "ON users_member USING gin (search_text gin_trgm_ops)"
+    )
+
+
+def drop_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(f"DROP INDEX IF EXISTS {TRIGRAM_INDEX_NAME}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0007_alter_member_address_alter_member_heard_about_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="member",
+            name="search_text",
+            field=models.CharField(
+                blank=True,
+                db_index=True,
+                default="",
+                editable=False,
+                help_text="Normalized name plus the responsible's normalized name, used by search.",
+                max_length=310,
+            ),
+        ),
+        migrations.RunPython(backfill_search_text, migrations.RunPython.noop),
+        migrations.RunPython(create_trigram_index, drop_trigram_index),
+    ]
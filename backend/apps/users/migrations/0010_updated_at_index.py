@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0009_member_name_order_index"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="member",
+            index=models.Index(fields=["updated_at"], name="users_member_updated_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="publicregistration",
+            index=models.Index(fields=["updated_at"], name="users_registration_updated_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="publicregistrationchild",
+            index=models.Index(fields=["updated_at"], name="users_regchild_updated_idx"),
+        ),
+    ]
@@ -1,6 +1,8 @@
 from django.core.validators import MaxLengthValidator
 from django.db import models
+from django.utils import timezone
 
+from apps.common.search import build_search_text
 from apps.common.text_limits import MAX_TEXT_LENGTH
 
 
@@ -35,15 +37,65 @@ class Member(models.Model):
     role = models.CharField(max_length=20, choices=Role.choices, null=True, blank=True)
     diet = models.CharField(max_length=20, choices=Diet.choices)
     observations = models.TextField(blank=True, validators=[MaxLengthValidator(MAX_TEXT_LENGTH)])
+    search_text = models.CharField(
+        max_length=310,
+        blank=True,
+        default="",
+        editable=False,
+        db_index=True,
+        help_text="Normalized name plus the responsible's normalized name, used by search.",
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ["full_name"]
+        indexes = [
+            # Serves name-ordered lists and keyset seeks on (full_name, id), e.g. the credit
+            # summary, which walks balances through their owner.
+            models.Index(fields=["full_name", "id"], name="users_member_name_order_idx"),
+            models.Index(fields=["updated_at"], name="users_member_updated_idx"),
+        ]
 
     def __str__(self):
         return self.full_name
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_full_name = instance.__dict__.get("full_name")
+        return instance
+
+    def build_search_text(self) -> str:
+        responsible_name = self.responsible.full_name if self.responsible_id else None
+        return build_search_text(self.full_name, responsible_name)
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get("update_fields")
+        if update_fields is None or {"full_name", "responsible"} & set(update_fields):
+            self.search_text = self.build_search_text()
+            if update_fields is not None:
+                kwargs["update_fields"] = {*update_fields, "search_text"}
+        renamed = (
+            self.pk is not None
+            and getattr(self, "_loaded_full_name", self.full_name) != self.full_name
+        )
+        super().save(*args, **kwargs)
+        self._loaded_full_name = self.full_name
+        if renamed:
+            from apps.financial.services import refresh_member_financial_search_text
+
+            self.refresh_children_search_text()
+            refresh_member_financial_search_text(self)
+
+    def refresh_children_search_text(self) -> int:
+        children = list(self.children.only("id", "full_name", "responsible_id"))
+        now = timezone.now()
+        for child in children:
+            child.search_text = build_search_text(child.full_name, self.full_name)
+            child.updated_at = now
+        return Member.objects.bulk_update(children, ["search_text", "updated_at"])
+
 
 class PublicRegistration(models.Model):
     class Status(models.TextChoices):
@@ -70,6 +122,9 @@ class PublicRegistration(models.Model):
 
     class Meta:
         ordering = ["-created_at", "-id"]
+        indexes = [
+            models.Index(fields=["updated_at"], name="users_registration_updated_idx"),
+        ]
 
     def __str__(self):
         return f"{self.full_name} ({self.get_status_display()})"
@@ -89,6 +144,9 @@ class PublicRegistrationChild(models.Model):
 
     class Meta:
         ordering = ["id"]
+        indexes = [
+            models.Index(fields=["updated_at"], name="users_regchild_updated_idx"),
+        ]
 
     def __str__(self):
         return self.full_name
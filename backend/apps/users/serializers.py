@@ -136,14 +136,13 @@ class MemberSerializer(serializers.ModelSerializer):
         return obj.responsible.full_name if obj.responsible else None
 
     def get_has_package(self, obj: Member) -> bool:
-        from apps.lunch.models import Package
-
-        today = timezone.localdate()
-        return obj.packages.filter(
-            remaining_quantity__gt=0,
-            status=Package.PackageStatus.VALIDO,
-            expiration__gte=today,
-        ).exists()
+        annotated = getattr(obj, "has_package", None)
+        if annotated is not None:
+            return annotated
+
+        from apps.lunch.services import resolve_active_package
+
+        return resolve_active_package(obj.id, timezone.localdate()) is not None
 
     def validate(self, attrs):
         is_child = attrs.get("is_child", getattr(self.instance, "is_child", False))
@@ -0,0 +1,26 @@
+from collections.abc import Iterable
+
+from django.db import transaction
+from django.utils import timezone
+
+from apps.users.models import Member
+
+
+@transaction.atomic
+def rebuild_member_search_text(member_ids: Iterable[int] | None = None) -> int:
+    """
+    Recompute the stored `search_text` of the given members (or all of them), e.g. after a
+    `QuerySet.update` that bypassed `Member.save`. `updated_at` is bumped too, so the table
+    watermark (ETags, cached counts) sees the change. Returns the number of rows refreshed.
+    """
+    queryset = Member.objects.select_related("responsible").only(
+        "id", "full_name", "responsible_id", "responsible__full_name"
+    )
+    if member_ids is not None:
+        queryset = queryset.filter(id__in=set(member_ids))
+    members = list(queryset)
+    now = timezone.now()
+    for member in members:
+        member.search_text = member.build_search_text()
+        member.updated_at = now
+    return Member.objects.bulk_update(members, ["search_text", "updated_at"], batch_size=500)
@@ -1,9 +1,14 @@
+import json
+from datetime import date, timedelta
+
 import pytest
 from django.contrib.auth import get_user_model
 from rest_framework.reverse import reverse
 from rest_framework.test import APIClient
 
+from apps.lunch.tests.factories import PackageFactory
 from apps.users.models import Member
+from apps.users.services import rebuild_member_search_text
 from apps.users.tests.factories import MemberFactory
 
 User = get_user_model()
@@ -23,6 +28,10 @@ def superuser():
     )
 
 
+def streamed_json(response):
+    return json.loads(b"".join(response.streaming_content))
+
+
 @pytest.mark.django_db
 def test_anonymous_cannot_access_members(api_client):
     url = reverse("member-list")
@@ -52,7 +61,7 @@ def test_superuser_can_list_members(api_client, superuser):
     response = api_client.get(url)
 
     assert response.status_code == 200
-    assert len(response.data) == Member.objects.count()
+    assert len(streamed_json(response)) == Member.objects.count()
 
 
 @pytest.mark.django_db
@@ -89,7 +98,85 @@ def test_member_search_is_accent_insensitive_and_includes_children_by_responsibl
     response = api_client.get(reverse("member-list"), {"search": "Nadia"})
 
     assert response.status_code == 200
-    returned_ids = {member["id"] for member in response.data}
+    returned_ids = {member["id"] for member in streamed_json(response)}
     assert responsible.id in returned_ids
     assert child.id in returned_ids
     assert other_member.id not in returned_ids
+
+
+@pytest.mark.django_db
+def test_member_list_query_count_does_not_grow_with_members(
+    api_client, superuser, django_assert_num_queries
+):
+    today = date.today()
+    with_package = MemberFactory()
+    PackageFactory(member=with_package, expiration=today + timedelta(days=30))
+    without_package = MemberFactory()
+    PackageFactory(member=without_package, expiration=today - timedelta(days=1))
+    api_client.force_authenticate(user=superuser)
+
+    def add_children(count):
+        for _ in range(count):
+            MemberFactory(is_child=True, responsible=MemberFactory())
+
+    add_children(5)
+    with django_assert_num_queries(3):  # watermark + row cap check + the annotated rows
+        members = streamed_json(api_client.get(reverse("member-list")))
+    assert len(members) == 12
+
+    add_children(5)
+    with django_assert_num_queries(3):
+        response = api_client.get(reverse("member-list"))
+        members = streamed_json(response)
+    assert len(members) == 22
+
+    assert response.status_code == 200
+    has_package = {member["id"]: member["has_package"] for member in members}
+    assert has_package[with_package.id] is True
+    assert has_package[without_package.id] is False
+    assert sum(1 for member in members if member["responsible_name"]) == 10
+
+    detail = api_client.get(reverse("member-detail", args=[with_package.id]))
+    assert detail.data["has_package"] is True
+
+
+@pytest.mark.django_db
+def test_member_search_follows_responsible_rename(api_client, superuser):
+    responsible = MemberFactory(full_name="Nádia Souza")
+    child = MemberFactory(full_name="Lucas", is_child=True, responsible=responsible)
+    api_client.force_authenticate(user=superuser)
+
+    response = api_client.patch(
+        reverse("member-detail", args=[responsible.id]),
+        {"full_name": "Márcia Souza"},
+        format="json",
+    )
+    assert response.status_code == 200
+
+    child.refresh_from_db()
+    assert child.search_text == "lucas\nmarcia souza"
+
+    response = api_client.get(reverse("member-list"), {"search": "MARCIA"})
+    assert {member["id"] for member in streamed_json(response)} == {responsible.id, child.id}
+
+    response = api_client.get(reverse("member-list"), {"search": "nadia"})
+    assert streamed_json(response) == []
+
+
+@pytest.mark.django_db
+def test_rebuilt_member_search_text_moves_the_list_etag(api_client, superuser):
+    member = MemberFactory(full_name="Nádia Souza")
+    api_client.force_authenticate(user=superuser)
+    # A QuerySet.update bypasses Member.save and leaves search_text and updated_at behind.
+    Member.objects.filter(id=member.id).update(full_name="Márcia Souza")
+    before = api_client.get(reverse("member-list"), {"search": "marcia"})
+    assert streamed_json(before) == []
+
+    assert rebuild_member_search_text([member.id]) == 1
+
+    after = api_client.get(
+        reverse("member-list"), {"search": "marcia"}, HTTP_IF_NONE_MATCH=before["ETag"]
+    )
+    assert after.status_code == 200
+    assert after["ETag"] != before["ETag"]
+    assert [row["id"] for row in streamed_json(after)] == [member.id]
@@ -1,7 +1,7 @@
 import django_filters
-import unicodedata
 from django.db import transaction
 from django.db.models import Q
+from django.utils import timezone
 from rest_framework import status, viewsets
 from rest_framework.decorators import action
 from rest_framework.permissions import AllowAny
@@ -9,10 +9,15 @@ from rest_framework.response import Response
 from rest_framework.throttling import AnonRateThrottle
 from rest_framework.views import APIView
 
-from apps.common.exports import create_xlsx_response
+from apps.common.conditional import ConditionalGetMixin
+from apps.common.export_jobs import ExportJobMixin
 from apps.common.pagination import OptionalPagination
 from apps.common.permissions import SuperuserOnly
-from apps.users.models import Member, PublicRegistration
+from apps.common.search import normalize_search_text
+from apps.common.streaming import StreamingListMixin
+from apps.lunch.models import Package
+from apps.lunch.services import active_package_exists
+from apps.users.models import Member, PublicRegistration, PublicRegistrationChild
 from apps.users.serializers import (
     MemberSerializer,
     PublicRegistrationAdminSerializer,
@@ -25,11 +30,6 @@ class PublicRegistrationThrottle(AnonRateThrottle):
     scope = "public_registration"
 
 
-def normalize_search_text(value: str) -> str:
-    normalized = unicodedata.normalize("NFKD", value)
-    return "".join(char for char in normalized if not unicodedata.combining(char)).casefold()
-
-
 class PublicRegistrationMetaView(APIView):
     authentication_classes = []
     permission_classes = [AllowAny]
@@ -75,20 +75,7 @@ class MemberFilter(django_filters.FilterSet):
         if not normalized_query:
             return queryset
 
-        matching_ids: list[int] = []
-        for member in queryset.select_related("responsible"):
-            candidate_names = [member.full_name]
-            if member.responsible_id:
-                candidate_names.append(member.responsible.full_name)
-
-            if any(
-                normalized_query in normalize_search_text(candidate_name)
-                for candidate_name in candidate_names
-                if candidate_name
-            ):
-                matching_ids.append(member.id)
-
-        return queryset.filter(id__in=matching_ids)
+        return queryset.filter(search_text__contains=normalized_query)
 
 
 class PublicRegistrationFilter(django_filters.FilterSet):
@@ -105,53 +92,64 @@ class PublicRegistrationFilter(django_filters.FilterSet):
         return queryset.filter(Q(full_name__icontains=value) | Q(email__icontains=value))
 
 
-class MemberViewSet(viewsets.ModelViewSet):
+class MemberViewSet(ConditionalGetMixin, StreamingListMixin, ExportJobMixin, viewsets.ModelViewSet):
     queryset = Member.objects.all().order_by("full_name")
     serializer_class = MemberSerializer
     permission_classes = [SuperuserOnly]
     filterset_class = MemberFilter
     pagination_class = OptionalPagination
+    watermark_models = (Member, Package)
+    export_filename = "integrantes"
+    export_job_source = "members"
+    export_tables = (Member,)
+    export_headers = [
+        "Nome",
+        "Criança",
+        "Responsável",
+        "Telefone",
+        "Email",
+        "Endereço",
+        "Como conheceu",
+        "Categoria",
+        "Dieta",
+        "Observações",
+        "Criado em",
+    ]
+
+    def get_watermark_context(self, request):
+        # `has_package` depends on which packages are valid today.
+        return [timezone.localdate()]
+
+    def get_queryset(self):
+        return (
+            super()
+            .get_queryset()
+            .select_related("responsible")
+            .annotate(has_package=active_package_exists(timezone.localdate()))
+        )
 
-    @action(detail=False, methods=["get"], url_path="export")
-    def export(self, request):
-        queryset = self.filter_queryset(self.get_queryset())
-        headers = [
-            "Nome",
-            "Criança",
-            "Responsável",
-            "Telefone",
-            "Email",
-            "Endereço",
-            "Como conheceu",
-            "Categoria",
-            "Dieta",
-            "Observações",
-            "Criado em",
-        ]
-        rows = [
-            [
-                member.full_name,
-                "Sim" if member.is_child else "Não",
-                member.responsible.full_name if member.responsible else "",
-                member.phone or "",
-                member.email or "",
-                member.address or "",
-                member.heard_about or "",
-                member.get_role_display() if member.role else "",
-                member.get_diet_display(),
-                member.observations or "",
-                member.created_at.strftime("%Y-%m-%d %H:%M"),
-            ]
-            for member in queryset
+    def build_export_row(self, member):
+        return [
+            member.full_name,
+            "Sim" if member.is_child else "Não",
+            member.responsible.full_name if member.responsible else "",
+            member.phone or "",
+            member.email or "",
+            member.address or "",
+            member.heard_about or "",
+            member.get_role_display() if member.role else "",
+            member.get_diet_display(),
+            member.observations or "",
+            member.created_at.strftime("%Y-%m-%d %H:%M"),
         ]
-        return create_xlsx_response("integrantes", headers, rows)
 
 
-class PublicRegistrationAdminViewSet(viewsets.ReadOnlyModelViewSet):
+class PublicRegistrationAdminViewSet(ConditionalGetMixin, viewsets.ReadOnlyModelViewSet):
     queryset = PublicRegistration.objects.prefetch_related("children").all()
     serializer_class = PublicRegistrationAdminSerializer
     permission_classes = [SuperuserOnly]
     filterset_class = PublicRegistrationFilter
+    watermark_models = (PublicRegistration, PublicRegistrationChild)
 
     @action(detail=True, methods=["post"], url_path="approve")
     def approve(self, request, pk=None):
@@ -110,6 +110,9 @@ USE_TZ = True
 STATIC_URL = "static/"
 STATIC_ROOT = BASE_DIR / "staticfiles"
 
+# Files written by the app itself (background export results); not served as public media.
+MEDIA_ROOT = Path(os.getenv("MEDIA_ROOT", str(BASE_DIR / "media")))
+
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 default_renderer_classes = ["rest_framework.renderers.JSONRenderer"]
@@ -142,6 +145,44 @@ REST_FRAMEWORK = {
     },
 }
 
+# Seconds between package expiration sweeps of `python manage.py expire_packages --loop`.
+PACKAGE_EXPIRATION_SWEEP_INTERVAL = int(os.getenv("PACKAGE_EXPIRATION_SWEEP_INTERVAL", "3600"))
+
+# Background exports (`python manage.py run_export_worker`).
+EXPORT_WORKER_POLL_INTERVAL = float(os.getenv("EXPORT_WORKER_POLL_INTERVAL", "5"))
+EXPORT_JOB_RETENTION_DAYS = int(os.getenv("EXPORT_JOB_RETENTION_DAYS", "7"))
+# Seconds after which a job still `PROCESSANDO` is considered abandoned by its worker.
+EXPORT_JOB_STALE_TIMEOUT = int(os.getenv("EXPORT_JOB_STALE_TIMEOUT", "1800"))
+
+# With Postgres, the cache lives in a database table (`django_cache`, created by migrations) so
+# every gunicorn worker shares the cached dashboard payloads, pagination counts and throttle
+# counters; local SQLite runs and tests keep a per-process memory cache. A Redis server can
+# replace it with DJANGO_CACHE_BACKEND=django.core.cache.backends.redis.RedisCache and
+# DJANGO_CACHE_LOCATION=redis://host:6379/0 (needs the `redis` package).
+CACHES = {
+    "default": {
+        "BACKEND": os.getenv(
+            "DJANGO_CACHE_BACKEND",
+            (
+                "django.core.cache.backends.db.DatabaseCache"
+                if os.getenv("POSTGRES_DB")
+                else "django.core.cache.backends.locmem.LocMemCache"
+            ),
+        ),
+        "LOCATION": os.getenv("DJANGO_CACHE_LOCATION", "django_cache"),
+    }
+}
+
+# Upper bound, in seconds, for reusing a cached dashboard summary; any write to the lunch,
+# member or financial rollup tables invalidates it earlier.
+DASHBOARD_CACHE_TIMEOUT = int(os.getenv("DASHBOARD_CACHE_TIMEOUT", "300"))
+
+# Upper bound, in seconds, for reusing a cached pagination COUNT; table changes invalidate it.
+PAGINATION_COUNT_CACHE_TIMEOUT = int(os.getenv("PAGINATION_COUNT_CACHE_TIMEOUT", "300"))
+
+# Longest list served without ?page=; larger lists answer 400 asking the client to paginate.
+UNPAGINATED_LIST_MAX_ROWS = int(os.getenv("UNPAGINATED_LIST_MAX_ROWS", "5000"))
+
 cors_allow_all_env = os.getenv("CORS_ALLOW_ALL_ORIGINS")
 CORS_ALLOW_ALL_ORIGINS = DEBUG if cors_allow_all_env is None else cors_allow_all_env == "True"
 CORS_ALLOWED_ORIGINS = [
@@ -212,6 +253,16 @@ LOGGING = {
             "handlers": ["console"],
             "level": os.getenv("DJANGO_AUTH_LOG_LEVEL", "INFO"),
             "propagate": False,
-        }
+        },
+        "apps.lunch": {
+            "handlers": ["console"],
+            "level": "INFO",
+            "propagate": False,
+        },
+        "apps.common": {
+            "handlers": ["console"],
+            "level": "INFO",
+            "propagate": False,
+        },
     },
 }